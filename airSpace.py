@@ -1,190 +1,315 @@
-from navPoint import NavPoint
-from navSegment import NavSegment
-from navAirport import NavAirport, add_sid, add_star
+from navAirport import NavAirport, add_sid, add_star, set_position, get_position
+from name_search import NameSearchIndex
+from spatial_index import SpatialIndex
+from bulk_loader import read_network_columns
+import gc
+import logging
 import math
 import time
 
+logger = logging.getLogger(__name__)
+
 class AirSpace:
     def __init__(self, name=""):
         self.name = name
         self.navpoints = {}  # Dictionary of NavPoints keyed by number
         self.navsegments = []  # List of NavSegments
         self.navairports = {}  # Dictionary of NavAirports keyed by name
+        # Índices de adyacencia mantenidos por add_navsegment
+        self.outgoing = {}  # número de punto -> lista de NavSegments que salen de él
+        self.incoming = {}  # número de punto -> lista de NavSegments que llegan a él
+        self.segment_index = {}  # (origen, destino) -> NavSegment
+        # Índice de nombres mantenido por add_navpoint (puede haber nombres repetidos)
+        self.name_index = {}  # nombre -> lista de NavPoints con ese nombre
+        # Contador de modificaciones y estructuras derivadas calculadas para una versión concreta
+        self.version = 0
+        self.derived = {}  # clave -> (versión, estructura)
+        self.source_files = None  # (nav, seg, aer) si se cargó con load_from_files
+        self.source_version = None  # versión justo después de cargar source_files
+        self.load_timings = {}  # fase de la carga -> segundos (ver bulk_loader)
+        self.route_cache = None  # RouteCache de las búsquedas de rutas (ver route_cache)
 
 
 def add_navpoint(airspace, navpoint):
+    previous = airspace.navpoints.get(navpoint.number)
+    if previous is not None:
+        # El punto sustituye a otro con el mismo número: quitar el anterior del índice
+        same_name = airspace.name_index.get(previous.name, [])
+        if previous in same_name:
+            same_name.remove(previous)
+        if not same_name:
+            airspace.name_index.pop(previous.name, None)
     airspace.navpoints[navpoint.number] = navpoint
+    airspace.name_index.setdefault(navpoint.name, []).append(navpoint)
+    airspace.version += 1
     
 def add_navsegment(airspace, navsegment):
     airspace.navsegments.append(navsegment)
+    airspace.version += 1
+    airspace.outgoing.setdefault(navsegment.origin_number, []).append(navsegment)
+    airspace.incoming.setdefault(navsegment.destination_number, []).append(navsegment)
+    # Si hay segmentos repetidos se conserva el primero, como hacía la búsqueda lineal
+    airspace.segment_index.setdefault((navsegment.origin_number, navsegment.destination_number), navsegment)
     
 def add_navairport(airspace, navairport):
     airspace.navairports[navairport.name] = navairport
+    airspace.version += 1
+
+
+def get_derived(airspace, key, builder=None):
+    """
+    Devuelve una estructura derivada del espacio aéreo (índices, tablas, etc.).
+    La estructura se construye con builder(airspace) la primera vez y se vuelve
+    a construir cuando el espacio aéreo se ha modificado desde entonces.
+    Sin builder, devuelve None si la estructura no existe o está desactualizada.
+    """
+    entry = airspace.derived.get(key)
+    if entry is None or entry[0] != airspace.version:
+        if builder is None:
+            return None
+        entry = (airspace.version, builder(airspace))
+        airspace.derived[key] = entry
+    return entry[1]
+
+
+def set_derived(airspace, key, value):
+    """Asocia una estructura derivada ya calculada a la versión actual del espacio aéreo"""
+    airspace.derived[key] = (airspace.version, value)
+
+
+def matches_source_files(airspace):
+    """
+    Indica si el espacio aéreo se cargó de ficheros y no se ha modificado
+    después, de modo que las cachés en disco de esos ficheros le sirven.
+    """
+    return airspace.source_files is not None and airspace.version == airspace.source_version
 
 
 def get_navpoint_by_number(airspace, number):
     return airspace.navpoints.get(number)
 
 
+def get_outgoing_segments(airspace, number):
+    """Devuelve los segmentos que salen del punto indicado"""
+    return airspace.outgoing.get(number, [])
+
+
+def get_incoming_segments(airspace, number):
+    """Devuelve los segmentos que llegan al punto indicado"""
+    return airspace.incoming.get(number, [])
+
+
+def get_navsegment(airspace, origin_number, destination_number):
+    """Devuelve el segmento origen -> destino o None si no existe"""
+    return airspace.segment_index.get((origin_number, destination_number))
+
+
+def find_segment_between(airspace, number1, number2):
+    """Devuelve el segmento que une dos puntos en cualquier sentido o None"""
+    segment = airspace.segment_index.get((number1, number2))
+    if segment is None:
+        segment = airspace.segment_index.get((number2, number1))
+    return segment
+
+
+def has_segments(airspace, number):
+    """Indica si el punto está conectado a algún segmento"""
+    return bool(airspace.outgoing.get(number) or airspace.incoming.get(number))
+
+
 def get_navpoint_by_name(airspace, name):
-    for point in airspace.navpoints.values():
-        if point.name == name:
-            return point
-    return None
+    """Devuelve el primer punto con ese nombre o None; ver get_navpoints_by_name para repetidos"""
+    points = airspace.name_index.get(name)
+    return points[0] if points else None
+
+
+def get_navpoints_by_name(airspace, name):
+    """Devuelve todos los puntos con ese nombre (lista vacía si no hay ninguno)"""
+    return list(airspace.name_index.get(name, []))
+
+
+def _build_name_search(airspace):
+    return NameSearchIndex(list(airspace.name_index) + list(airspace.navairports))
+
+
+def search_names_by_prefix(airspace, prefix, limit=10):
+    """Nombres de puntos y aeropuertos que empiezan por prefix, en orden alfabético"""
+    return get_derived(airspace, "name_search", _build_name_search).prefix(prefix, limit)
+
+
+def search_names_fuzzy(airspace, name, max_distance=1, limit=10):
+    """Nombres de puntos y aeropuertos parecidos a name (distancia de edición acotada)"""
+    return get_derived(airspace, "name_search", _build_name_search).fuzzy(name, max_distance, limit)
+
+
+def _build_spatial_index(airspace):
+    return SpatialIndex(airspace.navpoints.values())
+
+
+def find_nearest_navpoints(airspace, latitude, longitude, k=1, max_distance=None):
+    """Los k NavPoint más cercanos a una coordenada, como lista de (distancia en km, NavPoint)"""
+    index = get_derived(airspace, "spatial_index", _build_spatial_index)
+    return [(d, airspace.navpoints[n]) for d, n in index.nearest(latitude, longitude, k, max_distance)]
+
+
+def find_navpoints_within_radius(airspace, latitude, longitude, radius):
+    """NavPoint a radius km o menos de una coordenada, como lista de (distancia en km, NavPoint)"""
+    index = get_derived(airspace, "spatial_index", _build_spatial_index)
+    return [(d, airspace.navpoints[n]) for d, n in index.within_radius(latitude, longitude, radius)]
+
+
+def find_navpoints_in_bbox(airspace, min_lat, min_lon, max_lat, max_lon):
+    """NavPoint dentro de un rectángulo de latitudes y longitudes"""
+    index = get_derived(airspace, "spatial_index", _build_spatial_index)
+    return [airspace.navpoints[n] for n in index.within_bbox(min_lat, min_lon, max_lat, max_lon)]
+
+
+def snap_to_graph(airspace, latitude, longitude, max_distance=None):
+    """
+    Ajusta una coordenada al NavPoint conectado (con algún segmento) más cercano.
+
+    Returns:
+        Una tupla (NavPoint, distancia en km) o None si no hay ningún punto
+        conectado a max_distance km o menos.
+    """
+    index = get_derived(airspace, "spatial_index", _build_spatial_index)
+    nearest = index.nearest(latitude, longitude, 1, max_distance,
+                            predicate=lambda number: has_segments(airspace, number))
+    if not nearest:
+        return None
+    distance, number = nearest[0]
+    return airspace.navpoints[number], distance
 
 
 def get_navairport_by_name(airspace, name):
     return airspace.navairports.get(name)
 
 
+def _resolve_airport_positions(airspace):
+    """Guarda en cada NavAirport su posición y devuelve cuántos aeropuertos la tienen"""
+    navpoints = airspace.navpoints
+    resolved = 0
+    for name, airport in airspace.navairports.items():
+        # Un punto con el nombre del aeropuerto es su posición; si no, el centroide de sus SIDs y STARs
+        named = get_navpoint_by_name(airspace, name)
+        points = [named] if named else [navpoints[n] for n in airport.sids + airport.stars if n in navpoints]
+        if points:
+            set_position(airport, sum(p.latitude for p in points) / len(points),
+                         sum(p.longitude for p in points) / len(points))
+            resolved += 1
+        else:
+            set_position(airport, None, None)
+    return resolved
+
+
+def get_airport_position(airspace, airport):
+    """
+    (latitud, longitud) de un aeropuerto (código o NavAirport) o None si no
+    tiene puntos asociados. Las posiciones de todos los aeropuertos se calculan
+    de una vez y se guardan en los NavAirport hasta que el espacio aéreo cambie.
+    """
+    get_derived(airspace, "airport_positions", _resolve_airport_positions)
+    if isinstance(airport, str):
+        airport = airspace.navairports.get(airport)
+    return get_position(airport) if airport else None
+
+
+def populate_from_columns(airspace, columns):
+    """
+    Añade al espacio aéreo los puntos, segmentos y aeropuertos leídos por
+    bulk_loader.read_network_columns, manteniendo los mismos índices que
+    add_navpoint, add_navsegment y add_navairport.
+    """
+    # Se crean muchos objetos seguidos sin ciclos: el recolector solo añadiría pasadas inútiles
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        _populate_from_columns(airspace, columns)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def _populate_from_columns(airspace, columns):
+    fresh = not airspace.navpoints
+    navpoints = airspace.navpoints
+    name_index = airspace.name_index
+    for navpoint in columns.navpoints():
+        if navpoint.number in navpoints:
+            add_navpoint(airspace, navpoint)  # Sustituye a un punto existente
+        else:
+            navpoints[navpoint.number] = navpoint
+            name_index.setdefault(navpoint.name, []).append(navpoint)
+
+    outgoing = airspace.outgoing
+    incoming = airspace.incoming
+    segment_index = airspace.segment_index
+    navsegments = airspace.navsegments
+    for navsegment in columns.navsegments():
+        navsegments.append(navsegment)
+        outgoing.setdefault(navsegment.origin_number, []).append(navsegment)
+        incoming.setdefault(navsegment.destination_number, []).append(navsegment)
+        segment_index.setdefault((navsegment.origin_number, navsegment.destination_number), navsegment)
+
+    for airport_code, sids, stars in columns.airport_procedures or ():
+        airport = NavAirport(airport_code)
+        for number in sids:
+            add_sid(airport, number)
+        for number in stars:
+            add_star(airport, number)
+        airspace.navairports[airport.name] = airport
+
+    for airport_code, sid_name, star_name in columns.airports:
+        airport = NavAirport(airport_code)
+        if sid_name is not None:
+            sid_navpoint = get_navpoint_by_name(airspace, sid_name)
+            if sid_navpoint:
+                add_sid(airport, sid_navpoint.number)
+                logger.debug("Agregado SID %s (#%d) al aeropuerto %s", sid_name, sid_navpoint.number, airport_code)
+            star_navpoint = get_navpoint_by_name(airspace, star_name)
+            if star_navpoint:
+                add_star(airport, star_navpoint.number)
+                logger.debug("Agregado STAR %s (#%d) al aeropuerto %s", star_name, star_navpoint.number, airport_code)
+        airspace.navairports[airport.name] = airport
+        logger.debug("Aeropuerto %s añadido con %d SIDs y %d STARs",
+                     airport_code, len(airport.sids), len(airport.stars))
+
+    airspace.version += 1
+    # Si los puntos del espacio aéreo son exactamente los de las columnas, éstas
+    # sirven como estructura derivada (por ejemplo para los arrays de coordenadas)
+    if fresh and len(navpoints) == len(columns.nav_numbers):
+        set_derived(airspace, "columns", columns)
+
+
+def set_name_from_file(airspace, nav_file):
+    """Pone nombre al espacio aéreo según el prefijo del fichero de puntos"""
+    if nav_file.startswith(("Cat_", "cat_")):
+        airspace.name = "Catalunya"
+    elif nav_file.startswith(("Esp_", "esp_")):
+        airspace.name = "España"
+    elif nav_file.startswith(("Eur_", "eur_")):
+        airspace.name = "Europe"
+
+
 def load_from_files(airspace, nav_file, seg_file, aer_file):
     try:
-        if nav_file.startswith(("Cat_", "cat_")):
-            airspace.name = "Catalunya"
-        elif nav_file.startswith(("Esp_", "esp_")):
-            airspace.name = "España"
-        elif nav_file.startswith(("Eur_", "eur_")):
-            airspace.name = "Europe"
-
-        with open(nav_file, 'r') as f:
-            first_line = f.readline().strip()
-            f.seek(0)
-            
-            try:
-                parts = first_line.split()
-                if len(parts) >= 4:
-                    int(parts[0])
-                    float(parts[2])
-                    float(parts[3])
-                    is_header = False
-                else:
-                    is_header = True
-            except (ValueError, IndexError):
-                is_header = True
-                
-            if is_header:
-                next(f)
-                
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                parts = line.split()
-                if len(parts) >= 4:
-                    number = int(parts[0])
-                    name = parts[1]
-                    latitude = float(parts[2])
-                    longitude = float(parts[3])
-                    add_navpoint(airspace, NavPoint(number, name, latitude, longitude))
-
-        with open(seg_file, 'r') as f:
-            first_line = f.readline().strip()
-            f.seek(0)
-            
-            try:
-                parts = first_line.split()
-                if len(parts) >= 3:
-                    int(parts[0])
-                    int(parts[1])
-                    float(parts[2])
-                    is_header = False
-                else:
-                    is_header = True
-            except (ValueError, IndexError):
-                is_header = True
-                
-            if is_header:
-                next(f)
-                
-            for line in f:
-                line = line.strip()
-                if not line:
-                    continue
-                    
-                parts = line.split()
-                if len(parts) >= 3:
-                    origin = int(parts[0])
-                    destination = int(parts[1])
-                    distance = float(parts[2])
-                    add_navsegment(airspace, NavSegment(origin, destination, distance))
-
-        with open(aer_file, 'r') as f:
-            first_line = f.readline().strip()
-            f.seek(0)
-            
-            try:
-                parts = first_line.split()
-                if len(parts) < 1 or parts[0].startswith('#'):
-                    is_header = True
-                else:
-                    is_header = False
-            except:
-                is_header = True
-                
-            if is_header:
-                next(f)
-            
-            current_airport = None
-            
-            # Leer el archivo línea por línea
-            lines = [line.strip() for line in f if line.strip()]
-            i = 0
-            
-            while i < len(lines):
-                line = lines[i]
-                
-                # Si es un código de aeropuerto
-                if line.startswith(("LE", "LF")) and not "." in line:
-                    airport_code = line
-                    current_airport = NavAirport(airport_code)
-                    
-                    # Verificar si hay suficientes líneas para SID y STAR
-                    if i + 2 < len(lines):
-                        # La siguiente línea debería ser el SID (.D)
-                        sid_line = lines[i + 1]
-                        # La siguiente a esa debería ser el STAR (.A)
-                        star_line = lines[i + 2]
-                        
-                        # Verificar que el formato sea correcto
-                        if sid_line.endswith(".D") and star_line.endswith(".A"):
-                            # Buscar los puntos por nombre
-                            sid_name = sid_line
-                            star_name = star_line
-                            
-                            # Encontrar los números de punto correspondientes
-                            sid_point = None
-                            star_point = None
-                            
-                            for point_num, point in airspace.navpoints.items():
-                                if point.name == sid_name:
-                                    sid_point = point_num
-                                if point.name == star_name:
-                                    star_point = point_num
-                            
-                            # Añadir SID y STAR si se encontraron
-                            if sid_point:
-                                add_sid(current_airport, sid_point)
-                                print(f"Agregado SID {sid_name} (#{sid_point}) al aeropuerto {airport_code}")
-                            
-                            if star_point:
-                                add_star(current_airport, star_point)
-                                print(f"Agregado STAR {star_name} (#{star_point}) al aeropuerto {airport_code}")
-                    
-                    # Añadir el aeropuerto al espacio aéreo
-                    add_navairport(airspace, current_airport)
-                    print(f"Aeropuerto {airport_code} añadido con {len(current_airport.sids)} SIDs y {len(current_airport.stars)} STARs")
-                    
-                    # Avanzar a la siguiente entrada (saltando las líneas de SID y STAR)
-                    i += 3
-                else:
-                    # Si no es un aeropuerto, simplemente avanzar
-                    i += 1
-        
+        set_name_from_file(airspace, nav_file)
+
+        columns = read_network_columns(nav_file, seg_file, aer_file)
+        start = time.perf_counter()
+        populate_from_columns(airspace, columns)
+        columns.timings["objects"] = time.perf_counter() - start
+        logger.info("Espacio aéreo construido en %.1f ms: %d puntos, %d segmentos, %d aeropuertos",
+                    columns.timings["objects"] * 1000, len(airspace.navpoints),
+                    len(airspace.navsegments), len(airspace.navairports))
+
+        airspace.source_files = (nav_file, seg_file, aer_file)
+        airspace.source_version = airspace.version
+        airspace.load_timings = columns.timings
         return True
     
     except Exception as e:
-        print(f"Error loading airspace data: {e}")
+        logger.error("Error loading airspace data: %s", e)
         return False
 
 
@@ -207,155 +332,172 @@ def calculate_distance(airspace, point1, point2):
 def find_neighbors(airspace, navpoint_number):
     neighbors = []
     
-    for segment in airspace.navsegments:
-        if segment.origin_number == navpoint_number:
-            neighbors.append(segment.destination_number)
-        elif segment.destination_number == navpoint_number:
+    for segment in airspace.outgoing.get(navpoint_number, []):
+        neighbors.append(segment.destination_number)
+    for segment in airspace.incoming.get(navpoint_number, []):
+        # Un bucle sobre el propio punto ya se añadió como segmento de salida
+        if segment.origin_number != navpoint_number:
             neighbors.append(segment.origin_number)
             
     return neighbors
 
 
-def find_shortest_path(airspace, start_number, end_number):
-
+def _graph_dijkstra(graph, start, end):
+    """Dijkstra de start a end sobre un grafo CSR; devuelve (padres, distancia) o None"""
     import heapq
 
-    if start_number not in airspace.navpoints or end_number not in airspace.navpoints:
-        return [], 0
-
-    distances = {node: float('infinity') for node in airspace.navpoints}
-    distances[start_number] = 0
-
-    previous = {node: None for node in airspace.navpoints}
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    # Solo se guardan los nodos alcanzados: el coste de preparar la búsqueda no depende del tamaño del grafo
+    distances = {start: 0.0}
+    previous = {start: None}
 
-    priority_queue = [(0, start_number)]
+    priority_queue = [(0.0, start)]
     
     while priority_queue:
         current_distance, current_node = heapq.heappop(priority_queue)
 
-        if current_node == end_number:
-            break
+        if current_node == end:
+            return previous, current_distance
 
         if current_distance > distances[current_node]:
             continue
 
-        neighbors = find_neighbors(airspace, current_node)
-        
-        for neighbor in neighbors:
-            segment = None
-            for seg in airspace.navsegments:
-                if (seg.origin_number == current_node and seg.destination_number == neighbor) or \
-                   (seg.destination_number == current_node and seg.origin_number == neighbor):
-                    segment = seg
-                    break
-            
-            if segment:
-                distance = current_distance + segment.distance
+        first = offsets[current_node]
+        last = offsets[current_node + 1]
+        for neighbor, segment_distance in zip(targets[first:last], weights[first:last]):
+            distance = current_distance + segment_distance
+
+            if distance < distances.get(neighbor, float('infinity')):
+                distances[neighbor] = distance
+                previous[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return None
+
+
+def _bidirectional_dijkstra(forward, backward, start, end):
+    """
+    Dijkstra bidireccional: una búsqueda desde start sobre forward y otra desde
+    end sobre backward (el grafo con los tramos invertidos), expandiendo cada vez
+    el lado con la cola más corta. Se detiene cuando la suma de las dos
+    distancias mínimas pendientes no puede mejorar la mejor ruta encontrada.
+
+    Returns:
+        Una tupla (lista de identificadores, distancia) o None si no hay ruta
+    """
+    import heapq
+
+    infinity = float('infinity')
+    distances = ({start: 0.0}, {end: 0.0})
+    previous = ({start: None}, {end: None})
+    queues = ([(0.0, start)], [(0.0, end)])
+    graphs = (forward, backward)
+    best = infinity
+    meeting = None  # (nodo del lado de start, nodo del lado de end)
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        side = 0 if len(queues[0]) <= len(queues[1]) else 1
+        current_distance, current_node = heapq.heappop(queues[side])
+        own = distances[side]
+        if current_distance > own[current_node]:
+            continue
+
+        other = distances[1 - side]
+        graph = graphs[side]
+        first = graph.offsets[current_node]
+        last = graph.offsets[current_node + 1]
+        for neighbor, segment_distance in zip(graph.targets[first:last], graph.weights[first:last]):
+            distance = current_distance + segment_distance
+            if distance < own.get(neighbor, infinity):
+                own[neighbor] = distance
+                previous[side][neighbor] = current_node
+                heapq.heappush(queues[side], (distance, neighbor))
+
+            # Ruta completa a través del tramo current_node - neighbor
+            remaining = other.get(neighbor)
+            if remaining is not None and distance + remaining < best:
+                best = distance + remaining
+                meeting = (current_node, neighbor) if side == 0 else (neighbor, current_node)
+
+    if meeting is None:
+        return None
+
+    path = []
+    node = meeting[0]
+    while node is not None:
+        path.append(node)
+        node = previous[0][node]
+    path.reverse()
+    node = meeting[1]
+    while node is not None:
+        path.append(node)
+        node = previous[1][node]
+    return path, best
+
+
+def find_shortest_path(airspace, start_number, end_number, directed=False, bidirectional=True):
+    """
+    Ruta más corta entre dos puntos con Dijkstra sobre el grafo CSR.
+
+    Args:
+        airspace: Instancia de AirSpace
+        start_number: Número del punto de origen
+        end_number: Número del punto de destino
+        directed: Si es True, los segmentos solo se recorren de origen a destino
+        bidirectional: Si es True, busca a la vez desde el origen y desde el destino
+
+    Returns:
+        Una tupla (lista de números de punto, distancia total), o ([], 0) si no
+        hay ruta o el origen es igual al destino.
+    """
+    from csr_graph import get_csr_graph, get_reverse_csr_graph
+
+    if start_number not in airspace.navpoints or end_number not in airspace.navpoints:
+        return [], 0
+    if start_number == end_number:
+        return [], 0
 
-                if distance < distances[neighbor]:
-                    distances[neighbor] = distance
-                    previous[neighbor] = current_node
-                    heapq.heappush(priority_queue, (distance, neighbor))
+    graph = get_csr_graph(airspace, directed)
+    start = graph.node_index[start_number]
+    end = graph.node_index[end_number]
+
+    if bidirectional:
+        # Hacia atrás se recorren los tramos que llegan a cada punto (en el grafo no dirigido, los mismos)
+        backward = get_reverse_csr_graph(airspace) if directed else graph
+        result = _bidirectional_dijkstra(graph, backward, start, end)
+        if result is None:
+            return [], 0
+        nodes, total_distance = result
+        return [graph.node_numbers[node] for node in nodes], total_distance
+
+    result = _graph_dijkstra(graph, start, end)
+    if result is None:
+        return [], 0
+    previous, total_distance = result
 
     path = []
-    current_node = end_number
+    current_node = end
     
     while current_node is not None:
-        path.append(current_node)
+        path.append(graph.node_numbers[current_node])
         current_node = previous[current_node]
 
     path.reverse()
     
-
-    if not path or (len(path) == 1 and path[0] == start_number):
-        return [], 0
-
-    total_distance = distances[end_number]
-    
     return path, total_distance
 
 
 def find_multiple_paths(airspace, start_number, end_number, max_paths=3):
     """
     Encuentra múltiples rutas entre dos puntos, ordenadas por distancia total.
+    Usa el algoritmo de Yen, así que son las max_paths rutas simples más cortas.
     """
-    paths = []
-    start_time = time.time()
-    MAX_TIME = 2  # segundos máximos de búsqueda
-    
-    def find_path_with_restrictions(current, target, current_path, restricted_segments, max_depth=20):
-        if time.time() - start_time > MAX_TIME:
-            return None
-            
-        if current == target:
-            total_distance = 0
-            for i in range(len(current_path) - 1):
-                point1 = get_navpoint_by_number(airspace, current_path[i])
-                point2 = get_navpoint_by_number(airspace, current_path[i + 1])
-                total_distance += calculate_distance(airspace, point1, point2)
-            return (total_distance, current_path[:])
-        
-        if len(paths) >= max_paths or len(current_path) > max_depth:
-            return None
-            
-        # Obtener vecinos
-        neighbors = find_neighbors(airspace, current)
-        if not neighbors:
-            return None
-            
-        # Ordenar vecinos por distancia al objetivo
-        neighbor_distances = []
-        target_point = get_navpoint_by_number(airspace, target)
-        for neighbor in neighbors:
-            neighbor_point = get_navpoint_by_number(airspace, neighbor)
-            dist = calculate_distance(airspace, neighbor_point, target_point)
-            neighbor_distances.append((dist, neighbor))
-        
-        neighbor_distances.sort()
-        
-        for _, next_point in neighbor_distances:
-            segment = tuple(sorted([current, next_point]))
-            if next_point not in current_path and segment not in restricted_segments:
-                current_path.append(next_point)
-                restricted_segments.add(segment)
-                result = find_path_with_restrictions(next_point, target, current_path, restricted_segments, max_depth)
-                if result:
-                    return result
-                current_path.pop()
-                restricted_segments.remove(segment)
-        return None
-    
-    # Encontrar la primera ruta (la más corta)
-    shortest_result = find_shortest_path(airspace, start_number, end_number)
-    if shortest_result:
-        shortest_path, total_distance = shortest_result
-        paths.append((total_distance, shortest_path))
-    
-    # Encontrar rutas alternativas
-    attempts = 0
-    max_attempts = 5
-    while len(paths) < max_paths and attempts < max_attempts:
-        restricted_segments = set()
-        for _, path in paths:
-            for i in range(len(path) - 1):
-                restricted_segments.add(tuple(sorted([path[i], path[i + 1]])))
-        
-        result = find_path_with_restrictions(start_number, end_number, [start_number], restricted_segments)
-        if result:
-            # Verificar que la ruta es significativamente diferente
-            new_distance, new_path = result
-            is_different = True
-            for existing_distance, existing_path in paths:
-                if len(set(new_path) & set(existing_path)) / len(new_path) > 0.7:  # Si comparten más del 70% de puntos
-                    is_different = False
-                    break
-            if is_different:
-                paths.append(result)
-        attempts += 1
-        
-        if time.time() - start_time > MAX_TIME:
-            break
-    
-    # Ordenar rutas por distancia
-    paths.sort(key=lambda x: x[0])
-    return paths
+    from path import find_k_shortest_paths
+
+    if start_number not in airspace.navpoints or end_number not in airspace.navpoints:
+        return []
+    return find_k_shortest_paths(airspace, [start_number], [end_number], k=max_paths)
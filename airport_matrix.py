@@ -0,0 +1,269 @@
+"""
+Matriz de distancias entre todos los pares de aeropuertos.
+
+Se calcula un árbol de caminos mínimos (Dijkstra) desde cada SID y con él la
+mejor combinación SID -> STAR para cada par de aeropuertos. El resultado se
+guarda en un fichero binario compacto identificado por un hash de los ficheros
+nav/seg/aer, de modo que en los siguientes arranques basta con leerlo.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import struct
+import sys
+from array import array
+
+from airSpace import get_derived, set_derived, matches_source_files
+from csr_graph import get_csr_graph
+from path_tree import shortest_path_tree_arrays
+
+logger = logging.getLogger(__name__)
+
+MATRIX_MAGIC = b"AMTX"
+MATRIX_VERSION = 2  # 2: números de punto en 64 bits
+# magic, versión, dirigido, hash sha256, nº de nodos, nº de SIDs, nº de aeropuertos
+HEADER_FORMAT = "<4sHH32sIII"
+
+_worker_graph = None
+
+
+def hash_source_files(*paths):
+    """Calcula un hash sha256 del contenido de los ficheros de entrada"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            content = f.read()
+        digest.update(struct.pack("<Q", len(content)))
+        digest.update(content)
+    return digest.digest()
+
+
+class AirportMatrix:
+    """
+    Distancias mínimas entre aeropuertos (de los SIDs del origen a los STARs
+    del destino) y árboles de predecesores para reconstruir las rutas.
+    """
+    def __init__(self, node_numbers, sid_nodes, predecessors, airport_names,
+                 distances, best_sids, best_stars, directed=False, source_hash=b""):
+        self.node_numbers = node_numbers  # array('q'): índice de nodo -> número de punto
+        self.sid_nodes = sid_nodes  # array('i'): SID -> índice de nodo
+        self.predecessors = predecessors  # array('i'): SID x nodo -> índice del padre o -1
+        self.airport_names = airport_names  # lista ordenada de códigos de aeropuerto
+        self.distances = distances  # array('d'): aeropuerto x aeropuerto
+        self.best_sids = best_sids  # array('i'): SID usado en cada par o -1
+        self.best_stars = best_stars  # array('i'): índice de nodo del STAR usado o -1
+        self.directed = directed
+        self.source_hash = source_hash
+        self.airport_index = {name: i for i, name in enumerate(airport_names)}
+
+
+def _init_worker(graph):
+    global _worker_graph
+    _worker_graph = graph
+
+
+def _worker_tree(source_index):
+    return shortest_path_tree_arrays(_worker_graph, [source_index])
+
+
+def build_airport_matrix(airspace, processes=1, directed=False):
+    """
+    Calcula la matriz de distancias entre todos los aeropuertos del espacio aéreo.
+
+    Args:
+        airspace: Instancia de AirSpace
+        processes: Número de procesos para los Dijkstra de cada SID (None usa todos los núcleos)
+        directed: Si es True, los segmentos solo se recorren de origen a destino
+
+    Returns:
+        Una instancia de AirportMatrix
+    """
+    graph = get_csr_graph(airspace, directed)
+    node_index = graph.node_index
+    node_numbers = graph.node_numbers
+    airport_names = sorted(airspace.navairports)
+
+    sids = []
+    for name in airport_names:
+        for sid in airspace.navairports[name].sids:
+            if sid in node_index and sid not in sids:
+                sids.append(sid)
+
+    sid_indices = [node_index[sid] for sid in sids]
+    if processes == 1 or len(sids) < 2:
+        trees = [shortest_path_tree_arrays(graph, [index]) for index in sid_indices]
+    else:
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(graph,)) as pool:
+            trees = pool.map(_worker_tree, sid_indices)
+
+    count = len(node_numbers)
+    sid_slot = {sid: slot for slot, sid in enumerate(sids)}
+    predecessors = array('i')
+    for _, tree_predecessors in trees:
+        predecessors.extend(tree_predecessors)
+
+    size = len(airport_names)
+    distances = array('d', [float('inf')]) * (size * size)
+    best_sids = array('i', [-1]) * (size * size)
+    best_stars = array('i', [-1]) * (size * size)
+    for a, origin_name in enumerate(airport_names):
+        origin_sids = [sid_slot[s] for s in airspace.navairports[origin_name].sids if s in sid_slot]
+        for b, dest_name in enumerate(airport_names):
+            stars = [node_index[s] for s in airspace.navairports[dest_name].stars if s in node_index]
+            cell = a * size + b
+            for slot in origin_sids:
+                tree_distances = trees[slot][0]
+                for star in stars:
+                    if tree_distances[star] < distances[cell]:
+                        distances[cell] = tree_distances[star]
+                        best_sids[cell] = slot
+                        best_stars[cell] = star
+
+    sid_nodes = array('i', [node_index[s] for s in sids])
+    return AirportMatrix(node_numbers, sid_nodes, predecessors, airport_names,
+                         distances, best_sids, best_stars, directed)
+
+
+def _write_array(f, values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def _read_array(data, offset, typecode, count):
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    values.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+
+def save_airport_matrix(matrix, filename):
+    """Guarda la matriz en el formato binario versionado"""
+    names = "\n".join(matrix.airport_names).encode("utf-8")
+    with open(filename, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, MATRIX_MAGIC, MATRIX_VERSION, int(matrix.directed),
+                            matrix.source_hash, len(matrix.node_numbers), len(matrix.sid_nodes),
+                            len(matrix.airport_names)))
+        f.write(struct.pack("<I", len(names)))
+        f.write(names)
+        for values in (matrix.node_numbers, matrix.sid_nodes, matrix.predecessors,
+                       matrix.distances, matrix.best_sids, matrix.best_stars):
+            _write_array(f, values)
+
+
+def load_airport_matrix(filename, expected_hash=None):
+    """
+    Lee una matriz guardada con save_airport_matrix.
+    Devuelve None si el fichero no existe, tiene otro formato o su hash no coincide.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    header_size = struct.calcsize(HEADER_FORMAT)
+    if len(data) < header_size + 4:
+        return None
+    magic, version, directed, source_hash, nodes, sid_count, airports = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != MATRIX_MAGIC or version != MATRIX_VERSION:
+        return None
+    if expected_hash is not None and source_hash != expected_hash:
+        return None
+
+    offset = header_size
+    (names_size,) = struct.unpack_from("<I", data, offset)
+    offset += 4
+    names = data[offset:offset + names_size].decode("utf-8")
+    offset += names_size
+    airport_names = names.split("\n") if names else []
+
+    node_numbers, offset = _read_array(data, offset, 'q', nodes)
+    sid_nodes, offset = _read_array(data, offset, 'i', sid_count)
+    predecessors, offset = _read_array(data, offset, 'i', sid_count * nodes)
+    distances, offset = _read_array(data, offset, 'd', airports * airports)
+    best_sids, offset = _read_array(data, offset, 'i', airports * airports)
+    best_stars, offset = _read_array(data, offset, 'i', airports * airports)
+    if offset != len(data):
+        return None
+
+    return AirportMatrix(node_numbers, sid_nodes, predecessors, airport_names,
+                         distances, best_sids, best_stars, bool(directed), source_hash)
+
+
+def matrix_cache_path(airspace, source_hash, cache_dir=None):
+    """Ruta del fichero de caché para los ficheros de entrada del espacio aéreo"""
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(airspace.source_files[0]))
+    return os.path.join(cache_dir, f"airport_matrix_{source_hash.hex()[:16]}.bin")
+
+
+def precompute_airport_matrix(airspace, cache_dir=None, processes=1, directed=False):
+    """
+    Prepara la matriz de aeropuertos del espacio aéreo y la deja asociada a él
+    para que find_shortest_path_astar responda las consultas entre aeropuertos
+    consultando la tabla.
+
+    Si el espacio aéreo se cargó desde ficheros y no se ha modificado después,
+    la matriz se lee de la caché en disco cuando existe y coincide con el
+    contenido de los ficheros; si no, se calcula y se guarda para la próxima vez.
+    """
+    cache_file = None
+    source_hash = b""
+    if matches_source_files(airspace):
+        source_hash = hash_source_files(*airspace.source_files)
+        cache_file = matrix_cache_path(airspace, source_hash, cache_dir)
+        matrix = load_airport_matrix(cache_file, source_hash)
+        if (matrix is not None and matrix.directed == directed
+                and list(matrix.node_numbers) == list(airspace.navpoints)):
+            set_derived(airspace, "airport_matrix", matrix)
+            return matrix
+
+    matrix = build_airport_matrix(airspace, processes, directed)
+    matrix.source_hash = source_hash
+    if cache_file:
+        try:
+            save_airport_matrix(matrix, cache_file)
+        except OSError as e:
+            logger.warning("No se pudo guardar la matriz de aeropuertos: %s", e)
+    set_derived(airspace, "airport_matrix", matrix)
+    return matrix
+
+
+def lookup_airport_route(airspace, origin_airport, dest_airport, directed=False):
+    """
+    Responde una consulta entre aeropuertos con la matriz precalculada.
+
+    Returns:
+        None si no hay matriz vigente para este espacio aéreo o no incluye los
+        aeropuertos; si no, una tupla (lista de números de punto, distancia),
+        con una lista vacía cuando no existe ruta.
+    """
+    matrix = get_derived(airspace, "airport_matrix")
+    if matrix is None or matrix.directed != directed:
+        return None
+    a = matrix.airport_index.get(origin_airport)
+    b = matrix.airport_index.get(dest_airport)
+    if a is None or b is None:
+        return None
+
+    size = len(matrix.airport_names)
+    cell = a * size + b
+    slot = matrix.best_sids[cell]
+    if slot < 0:
+        return [], float('inf')
+
+    count = len(matrix.node_numbers)
+    base = slot * count
+    node = matrix.best_stars[cell]
+    path = []
+    while node >= 0:
+        path.append(matrix.node_numbers[node])
+        node = matrix.predecessors[base + node]
+    path.reverse()
+    return path, matrix.distances[cell]
@@ -0,0 +1,179 @@
+"""
+Cálculo de rutas por lotes sin interfaz gráfica.
+
+Lee un fichero con un par origen/destino por línea (nombres de punto o códigos
+de aeropuerto, separados por espacios, tabuladores o comas; las líneas vacías y
+las que empiezan por # se ignoran), resuelve las rutas con
+find_shortest_path_astar en varios procesos y escribe cada resultado en cuanto
+está disponible, en CSV o en JSON por líneas, con el tiempo de cada consulta.
+
+Uso:
+    python batch_routes.py pares.txt --dataset Spain --processes 4 --format jsonl -o rutas.jsonl
+"""
+
+import argparse
+import csv
+import json
+import logging
+import multiprocessing
+import sys
+import time
+
+from airSpace import AirSpace
+from csr_graph import get_csr_graph
+from path import find_shortest_path_astar, get_heuristic_scale
+from snapshot import load_with_snapshot
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ("index", "origin", "destination", "found", "distance_km", "points", "time_ms", "error")
+
+_worker_airspace = None
+
+
+def read_pairs(lines):
+    """Genera las tuplas (origen, destino) de las líneas de un fichero de pares"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = line.replace(",", " ").split()
+        if len(parts) < 2:
+            raise ValueError(f"Línea sin origen y destino: {line!r}")
+        yield parts[0], parts[1]
+
+
+def prepare_airspace(airspace):
+    """Calcula de antemano las estructuras que usan las búsquedas para compartirlas con los procesos"""
+    get_csr_graph(airspace)
+    get_heuristic_scale(airspace)
+    return airspace
+
+
+def solve_pair(airspace, index, origin, destination):
+    """Resuelve una consulta y devuelve su resultado como diccionario con los campos de FIELDS"""
+    start = time.perf_counter()
+    error = ""
+    try:
+        path, distance = find_shortest_path_astar(airspace, origin, destination)
+    except Exception as e:  # Una consulta errónea no debe detener el lote
+        path, distance = [], 0
+        error = str(e)
+    elapsed = time.perf_counter() - start
+    return {"index": index, "origin": origin, "destination": destination, "found": bool(path),
+            "distance_km": round(distance, 6) if path else None,
+            "points": [p.name for p in path], "time_ms": round(elapsed * 1000, 3), "error": error}
+
+
+def _init_worker(files, cache_dir):
+    global _worker_airspace
+    # Con fork el proceso ya hereda el espacio aéreo del padre (memoria compartida copy-on-write);
+    # en otro caso se carga desde la instantánea binaria, que se abre con mmap
+    if _worker_airspace is None:
+        airspace = AirSpace()
+        if not load_with_snapshot(airspace, *files, cache_dir=cache_dir):
+            raise RuntimeError(f"No se pudieron cargar los ficheros {files}")
+        _worker_airspace = prepare_airspace(airspace)
+
+
+def _worker_solve(job):
+    index, origin, destination = job
+    return solve_pair(_worker_airspace, index, origin, destination)
+
+
+def solve_batch(airspace, files, pairs, processes=None, chunksize=16, cache_dir=None):
+    """
+    Resuelve los pares en un pool de procesos y genera los resultados en el
+    orden de entrada según van terminando.
+
+    Args:
+        airspace: AirSpace ya cargado con los ficheros files
+        files: Tupla (nav, seg, aer) con la que se cargan los procesos si no hay fork
+        pairs: Iterable de tuplas (origen, destino)
+        processes: Número de procesos (None usa todos los núcleos; 1 no crea procesos)
+        cache_dir: Directorio de la instantánea con la que se cargan los procesos sin fork
+    """
+    global _worker_airspace
+    jobs = ((i, origin, destination) for i, (origin, destination) in enumerate(pairs))
+    prepare_airspace(airspace)
+    if processes == 1:
+        for job in jobs:
+            yield solve_pair(airspace, *job)
+        return
+
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    if context.get_start_method() == "fork":
+        _worker_airspace = airspace
+    try:
+        with context.Pool(processes, initializer=_init_worker, initargs=(files, cache_dir)) as pool:
+            yield from pool.imap(_worker_solve, jobs, chunksize)
+    finally:
+        _worker_airspace = None
+
+
+class _ResultWriter:
+    """Escribe los resultados en CSV o JSON por líneas"""
+    def __init__(self, output, output_format):
+        self.output = output
+        self.output_format = output_format
+        self.writer = None
+        if output_format == "csv":
+            self.writer = csv.DictWriter(output, fieldnames=FIELDS)
+            self.writer.writeheader()
+
+    def write(self, result):
+        if self.writer is not None:
+            row = dict(result)
+            row["points"] = " ".join(result["points"])
+            self.writer.writerow(row)
+        else:
+            self.output.write(json.dumps(result, ensure_ascii=False) + "\n")
+        # Resultados visibles según se calculan, aunque la salida sea una tubería
+        self.output.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cálculo de rutas por lotes")
+    parser.add_argument("pairs", help="fichero con un par origen destino por línea ('-' para la entrada estándar)")
+    parser.add_argument("--dataset", default="Spain", help="prefijo de los ficheros _nav/_seg/_aer (Spain, Cat...)")
+    parser.add_argument("--nav", help="fichero de puntos (por defecto <dataset>_nav.txt)")
+    parser.add_argument("--seg", help="fichero de segmentos (por defecto <dataset>_seg.txt)")
+    parser.add_argument("--aer", help="fichero de aeropuertos (por defecto <dataset>_aer.txt)")
+    parser.add_argument("-p", "--processes", type=int, default=None, help="procesos (por defecto, uno por núcleo)")
+    parser.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv", help="formato de salida")
+    parser.add_argument("-o", "--output", help="fichero de salida (por defecto la salida estándar)")
+    parser.add_argument("--cache-dir", help="directorio de la instantánea binaria (por defecto el de --nav)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+
+    files = (args.nav or f"{args.dataset}_nav.txt", args.seg or f"{args.dataset}_seg.txt",
+             args.aer or f"{args.dataset}_aer.txt")
+    airspace = AirSpace()
+    if not load_with_snapshot(airspace, *files, cache_dir=args.cache_dir):
+        parser.error(f"no se pudieron cargar los ficheros {', '.join(files)}")
+
+    source = sys.stdin if args.pairs == "-" else open(args.pairs, 'r')
+    output = sys.stdout if not args.output else open(args.output, 'w', newline="")
+    try:
+        pairs = list(read_pairs(source))
+        writer = _ResultWriter(output, args.format)
+        start = time.perf_counter()
+        found = 0
+        for result in solve_batch(airspace, files, pairs, args.processes, cache_dir=args.cache_dir):
+            writer.write(result)
+            found += result["found"]
+        elapsed = time.perf_counter() - start
+        logger.info("%d rutas (%d encontradas) en %.2f s, %.2f ms por consulta",
+                    len(pairs), found, elapsed, elapsed * 1000 / max(len(pairs), 1))
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1094 @@
+"""
+Benchmarks de rendimiento del sistema de navegación aérea.
+
+Uso:
+    python benchmark.py            # ejecuta todos los benchmarks
+    python benchmark.py adjacency  # ejecuta solo los indicados
+"""
+
+import argparse
+import contextlib
+import heapq
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+import tracemalloc
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from airSpace import (AirSpace, load_from_files, find_shortest_path, find_neighbors, find_segment_between,
+                      get_navpoint_by_name, search_names_by_prefix, search_names_fuzzy, calculate_distance,
+                      find_nearest_navpoints, find_navpoints_within_radius, find_navpoints_in_bbox, snap_to_graph,
+                      get_airport_position)
+from airSpace import add_navpoint, add_navsegment, add_navairport
+from navPoint import NavPoint
+from navSegment import NavSegment
+from navAirport import NavAirport, add_sid, add_star
+from bulk_loader import read_network_columns
+from model_store import stores_from_columns
+from path_tree import get_shortest_path_tree, shortest_paths_from, find_reachable_within
+from batch_routes import solve_batch
+from kml_generator import generate_airspace_kml, save_kml_to_file, write_airspace_kml, save_airspace_kmz
+from map_renderer import draw_airspace_map, map_bounds
+from kml_tiles import build_tiles, write_tiles, write_root_kml, TILES_DIRECTORY, ROOT_FILE
+from route_cache import cached_shortest_path_astar, get_route_cache
+from snapshot import load_with_snapshot, open_snapshot, snapshot_path
+from distance_kernel import (get_coordinate_arrays, one_to_many, segment_distances, validate_segment_distances,
+                             heuristic_table)
+from csr_graph import build_csr_graph
+from landmarks import precompute_landmarks
+from contraction_hierarchy import (build_contraction_hierarchy, find_shortest_path_ch,
+                                   precompute_contraction_hierarchy)
+from path import astar_search, find_shortest_path_astar, find_route_with_procedures, find_multiple_paths_astar
+from airport_matrix import build_airport_matrix, precompute_airport_matrix, hash_source_files
+
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    """Registra una función de benchmark con el nombre sin el prefijo bench_"""
+    BENCHMARKS[func.__name__[len("bench_"):]] = func
+    return func
+
+
+def load_airspace(prefix="Spain"):
+    """Carga uno de los conjuntos de datos incluidos sin mostrar los mensajes del cargador"""
+    airspace = AirSpace()
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_from_files(airspace, f"{prefix}_nav.txt", f"{prefix}_seg.txt", f"{prefix}_aer.txt")
+    return airspace
+
+
+def random_pairs(airspace, count, seed=42):
+    """Devuelve pares aleatorios (origen, destino) de números de punto reproducibles"""
+    rng = random.Random(seed)
+    numbers = sorted(airspace.navpoints)
+    return [(rng.choice(numbers), rng.choice(numbers)) for _ in range(count)]
+
+
+def report(label, seconds, queries=1):
+    print(f"  {label:<40} {seconds * 1000:10.2f} ms total  {seconds * 1000 / queries:10.3f} ms/consulta")
+
+
+def _linear_find_shortest_path(airspace, start_number, end_number):
+    """Dijkstra original que recorre la lista completa de segmentos en cada expansión"""
+    distances = {node: float('infinity') for node in airspace.navpoints}
+    distances[start_number] = 0
+    previous = {node: None for node in airspace.navpoints}
+    priority_queue = [(0, start_number)]
+
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if current_node == end_number:
+            break
+        if current_distance > distances[current_node]:
+            continue
+
+        neighbors = []
+        for segment in airspace.navsegments:
+            if segment.origin_number == current_node:
+                neighbors.append(segment.destination_number)
+            elif segment.destination_number == current_node:
+                neighbors.append(segment.origin_number)
+
+        for neighbor in neighbors:
+            segment = None
+            for seg in airspace.navsegments:
+                if (seg.origin_number == current_node and seg.destination_number == neighbor) or \
+                   (seg.destination_number == current_node and seg.origin_number == neighbor):
+                    segment = seg
+                    break
+            if segment:
+                distance = current_distance + segment.distance
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    previous[neighbor] = current_node
+                    heapq.heappush(priority_queue, (distance, neighbor))
+
+    return distances[end_number]
+
+
+@benchmark
+def bench_adjacency():
+    """Dijkstra con búsqueda lineal de segmentos frente al índice de adyacencia"""
+    airspace = load_airspace("Spain")
+    pairs = random_pairs(airspace, 5)
+    print(f"Índice de adyacencia ({len(airspace.navpoints)} puntos, {len(airspace.navsegments)} segmentos)")
+
+    start = time.perf_counter()
+    linear = [_linear_find_shortest_path(airspace, o, d) for o, d in pairs]
+    report("antes: búsqueda lineal", time.perf_counter() - start, len(pairs))
+
+    start = time.perf_counter()
+    indexed = [find_shortest_path(airspace, o, d)[1] for o, d in pairs]
+    report("después: índice de adyacencia", time.perf_counter() - start, len(pairs))
+
+    for (o, d), old, new in zip(pairs, linear, indexed):
+        if old != float('infinity') and o != d and abs(old - new) > 1e-6:
+            print(f"  ¡Diferencia en {o} -> {d}: {old} frente a {new}!")
+
+
+def _reference_distances(airspace, source):
+    """Dijkstra de un origen a todos los puntos usado como referencia de corrección"""
+    distances = {source: 0.0}
+    queue = [(0.0, source)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if distance > distances[node]:
+            continue
+        for neighbor in find_neighbors(airspace, node):
+            new_distance = distance + find_segment_between(airspace, node, neighbor).distance
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distances
+
+
+@benchmark
+def bench_astar():
+    """A* con montículo y heurística ortodrómica frente a Dijkstra, verificando todos los pares"""
+    for prefix, source_step in (("Cat", 1), ("Spain", 32)):
+        airspace = load_airspace(prefix)
+        numbers = sorted(airspace.navpoints)
+        sources = numbers[::source_step]
+        print(f"A* en {prefix}: {len(sources)} orígenes x {len(numbers)} destinos")
+
+        mismatches = 0
+        astar_time = 0.0
+        queries = 0
+        for source in sources:
+            reference = _reference_distances(airspace, source)
+            start = time.perf_counter()
+            for target in numbers:
+                if target == source:
+                    continue
+                path, distance = find_shortest_path_astar(airspace, source, target)
+                queries += 1
+                expected = reference.get(target)
+                if (expected is None) != (not path) or (path and abs(expected - distance) > 1e-6):
+                    mismatches += 1
+            astar_time += time.perf_counter() - start
+
+        report("A*", astar_time, queries)
+        pairs = random_pairs(airspace, 200)
+        start = time.perf_counter()
+        for origin, destination in pairs:
+            find_shortest_path(airspace, origin, destination)
+        report("Dijkstra (200 pares aleatorios)", time.perf_counter() - start, len(pairs))
+        print(f"  pares con distancia distinta a la de referencia: {mismatches}")
+
+
+@benchmark
+def bench_airport_matrix():
+    """Matriz de aeropuertos: cálculo, carga desde la caché y consultas por tabla"""
+    airspace = load_airspace("Spain")
+    names = sorted(airspace.navairports)
+    pairs = [(o, d) for o in names for d in names]
+    print(f"Matriz de aeropuertos ({len(names)} aeropuertos, {len(pairs)} pares)")
+
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        find_route_with_procedures(airspace, origin, destination)
+    report("consultas con A*", time.perf_counter() - start, len(pairs))
+
+    start = time.perf_counter()
+    build_airport_matrix(airspace, processes=1)
+    report("cálculo (1 proceso)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    build_airport_matrix(airspace, processes=None)
+    report("cálculo (todos los núcleos)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    hash_source_files(*airspace.source_files)
+    report("hash de los ficheros de entrada", time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        start = time.perf_counter()
+        precompute_airport_matrix(airspace, cache_dir=cache_dir)
+        report("cálculo y guardado en caché", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        precompute_airport_matrix(airspace, cache_dir=cache_dir)
+        report("carga desde la caché", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        find_route_with_procedures(airspace, origin, destination)
+    report("consultas por tabla", time.perf_counter() - start, len(pairs))
+
+
+@benchmark
+def bench_k_paths():
+    """Rutas alternativas con el algoritmo de Yen (k = 3 y k = 10)"""
+    airspace = load_airspace("Spain")
+    pairs = [(o, d) for o, d in random_pairs(airspace, 50) if o != d]
+    print(f"Rutas alternativas en Spain ({len(pairs)} pares aleatorios)")
+
+    for k, min_difference in ((3, None), (10, None), (3, 0.3)):
+        start = time.perf_counter()
+        for origin, destination in pairs:
+            find_multiple_paths_astar(airspace, origin, destination, max_paths=k, min_difference=min_difference)
+        label = f"k = {k}" + (f", diferencia >= {min_difference}" if min_difference else "")
+        report(label, time.perf_counter() - start, len(pairs))
+
+
+def write_synthetic_files(directory, points=50000, airports=1000, seed=7):
+    """Genera ficheros nav/seg/aer sintéticos del tamaño de una red europea"""
+    rng = random.Random(seed)
+    nav_file = os.path.join(directory, "Eur_nav.txt")
+    seg_file = os.path.join(directory, "Eur_seg.txt")
+    aer_file = os.path.join(directory, "Eur_aer.txt")
+
+    names = [f"P{i:05d}" for i in range(points - 2 * airports)]
+    for i in range(airports):
+        names.append(f"A{i:03d}.D")
+        names.append(f"A{i:03d}.A")
+    with open(nav_file, 'w') as f:
+        for number, name in enumerate(names, 1):
+            f.write(f"{number} {name} {rng.uniform(35, 60):.10f} {rng.uniform(-10, 30):.10f}\n")
+    with open(seg_file, 'w') as f:
+        for _ in range(points * 3 // 2):
+            f.write(f"{rng.randint(1, points)} {rng.randint(1, points)} {rng.uniform(10, 150):.6f}\n")
+    with open(aer_file, 'w') as f:
+        for i in range(airports):
+            f.write(f"LE{i:03d}\nA{i:03d}.D\nA{i:03d}.A\n")
+    return nav_file, seg_file, aer_file
+
+
+@benchmark
+def bench_name_index():
+    """Búsqueda de puntos por nombre: recorrido lineal frente al índice de nombres"""
+    print("Índice de nombres en una red sintética de 50000 puntos y 1000 aeropuertos")
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_synthetic_files(directory)
+        airspace = AirSpace()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_from_files(airspace, *files)
+        report("carga de la red sintética (nav+seg+aer)", time.perf_counter() - start)
+
+    names = [p.name for p in random.Random(3).sample(list(airspace.navpoints.values()), 200)]
+
+    start = time.perf_counter()
+    for name in names:
+        next((p for p in airspace.navpoints.values() if p.name == name), None)
+    report("antes: recorrido lineal", time.perf_counter() - start, len(names))
+
+    start = time.perf_counter()
+    for name in names:
+        get_navpoint_by_name(airspace, name)
+    report("después: índice de nombres", time.perf_counter() - start, len(names))
+
+
+def _time_name_search(airspace):
+    rng = random.Random(5)
+    names = [p.name for p in rng.sample(list(airspace.navpoints.values()), 500)]
+    prefixes = [name[:rng.randint(1, 4)] for name in names]
+    typos = []
+    for name in names:
+        i = rng.randrange(len(name))
+        typos.append(name[:i] + "X" + name[i + 1:])
+
+    start = time.perf_counter()
+    for prefix in prefixes:
+        [n for n in airspace.name_index if n.startswith(prefix)][:10]
+    report("antes: recorrido lineal por prefijo", time.perf_counter() - start, len(prefixes))
+
+    start = time.perf_counter()
+    search_names_by_prefix(airspace, "P")
+    report("construcción del índice", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for prefix in prefixes:
+        search_names_by_prefix(airspace, prefix)
+    report("prefijo", time.perf_counter() - start, len(prefixes))
+
+    start = time.perf_counter()
+    search_names_fuzzy(airspace, "P")
+    report("construcción de variantes (1ª aproximada)", time.perf_counter() - start)
+
+    for max_distance in (1, 2):
+        start = time.perf_counter()
+        for typo in typos:
+            search_names_fuzzy(airspace, typo, max_distance=max_distance)
+        report(f"aproximada (distancia {max_distance})", time.perf_counter() - start, len(typos))
+
+
+@benchmark
+def bench_name_search():
+    """Autocompletado: búsqueda por prefijo y con erratas"""
+    airspace = load_airspace("Spain")
+    print(f"Búsqueda de nombres en Spain ({len(airspace.navpoints)} puntos)")
+    _time_name_search(airspace)
+
+    # Los nombres sintéticos (P00000...) son casi todos parecidos entre sí, así
+    # que con distancia 2 cada consulta tiene cientos de coincidencias reales
+    print("Búsqueda de nombres en una red sintética de 50000 puntos y 1000 aeropuertos")
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_synthetic_files(directory)
+        airspace = AirSpace()
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_from_files(airspace, *files)
+    _time_name_search(airspace)
+
+
+@benchmark
+def bench_spatial():
+    """Consultas espaciales: recorrido lineal frente al árbol k-d"""
+    print("Índice espacial en una red sintética de 50000 puntos y 1000 aeropuertos")
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_synthetic_files(directory)
+        airspace = AirSpace()
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_from_files(airspace, *files)
+
+    rng = random.Random(9)
+    queries = [(rng.uniform(35, 60), rng.uniform(-10, 30)) for _ in range(200)]
+    points = list(airspace.navpoints.values())
+
+    start = time.perf_counter()
+    for latitude, longitude in queries[:20]:
+        query = NavPoint(0, "Q", latitude, longitude)
+        min(points, key=lambda p: calculate_distance(airspace, query, p))
+    report("antes: punto más cercano (lineal)", time.perf_counter() - start, 20)
+
+    start = time.perf_counter()
+    find_nearest_navpoints(airspace, 45.0, 10.0)
+    report("construcción del árbol k-d", time.perf_counter() - start)
+
+    for label, query in (("punto más cercano", lambda lat, lon: find_nearest_navpoints(airspace, lat, lon)),
+                         ("10 más cercanos", lambda lat, lon: find_nearest_navpoints(airspace, lat, lon, k=10)),
+                         ("radio de 50 km", lambda lat, lon: find_navpoints_within_radius(airspace, lat, lon, 50)),
+                         ("rectángulo de 1x1 grados",
+                          lambda lat, lon: find_navpoints_in_bbox(airspace, lat, lon, lat + 1, lon + 1)),
+                         ("ajuste al grafo", lambda lat, lon: snap_to_graph(airspace, lat, lon))):
+        start = time.perf_counter()
+        for latitude, longitude in queries:
+            query(latitude, longitude)
+        report(label, time.perf_counter() - start, len(queries))
+
+
+@benchmark
+def bench_distance_kernel():
+    """Distancias haversine una a una en Python frente al cálculo vectorizado con NumPy"""
+    print("Distancias vectorizadas en una red sintética de 50000 puntos y 75000 segmentos")
+    with tempfile.TemporaryDirectory() as directory:
+        files = write_synthetic_files(directory)
+        airspace = AirSpace()
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_from_files(airspace, *files)
+    points = list(airspace.navpoints.values())
+    origin = points[0]
+
+    start = time.perf_counter()
+    get_coordinate_arrays(airspace)
+    report("construcción de los arrays", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    [calculate_distance(airspace, origin, p) for p in points]
+    report("uno a todos (Python)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    one_to_many(get_coordinate_arrays(airspace), origin.latitude, origin.longitude)
+    report("uno a todos (NumPy)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for segment in airspace.navsegments:
+        point1 = airspace.navpoints.get(segment.origin_number)
+        point2 = airspace.navpoints.get(segment.destination_number)
+        if point1 and point2:
+            calculate_distance(airspace, point1, point2)
+    report("distancias de todos los segmentos (Python)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    segment_distances(airspace)
+    report("arrays y distancias de los segmentos (NumPy)", time.perf_counter() - start)
+
+    # En la red sintética las distancias son aleatorias: casi todos los segmentos se notifican
+    start = time.perf_counter()
+    invalid = validate_segment_distances(airspace)
+    report(f"validación ({len(invalid)} segmentos erróneos)", time.perf_counter() - start)
+
+    targets = [p.number for p in points[:3]]
+    start = time.perf_counter()
+    {p.number: min(calculate_distance(airspace, p, airspace.navpoints[t]) for t in targets) for p in points}
+    report("tabla de heurística, 3 destinos (Python)", time.perf_counter() - start)
+
+    start = time.perf_counter()
+    heuristic_table(airspace, targets)
+    report("tabla de heurística, 3 destinos (NumPy)", time.perf_counter() - start)
+
+
+def _line_by_line_load(airspace, nav_file, seg_file, aer_file):
+    """Cargador original: una línea cada vez y un add_* por cada punto y segmento"""
+    with open(nav_file, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 4:
+                add_navpoint(airspace, NavPoint(int(parts[0]), parts[1], float(parts[2]), float(parts[3])))
+    with open(seg_file, 'r') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3:
+                add_navsegment(airspace, NavSegment(int(parts[0]), int(parts[1]), float(parts[2])))
+    with open(aer_file, 'r') as f:
+        lines = [line.strip() for line in f if line.strip()]
+    for i in range(0, len(lines) - 2, 3):
+        if not lines[i].startswith(("LE", "LF")):
+            continue
+        airport = NavAirport(lines[i])
+        sid = get_navpoint_by_name(airspace, lines[i + 1])
+        star = get_navpoint_by_name(airspace, lines[i + 2])
+        if sid:
+            add_sid(airport, sid.number)
+            print(f"Agregado SID {sid.name} (#{sid.number}) al aeropuerto {airport.name}")
+        if star:
+            add_star(airport, star.number)
+            print(f"Agregado STAR {star.name} (#{star.number}) al aeropuerto {airport.name}")
+        add_navairport(airspace, airport)
+
+
+@benchmark
+def bench_loader():
+    """Carga de ficheros: línea a línea frente a la lectura en columnas"""
+    with tempfile.TemporaryDirectory() as directory:
+        datasets = (("Spain", ("Spain_nav.txt", "Spain_seg.txt", "Spain_aer.txt")),
+                    ("red sintética de 50000 puntos", write_synthetic_files(directory)))
+        for label, files in datasets:
+            print(f"Carga de {label}")
+            repeat = 20 if label == "Spain" else 1
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    _line_by_line_load(AirSpace(), *files)
+            report("antes: línea a línea", (time.perf_counter() - start) / repeat)
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                columns = read_network_columns(*files)
+            report("lectura en columnas (sin objetos)", (time.perf_counter() - start) / repeat)
+            for phase in ("nav", "seg", "aer"):
+                report(f"  fichero {phase}", columns.timings[phase])
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                airspace = AirSpace()
+                load_from_files(airspace, *files)
+            report("load_from_files (columnas + objetos)", (time.perf_counter() - start) / repeat)
+            report("  construcción de objetos e índices", airspace.load_timings["objects"])
+
+
+@benchmark
+def bench_snapshot():
+    """Arranque desde los ficheros de texto frente a la instantánea binaria"""
+    with tempfile.TemporaryDirectory() as directory:
+        datasets = (("Spain", ("Spain_nav.txt", "Spain_seg.txt", "Spain_aer.txt")),
+                    ("red sintética de 50000 puntos", write_synthetic_files(directory)))
+        for label, files in datasets:
+            print(f"Instantánea de {label}")
+            start = time.perf_counter()
+            load_from_files(AirSpace(), *files)
+            report("load_from_files", time.perf_counter() - start)
+
+            start = time.perf_counter()
+            load_with_snapshot(AirSpace(), *files, cache_dir=directory)
+            report("primera carga (texto + guardado)", time.perf_counter() - start)
+
+            start = time.perf_counter()
+            source_hash = hash_source_files(*files)
+            snapshot = open_snapshot(snapshot_path(files[0], source_hash, directory), source_hash)
+            report("hash y apertura con mmap (sin objetos)", time.perf_counter() - start)
+            del snapshot
+
+            start = time.perf_counter()
+            airspace = AirSpace()
+            load_with_snapshot(airspace, *files, cache_dir=directory)
+            report("carga desde la instantánea", time.perf_counter() - start)
+
+
+def _object_graph_bytes(airspace):
+    """Memoria aproximada de los segmentos como objetos y de sus índices de adyacencia"""
+    total = sys.getsizeof(airspace.navsegments) + sys.getsizeof(airspace.segment_index)
+    for segment in airspace.navsegments:
+        total += sys.getsizeof(segment) + sys.getsizeof(segment.__dict__)
+        total += sys.getsizeof(segment.distance)
+    for index in (airspace.outgoing, airspace.incoming):
+        total += sys.getsizeof(index) + sum(sys.getsizeof(segments) for segments in index.values())
+    total += sum(sys.getsizeof(key) for key in airspace.segment_index)
+    return total
+
+
+def _object_graph_search(airspace, source, target):
+    """Dijkstra no dirigido sobre los índices outgoing/incoming, como antes del grafo CSR"""
+    distances = {source: 0.0}
+    queue = [(0.0, source)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if node == target:
+            return distance
+        if distance > distances[node]:
+            continue
+        edges = [(s.destination_number, s.distance) for s in airspace.outgoing.get(node, ())]
+        edges += [(s.origin_number, s.distance) for s in airspace.incoming.get(node, ())]
+        for neighbor, weight in edges:
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return None
+
+
+@benchmark
+def bench_csr():
+    """Memoria por segmento y tiempo de búsqueda del grafo CSR frente a los objetos"""
+    airspace = load_airspace("Spain")
+    segments = len(airspace.navsegments)
+    print(f"Grafo CSR de Spain: {len(airspace.navpoints)} puntos, {segments} segmentos")
+
+    start = time.perf_counter()
+    graph = build_csr_graph(airspace)
+    report("construcción del grafo CSR", time.perf_counter() - start)
+    print(f"  memoria por segmento: CSR {graph.nbytes() / segments:.1f} bytes "
+          f"(arrays, ambos sentidos), objetos e índices {_object_graph_bytes(airspace) / segments:.1f} bytes")
+
+    pairs = [(o, d) for o, d in random_pairs(airspace, 300) if o != d]
+    start = time.perf_counter()
+    expected = [_object_graph_search(airspace, o, d) for o, d in pairs]
+    report("Dijkstra sobre objetos", time.perf_counter() - start, len(pairs))
+
+    start = time.perf_counter()
+    results = [find_shortest_path(airspace, o, d) for o, d in pairs]
+    report("Dijkstra sobre CSR", time.perf_counter() - start, len(pairs))
+
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        find_shortest_path_astar(airspace, origin, destination)
+    report("A* sobre CSR", time.perf_counter() - start, len(pairs))
+
+    mismatches = sum(1 for reference, (path, distance) in zip(expected, results)
+                     if (reference is None) != (not path) or (path and abs(reference - distance) > 1e-6))
+    print(f"  pares con distancia distinta a la de referencia: {mismatches}")
+
+
+class _DictNavPoint:
+    """NavPoint con __dict__ por instancia, como antes de __slots__"""
+    def __init__(self, number, name, latitude, longitude):
+        self.number = number
+        self.name = name
+        self.latitude = latitude
+        self.longitude = longitude
+
+
+class _DictNavSegment:
+    """NavSegment con __dict__ por instancia, como antes de __slots__"""
+    def __init__(self, origin_number, destination_number, distance):
+        self.origin_number = origin_number
+        self.destination_number = destination_number
+        self.distance = distance
+
+
+def _traced_memory(build):
+    """Memoria en bytes que sigue reservada tras build() (se conserva el resultado)"""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def _load_files(files):
+    airspace = AirSpace()
+    load_from_files(airspace, *files)
+    return airspace
+
+
+@benchmark
+def bench_models():
+    """Memoria de los modelos con __dict__, con __slots__ y por columnas"""
+    with tempfile.TemporaryDirectory() as directory:
+        datasets = (("Spain", ("Spain_nav.txt", "Spain_seg.txt", "Spain_aer.txt")),
+                    ("red sintética de 50000 puntos", write_synthetic_files(directory)))
+        for label, files in datasets:
+            with contextlib.redirect_stdout(io.StringIO()):
+                columns = read_network_columns(*files)
+            rows = (list(zip(columns.nav_numbers.tolist(), columns.nav_names, columns.nav_latitudes.tolist(),
+                             columns.nav_longitudes.tolist())),
+                    list(zip(columns.seg_origins.tolist(), columns.seg_destinations.tolist(),
+                             columns.seg_distances.tolist())))
+            count = len(rows[0]) + len(rows[1])
+            print(f"Modelos de {label}: {len(rows[0])} puntos y {len(rows[1])} segmentos")
+
+            def objects(point_class, segment_class):
+                return ([point_class(*row) for row in rows[0]], [segment_class(*row) for row in rows[1]])
+
+            for name, build in (("objetos con __dict__", lambda: objects(_DictNavPoint, _DictNavSegment)),
+                                ("objetos con __slots__", lambda: objects(NavPoint, NavSegment)),
+                                ("almacén por columnas", lambda: stores_from_columns(columns))):
+                size = _traced_memory(build)
+                print(f"  {name:<40} {size / 1024:10.1f} KiB  {size / count:8.1f} bytes/elemento")
+
+            size = _traced_memory(lambda: _load_files(files))
+            print(f"  {'AirSpace completo (load_from_files)':<40} {size / 1024:10.1f} KiB")
+
+
+@benchmark
+def bench_bidirectional():
+    """Dijkstra bidireccional frente al unidireccional en pares aleatorios"""
+    with tempfile.TemporaryDirectory() as directory:
+        datasets = (("Spain", load_airspace("Spain"), 300),
+                    ("red sintética de 50000 puntos", _load_files(write_synthetic_files(directory)), 20))
+        for label, airspace, count in datasets:
+            pairs = [(o, d) for o, d in random_pairs(airspace, count) if o != d]
+            print(f"Dijkstra bidireccional en {label}: {len(pairs)} pares")
+            for directed in (False, True):
+                mode = "dirigido" if directed else "no dirigido"
+                find_shortest_path(airspace, *pairs[0], directed=directed)  # construye los grafos CSR
+
+                start = time.perf_counter()
+                expected = [find_shortest_path(airspace, o, d, directed, bidirectional=False) for o, d in pairs]
+                single_time = time.perf_counter() - start
+                report(f"unidireccional ({mode})", single_time, len(pairs))
+
+                start = time.perf_counter()
+                results = [find_shortest_path(airspace, o, d, directed) for o, d in pairs]
+                both_time = time.perf_counter() - start
+                report(f"bidireccional ({mode})", both_time, len(pairs))
+
+                mismatches = sum(1 for (_, reference), (_, distance) in zip(expected, results)
+                                 if abs(reference - distance) > 1e-6)
+                print(f"  aceleración {single_time / both_time:.2f}x, pares con distancia distinta: {mismatches}")
+
+
+@benchmark
+def bench_contraction():
+    """Jerarquía de contracción: preproceso, carga desde la caché y consultas frente a Dijkstra"""
+    for prefix in ("Cat", "Spain"):
+        airspace = load_airspace(prefix)
+        pairs = [(o, d) for o, d in random_pairs(airspace, 1000) if o != d]
+        print(f"Jerarquía de contracción de {prefix}: {len(pairs)} pares aleatorios")
+        for directed in (False, True):
+            mode = "dirigido" if directed else "no dirigido"
+            start = time.perf_counter()
+            hierarchy = build_contraction_hierarchy(airspace, directed)
+            report(f"preproceso ({mode}, {hierarchy.shortcut_count} atajos)", time.perf_counter() - start)
+
+            with tempfile.TemporaryDirectory() as directory:
+                precompute_contraction_hierarchy(airspace, directory, directed)
+                start = time.perf_counter()
+                precompute_contraction_hierarchy(airspace, directory, directed)
+                report("carga desde la caché", time.perf_counter() - start)
+
+            start = time.perf_counter()
+            expected = [find_shortest_path(airspace, o, d, directed) for o, d in pairs]
+            report(f"Dijkstra bidireccional ({mode})", time.perf_counter() - start, len(pairs))
+
+            start = time.perf_counter()
+            results = [find_shortest_path_ch(airspace, o, d, directed) for o, d in pairs]
+            report(f"jerarquía ({mode})", time.perf_counter() - start, len(pairs))
+
+            mismatches = sum(1 for (_, reference), (_, distance) in zip(expected, results)
+                             if abs(reference - distance) > 1e-6)
+            print(f"  pares con distancia distinta a la de Dijkstra: {mismatches}")
+
+
+def _settled_per_query(airspace, pairs, directed, **options):
+    """Distancias, nodos expandidos por consulta y tiempo total de astar_search"""
+    stats = {}
+    distances = []
+    settled = 0
+    start = time.perf_counter()
+    for origin, destination in pairs:
+        distances.append(astar_search(airspace, [origin], [destination], directed=directed, stats=stats, **options)[1])
+        settled += stats["settled"]
+    return distances, settled / len(pairs), time.perf_counter() - start
+
+
+@benchmark
+def bench_landmarks():
+    """Nodos expandidos por A* con landmarks (ALT) frente a la búsqueda de coste uniforme"""
+    for prefix in ("Cat", "Spain"):
+        airspace = load_airspace(prefix)
+        pairs = [(o, d) for o, d in random_pairs(airspace, 500) if o != d]
+        print(f"Landmarks en {prefix}: {len(pairs)} pares aleatorios")
+        for directed in (False, True):
+            mode = "dirigido" if directed else "no dirigido"
+            expected, settled, seconds = _settled_per_query(airspace, pairs, directed, use_heuristic=False)
+            report(f"coste uniforme ({mode}, {settled:.1f} nodos)", seconds, len(pairs))
+            _, settled, seconds = _settled_per_query(airspace, pairs, directed)
+            report(f"ortodrómica ({mode}, {settled:.1f} nodos)", seconds, len(pairs))
+
+            start = time.perf_counter()
+            table = precompute_landmarks(airspace, 8, directed)
+            report(f"preproceso de {len(table)} landmarks ({table.nbytes() // 1024} KiB)",
+                   time.perf_counter() - start)
+            distances, settled, seconds = _settled_per_query(airspace, pairs, directed)
+            report(f"ALT ({mode}, {settled:.1f} nodos)", seconds, len(pairs))
+
+            mismatches = sum(1 for a, b in zip(expected, distances) if a != b and abs(a - b) > 1e-6)
+            print(f"  pares con distancia distinta a la de coste uniforme: {mismatches}")
+            airspace.derived.pop("landmarks_directed" if directed else "landmarks")
+
+
+@benchmark
+def bench_route_cache():
+    """Consultas repetidas como las de la interfaz, con y sin la caché de rutas"""
+    airspace = load_airspace("Spain")
+    pairs = random_pairs(airspace, 50) * 10
+    random.Random(3).shuffle(pairs)
+    print(f"Caché de rutas en Spain: {len(pairs)} consultas sobre 50 pares distintos")
+
+    start = time.perf_counter()
+    expected = [find_shortest_path_astar(airspace, o, d) for o, d in pairs]
+    report("find_shortest_path_astar", time.perf_counter() - start, len(pairs))
+
+    start = time.perf_counter()
+    results = [cached_shortest_path_astar(airspace, o, d) for o, d in pairs]
+    report("con caché", time.perf_counter() - start, len(pairs))
+
+    stats = get_route_cache(airspace).stats()
+    mismatches = sum(1 for a, b in zip(expected, results) if a != b)
+    print(f"  aciertos {stats['hits']}, fallos {stats['misses']}, rutas distintas: {mismatches}")
+
+
+@benchmark
+def bench_path_tree():
+    """Rutas de un origen a todos los destinos con un árbol frente a consultas independientes"""
+    airspace = load_airspace("Spain")
+    airports = sorted(airspace.navairports)
+    origin = airports[0]
+    destinations = airports[1:]
+    print(f"Árbol de caminos mínimos en Spain: de {origin} a {len(destinations)} aeropuertos")
+
+    start = time.perf_counter()
+    expected = [find_shortest_path_astar(airspace, origin, d)[1] for d in destinations]
+    report("A* por destino", time.perf_counter() - start, len(destinations))
+
+    start = time.perf_counter()
+    results = shortest_paths_from(airspace, origin, destinations)
+    report("árbol + reconstrucción", time.perf_counter() - start, len(destinations))
+
+    start = time.perf_counter()
+    shortest_paths_from(airspace, origin, destinations)
+    report("reconstrucción con el árbol ya calculado", time.perf_counter() - start, len(destinations))
+
+    mismatches = sum(1 for a, (path, b) in zip(expected, results)
+                     if (a == 0) != (not path) or (path and abs(a - b) > 1e-6))
+    print(f"  destinos con distancia distinta a la de A*: {mismatches}")
+
+    numbers = sorted(airspace.navpoints)
+    start = time.perf_counter()
+    for number in numbers[:100]:
+        tree = get_shortest_path_tree(airspace, number)
+        tree.reachable_within(200.0)
+    report("árbol completo + isocrona de 200 km", time.perf_counter() - start, 100)
+
+    start = time.perf_counter()
+    for number in numbers[:100]:
+        find_reachable_within(airspace, number, 200.0)
+    report("isocrona acotada de 200 km", time.perf_counter() - start, 100)
+
+
+@benchmark
+def bench_batch():
+    """Rutas por lotes con 1, 2 y 4 procesos (escalado con el número de núcleos)"""
+    airspace = load_airspace("Spain")
+    files = ("Spain_nav.txt", "Spain_seg.txt", "Spain_aer.txt")
+    rng = random.Random(5)
+    names = [p.name for p in airspace.navpoints.values()] + sorted(airspace.navairports)
+    pairs = [(rng.choice(names), rng.choice(names)) for _ in range(2000)]
+    print(f"Rutas por lotes en Spain: {len(pairs)} pares, {os.cpu_count()} núcleos disponibles")
+
+    baseline = None
+    for processes in (1, 2, 4):
+        start = time.perf_counter()
+        results = list(solve_batch(airspace, files, pairs, processes, chunksize=32))
+        seconds = time.perf_counter() - start
+        baseline = baseline or seconds
+        report(f"{processes} proceso(s), aceleración {baseline / seconds:.2f}x", seconds, len(pairs))
+    query_time = sum(r["time_ms"] for r in results) / len(results)
+    print(f"  tiempo medio por consulta dentro del proceso: {query_time:.3f} ms")
+
+
+def _import_seconds(statement, repetitions=5):
+    """Mejor tiempo de una importación en un intérprete nuevo, o None si falla"""
+    code = ("import time; start = time.perf_counter(); " + statement +
+            "; print(time.perf_counter() - start)")
+    times = []
+    for _ in range(repetitions):
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode != 0:
+            return None, result.stderr.strip().splitlines()[-1]
+        times.append(float(result.stdout))
+    return min(times), ""
+
+
+@benchmark
+def bench_import():
+    """Tiempo de importación del servicio de rutas frente a la interfaz gráfica"""
+    statements = [
+        ("routing_service", "import routing_service"),
+        ("tkinter + matplotlib (TkAgg) + PIL", "import tkinter, PIL.ImageTk, "
+                                               "matplotlib.backends.backend_tkagg, matplotlib.figure"),
+        ("interface_v4", "import interface_v4"),
+    ]
+    print("Importación en un intérprete nuevo (mejor de 5):")
+    for label, statement in statements:
+        seconds, error = _import_seconds(statement)
+        if seconds is None:
+            print(f"  {label:<36} no disponible ({error})")
+        else:
+            print(f"  {label:<36} {seconds * 1000:9.1f} ms")
+
+
+def _best_time_and_peak(function, repetitions=5):
+    """Mejor tiempo de function() y pico de memoria reservada en otra ejecución con tracemalloc"""
+    seconds = min(timeit.repeat(function, number=1, repeat=repetitions))
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak
+
+
+@benchmark
+def bench_kml():
+    """Exportación KML del espacio aéreo: documento en memoria frente a escritura incremental"""
+    airspace = load_airspace("Spain")
+    with tempfile.TemporaryDirectory() as directory:
+        in_memory = os.path.join(directory, "memoria.kml")
+        streamed = os.path.join(directory, "incremental.kml")
+
+        def write_streamed():
+            with open(streamed, 'w', encoding='utf-8') as f:
+                write_airspace_kml(airspace, f)
+
+        print(f"KML de Spain ({len(airspace.navpoints)} puntos, {len(airspace.navsegments)} segmentos):")
+        for label, function, filename in (
+                ("generate_airspace_kml + save_kml_to_file",
+                 lambda: save_kml_to_file(generate_airspace_kml(airspace), in_memory), in_memory),
+                ("write_airspace_kml (incremental)", write_streamed, streamed)):
+            seconds, peak = _best_time_and_peak(function)
+            print(f"  {label:<42} {seconds * 1000:8.1f} ms  pico {peak / 1e6:6.2f} MB  "
+                  f"fichero {os.path.getsize(filename) / 1e6:.2f} MB")
+        with open(in_memory, 'rb') as a, open(streamed, 'rb') as b:
+            print(f"  ficheros idénticos: {a.read() == b.read()}")
+
+
+@benchmark
+def bench_kmz():
+    """Tamaño y tiempo de escritura del KML frente al KMZ con carpetas y segmentos fusionados"""
+    airspace = load_airspace("Spain")
+    with tempfile.TemporaryDirectory() as directory:
+        kml_file = os.path.join(directory, "espacio.kml")
+        kmz_file = os.path.join(directory, "espacio.kmz")
+        merged_file = os.path.join(directory, "fusionado.kmz")
+
+        def write_kml():
+            with open(kml_file, 'w', encoding='utf-8') as f:
+                write_airspace_kml(airspace, f)
+
+        print(f"Exportación de Spain ({len(airspace.navpoints)} puntos, {len(airspace.navsegments)} segmentos):")
+        baseline = None
+        for label, function, filename in (
+                (".kml (write_airspace_kml)", write_kml, kml_file),
+                (".kmz con carpetas", lambda: save_airspace_kmz(airspace, kmz_file), kmz_file),
+                (".kmz con MultiGeometry", lambda: save_airspace_kmz(airspace, merged_file, True), merged_file)):
+            seconds = min(timeit.repeat(function, number=1, repeat=5))
+            size = os.path.getsize(filename)
+            baseline = baseline or size
+            print(f"  {label:<28} {seconds * 1000:8.1f} ms  {size / 1e3:9.1f} kB  ({size / baseline:6.1%} del .kml)")
+
+
+@benchmark
+def bench_kml_tiles():
+    """Exportación KML por teselas (Region/NetworkLink) de una red del tamaño de Europa"""
+    with tempfile.TemporaryDirectory() as directory:
+        airspace = _load_files(write_synthetic_files(directory))
+        print(f"Red sintética: {len(airspace.navpoints)} puntos, {len(airspace.navsegments)} segmentos")
+
+        monolithic = os.path.join(directory, "espacio.kml")
+        start = time.perf_counter()
+        with open(monolithic, 'w', encoding='utf-8') as f:
+            write_airspace_kml(airspace, f)
+        report("KML único (write_airspace_kml)", time.perf_counter() - start)
+
+        start = time.perf_counter()
+        grid, root = build_tiles(airspace)
+        report("reparto en el quadtree", time.perf_counter() - start)
+        tiles = list(root.walk())
+        for processes in (1, 2, 4):
+            output = os.path.join(directory, f"teselas_{processes}")
+            start = time.perf_counter()
+            write_tiles(grid, root, output, processes)
+            report(f"escritura de {len(tiles)} teselas, {processes} proceso(s)", time.perf_counter() - start)
+        start = time.perf_counter()
+        write_root_kml(airspace, grid, root, output)
+        report("documento raíz (aeropuertos)", time.perf_counter() - start)
+
+        tiles_directory = os.path.join(output, TILES_DIRECTORY)
+        sizes = sorted(os.path.getsize(os.path.join(tiles_directory, name)) for name in os.listdir(tiles_directory))
+        print(f"  KML único: {os.path.getsize(monolithic) / 1e6:.1f} MB; raíz {os.path.getsize(os.path.join(output, ROOT_FILE)) / 1e3:.1f} kB, "
+              f"teselas de {sizes[0] / 1e3:.1f} a {sizes[-1] / 1e3:.1f} kB (mediana {sizes[len(sizes) // 2] / 1e3:.1f} kB), "
+              f"{max(t.level for t in tiles)} niveles")
+
+
+def _linear_airport_coordinates(airspace, name, airport):
+    """Búsqueda original: primer punto con el nombre del aeropuerto o que sea uno de sus SIDs o STARs"""
+    for point in airspace.navpoints.values():
+        if point.name == name or point.number in airport.sids or point.number in airport.stars:
+            return point.longitude, point.latitude
+    return None
+
+
+@benchmark
+def bench_airport_positions():
+    """Coordenadas de los aeropuertos: recorrido de todos los puntos frente a la posición guardada"""
+    with tempfile.TemporaryDirectory() as directory:
+        datasets = (("Spain", load_airspace("Spain")),
+                    ("red sintética de 50000 puntos", _load_files(write_synthetic_files(directory))))
+        for label, airspace in datasets:
+            airports = list(airspace.navairports.items())
+            print(f"{label}: {len(airports)} aeropuertos, {len(airspace.navpoints)} puntos")
+
+            start = time.perf_counter()
+            for name, airport in airports:
+                _linear_airport_coordinates(airspace, name, airport)
+            report("recorrido lineal por aeropuerto", time.perf_counter() - start, len(airports))
+
+            airspace.derived.pop("airport_positions", None)
+            start = time.perf_counter()
+            for name, airport in airports:
+                get_airport_position(airspace, airport)
+            report("get_airport_position (incluye el cálculo)", time.perf_counter() - start, len(airports))
+
+            start = time.perf_counter()
+            for name, airport in airports:
+                get_airport_position(airspace, airport)
+            report("get_airport_position (ya calculadas)", time.perf_counter() - start, len(airports))
+
+
+def _per_artist_map(ax, airspace, route=None, show_nodes=True, show_segments=True, show_distances=True):
+    """Dibujo original del mapa: un plot, un annotate y un text por segmento y un scatter y un text por punto"""
+    lon_min, lon_max, lat_min, lat_max = map_bounds(airspace)
+    ax.clear()
+    ax.set_xlim(lon_min, lon_max)
+    ax.set_ylim(lat_min, lat_max)
+    ax.set_autoscale_on(False)
+    route_numbers = {p.number for p in route} if route else set()
+    route_edges = set()
+    for first, second in zip(route or [], (route or [])[1:]):
+        route_edges.update(((first.number, second.number), (second.number, first.number)))
+    if show_segments:
+        for segment in airspace.navsegments:
+            point1 = airspace.navpoints.get(segment.origin_number)
+            point2 = airspace.navpoints.get(segment.destination_number)
+            if not point1 or not point2 or (route and (point1.number, point2.number) not in route_edges):
+                continue
+            color, width = ('#00CCCC', 1.5) if route else ('cyan', 1.0)
+            x = [point1.longitude, point2.longitude]
+            y = [point1.latitude, point2.latitude]
+            ax.plot(x, y, color=color, linewidth=width, clip_on=True, zorder=5)
+            ax.annotate('', xy=(x[0] + 0.5 * (x[1] - x[0]), y[0] + 0.5 * (y[1] - y[0])),
+                        xytext=(x[0] + 0.48 * (x[1] - x[0]), y[0] + 0.48 * (y[1] - y[0])),
+                        arrowprops=dict(arrowstyle='-|>', color=color, shrinkA=0, shrinkB=0, lw=width * 1.5,
+                                        mutation_scale=12, clip_on=True), clip_on=True)
+            if show_distances:
+                ax.text(sum(x) / 2, sum(y) / 2, f"{segment.distance:.1f}", fontsize=6, ha='center', va='center',
+                        bbox=dict(facecolor='white', alpha=0.5, pad=0.5), zorder=2, clip_on=True)
+    if show_nodes:
+        for point in airspace.navpoints.values():
+            on_route = point.number in route_numbers
+            ax.scatter(point.longitude, point.latitude, color='#00CCCC' if on_route else 'black',
+                       s=10 if on_route else (4 if route else 5), alpha=0.5 if route and not on_route else 1.0,
+                       zorder=20 if on_route else 10, clip_on=True)
+            ax.text(point.longitude + 0.01, point.latitude + 0.01, point.name, fontsize=6, ha='left',
+                    va='bottom', zorder=6, clip_on=True)
+        for code, airport in airspace.navairports.items():
+            position = get_airport_position(airspace, airport)
+            if position:
+                ax.scatter(position[1], position[0], marker='^', color='green', s=40, zorder=15, clip_on=True)
+                ax.text(position[1] + 0.01, position[0] - 0.01, code, fontsize=7, ha='left', va='top',
+                        color='green', zorder=15, clip_on=True)
+
+
+def _map_axes():
+    figure = Figure(figsize=(15, 12), dpi=100)
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot(111)
+
+
+def _best_of(function, repetitions=3):
+    return min(timeit.repeat(function, number=1, repeat=repetitions))
+
+
+@benchmark
+def bench_map_render():
+    """Mapa de Spain con Agg: un artista por elemento frente a LineCollection, quiver y un único scatter"""
+    airspace = load_airspace("Spain")
+    route, _ = find_shortest_path_astar(airspace, "LEBL", "LEMD")
+    print(f"Mapa de Spain ({len(airspace.navpoints)} puntos, {len(airspace.navsegments)} segmentos), "
+          f"figura de 1500x1200 píxeles:")
+    for label, options in (("todas las capas", {}),
+                           ("sin distancias", {"show_distances": False}),
+                           ("solo segmentos", {"show_nodes": False, "show_distances": False}),
+                           (f"ruta de {len(route)} puntos", {"route": route})):
+        figure, ax = _map_axes()
+
+        def per_artist():
+            _per_artist_map(ax, airspace, **options)
+            figure.canvas.draw()
+
+        def collections():
+            ax.clear()
+            draw_airspace_map(ax, airspace, **options)
+            figure.canvas.draw()
+
+        old = _best_of(per_artist)
+        new = _best_of(collections)
+        print(f"  {label:<22} por artista {old * 1000:8.1f} ms   colecciones {new * 1000:8.1f} ms   "
+              f"({old / new:.1f}x)")
+
+    # Ocultar los nodos: el dibujo original rehacía todo el mapa; ahora solo cambia la visibilidad
+    figure, ax = _map_axes()
+    old = _best_of(lambda: (_per_artist_map(ax, airspace, show_nodes=False, show_distances=False),
+                            figure.canvas.draw()))
+    figure, ax = _map_axes()
+    airspace_map = draw_airspace_map(ax, airspace, show_distances=False)
+    figure.canvas.draw()
+    times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        airspace_map.update(show_nodes=False, show_distances=False)
+        figure.canvas.draw()
+        times.append(time.perf_counter() - start)
+        airspace_map.update(show_distances=False)
+    new = min(times)
+    print(f"  {'ocultar nodos':<22} redibujo    {old * 1000:8.1f} ms   visibilidad {new * 1000:8.1f} ms   "
+          f"({old / new:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de navegación aérea")
+    parser.add_argument("names", nargs="*", help=f"benchmarks a ejecutar: {', '.join(sorted(BENCHMARKS))}")
+    args = parser.parse_args()
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"benchmark desconocido: {', '.join(unknown)}")
+
+    for name in args.names or sorted(BENCHMARKS):
+        BENCHMARKS[name]()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Lectura en bloque de los ficheros nav/seg/aer.
+
+Cada fichero se lee entero de una vez y se trocea con un único split; si todas
+las líneas tienen el número de columnas esperado, las columnas se convierten
+directamente a arrays de NumPy sin recorrer las líneas una a una. Los NavPoint y
+NavSegment no se crean al leer: NetworkColumns los construye cuando se piden.
+"""
+
+import logging
+import time
+
+import numpy as np
+
+from navPoint import NavPoint
+from navSegment import NavSegment
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkColumns:
+    """Contenido de los ficheros nav/seg/aer en columnas"""
+    def __init__(self, nav_numbers, nav_names, nav_latitudes, nav_longitudes,
+                 seg_origins, seg_destinations, seg_distances, airports, timings=None):
+        self.nav_numbers = nav_numbers  # np.int64
+        self.nav_names = nav_names  # lista de str
+        self.nav_latitudes = nav_latitudes  # np.float64, grados
+        self.nav_longitudes = nav_longitudes  # np.float64, grados
+        self.seg_origins = seg_origins  # np.int64
+        self.seg_destinations = seg_destinations  # np.int64
+        self.seg_distances = seg_distances  # np.float64
+        self.airports = airports  # lista de (código, nombre del SID o None, nombre del STAR o None)
+        # Alternativa a airports con los procedimientos ya resueltos: (código, [SIDs], [STARs]) por número
+        self.airport_procedures = None
+        self.timings = timings or {}  # fase de la carga (nav, seg, aer...) -> segundos
+
+    def navpoint(self, i):
+        return NavPoint(int(self.nav_numbers[i]), self.nav_names[i],
+                        float(self.nav_latitudes[i]), float(self.nav_longitudes[i]))
+
+    def navsegment(self, i):
+        return NavSegment(int(self.seg_origins[i]), int(self.seg_destinations[i]), float(self.seg_distances[i]))
+
+    def navpoints(self):
+        """Genera los NavPoint en el orden del fichero"""
+        for number, name, latitude, longitude in zip(self.nav_numbers.tolist(), self.nav_names,
+                                                     self.nav_latitudes.tolist(), self.nav_longitudes.tolist()):
+            yield NavPoint(number, name, latitude, longitude)
+
+    def navsegments(self):
+        """Genera los NavSegment en el orden del fichero"""
+        for origin, destination, distance in zip(self.seg_origins.tolist(), self.seg_destinations.tolist(),
+                                                 self.seg_distances.tolist()):
+            yield NavSegment(origin, destination, distance)
+
+
+def _is_data_line(line, converters):
+    parts = line.split()
+    if len(parts) < len(converters):
+        return False
+    try:
+        for part, converter in zip(parts, converters):
+            if converter is not None:
+                converter(part)
+    except ValueError:
+        return False
+    return True
+
+
+def _read_columns(path, converters):
+    """
+    Lee un fichero de columnas separadas por espacios. La primera línea se
+    descarta si no tiene el formato de los datos (cabecera).
+
+    Args:
+        path: Ruta del fichero
+        converters: Conversor de cada columna (int, float o None para dejar el texto)
+
+    Returns:
+        Lista con una lista de valores por columna
+    """
+    with open(path, 'r') as f:
+        text = f.read()
+
+    lines = text.splitlines()
+    if lines and not _is_data_line(lines[0], converters):
+        lines = lines[1:]
+    width = len(converters)
+
+    data_lines = [line for line in lines if line and not line.isspace()]
+    # Cada línea debe tener exactamente width columnas: una columna de más en una
+    # línea y una de menos en otra darían el mismo total y descuadrarían el resto
+    if set(map(len, map(str.split, data_lines))) == {width}:
+        tokens = "\n".join(data_lines).split()
+        return _convert([tokens[c::width] for c in range(width)], converters)
+
+    # Líneas con columnas de más o de menos: se procesa línea a línea como antes
+    rows = [line.split() for line in data_lines]
+    rows = [parts[:width] for parts in rows if len(parts) >= width]
+    return _convert([[parts[c] for parts in rows] for c in range(width)], converters)
+
+
+def _convert(raw_columns, converters):
+    return [list(map(converter, column)) if converter is not None else column
+            for column, converter in zip(raw_columns, converters)]
+
+
+def read_nav_columns(path):
+    """Lee un fichero nav: (números, nombres, latitudes, longitudes)"""
+    numbers, names, latitudes, longitudes = _read_columns(path, (int, None, float, float))
+    return (np.array(numbers, dtype=np.int64), names,
+            np.array(latitudes, dtype=np.float64), np.array(longitudes, dtype=np.float64))
+
+
+def read_seg_columns(path):
+    """Lee un fichero seg: (orígenes, destinos, distancias)"""
+    origins, destinations, distances = _read_columns(path, (int, int, float))
+    return (np.array(origins, dtype=np.int64), np.array(destinations, dtype=np.int64),
+            np.array(distances, dtype=np.float64))
+
+
+def read_aer_entries(path):
+    """
+    Lee un fichero aer: cada aeropuerto (LExx o LFxx) va seguido de la línea de
+    su SID (.D) y la de su STAR (.A).
+
+    Returns:
+        Lista de tuplas (código, nombre del SID, nombre del STAR); los nombres
+        son None si las dos líneas siguientes no tienen ese formato.
+    """
+    with open(path, 'r') as f:
+        lines = f.read().splitlines()
+
+    if lines:
+        parts = lines[0].split()
+        if len(parts) < 1 or parts[0].startswith('#'):
+            lines = lines[1:]
+    lines = [line.strip() for line in lines if line.strip()]
+
+    airports = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith(("LE", "LF")) and "." not in line:
+            sid_name = star_name = None
+            if i + 2 < len(lines) and lines[i + 1].endswith(".D") and lines[i + 2].endswith(".A"):
+                sid_name = lines[i + 1]
+                star_name = lines[i + 2]
+            airports.append((line, sid_name, star_name))
+            # Saltar las líneas del SID y del STAR
+            i += 3
+        else:
+            i += 1
+    return airports
+
+
+def read_network_columns(nav_file, seg_file, aer_file):
+    """Lee los tres ficheros en columnas y registra el tiempo de cada uno"""
+    timings = {}
+
+    start = time.perf_counter()
+    nav = read_nav_columns(nav_file)
+    timings["nav"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    seg = read_seg_columns(seg_file)
+    timings["seg"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    airports = read_aer_entries(aer_file)
+    timings["aer"] = time.perf_counter() - start
+
+    logger.info("Leídos %d puntos (%.1f ms), %d segmentos (%.1f ms) y %d aeropuertos (%.1f ms)",
+                len(nav[0]), timings["nav"] * 1000, len(seg[0]), timings["seg"] * 1000,
+                len(airports), timings["aer"] * 1000)
+    return NetworkColumns(*nav, *seg, airports, timings)
@@ -0,0 +1,431 @@
+"""
+Jerarquía de contracción (contraction hierarchies) para consultas punto a punto.
+
+El preproceso contrae los puntos uno a uno en orden de importancia creciente
+(diferencia de tramos más vecinos ya contraídos): al quitar un punto v se añade
+un atajo u -> w con peso u -> v -> w salvo que una búsqueda local encuentre un
+camino igual de corto que no pase por v. Cada tramo, original o atajo, queda
+guardado en el extremo de menor rango: en up los que suben desde el nodo y en
+down los que llegan a él desde un nodo de mayor rango.
+
+Una consulta es un Dijkstra bidireccional que solo sube de rango: hacia
+delante por up desde el origen y hacia atrás por down desde el destino. Los
+atajos guardan el punto contraído que sustituyen (middles), así que la ruta se
+desempaqueta a la secuencia original de puntos.
+"""
+
+import heapq
+import logging
+import os
+import struct
+import sys
+from array import array
+
+from airSpace import get_derived, set_derived, matches_source_files
+from airport_matrix import hash_source_files
+from csr_graph import get_csr_graph
+
+logger = logging.getLogger(__name__)
+
+CH_MAGIC = b"CHRC"
+CH_VERSION = 2  # 2: números de punto en 64 bits
+# magic, versión, dirigido, hash sha256, nº de nodos, nº de tramos up, nº de tramos down
+HEADER_FORMAT = "<4sHH32sIII"
+# Nodos asentados como máximo en cada búsqueda de testigos: si se alcanza, el atajo se añade
+WITNESS_SETTLE_LIMIT = 60
+
+
+class ContractionHierarchy:
+    """Grafo de búsqueda de la jerarquía en formato CSR (ver build_contraction_hierarchy)"""
+    def __init__(self, node_numbers, rank, up_offsets, up_targets, up_weights, up_middles,
+                 down_offsets, down_targets, down_weights, down_middles, directed=False, source_hash=b""):
+        self.node_numbers = node_numbers  # array('q'): identificador denso -> número de punto
+        self.rank = rank  # array('i'): orden de contracción de cada nodo
+        # Tramos u -> w con rank[w] > rank[u], agrupados por u
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_middles = up_middles  # array('i'): nodo contraído del atajo o -1 si es un tramo original
+        # Tramos x -> u con rank[x] > rank[u], agrupados por u (el destino guardado es x)
+        self.down_offsets = down_offsets
+        self.down_targets = down_targets
+        self.down_weights = down_weights
+        self.down_middles = down_middles
+        self.directed = directed
+        self.source_hash = source_hash
+        self.node_index = {number: i for i, number in enumerate(node_numbers)}
+
+    def __len__(self):
+        return len(self.node_numbers)
+
+    @property
+    def shortcut_count(self):
+        return (sum(1 for m in self.up_middles if m >= 0) +
+                sum(1 for m in self.down_middles if m >= 0))
+
+
+def _witness_distances(out_edges, source, excluded, max_cost):
+    """Dijkstra local desde source sin pasar por excluded, hasta max_cost o el límite de nodos"""
+    distances = {source: 0.0}
+    queue = [(0.0, source)]
+    settled = 0
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if distance > distances[node]:
+            continue
+        if distance > max_cost:
+            break
+        settled += 1
+        if settled > WITNESS_SETTLE_LIMIT:
+            break
+        for neighbor, weight in out_edges[node].items():
+            if neighbor == excluded:
+                continue
+            new_distance = distance + weight
+            if new_distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distances
+
+
+def _shortcuts(out_edges, in_edges, node):
+    """Atajos (u, w, peso) necesarios para contraer node en el grafo restante"""
+    shortcuts = []
+    outgoing = out_edges[node]
+    if not outgoing:
+        return shortcuts
+    max_out = max(outgoing.values())
+    for u, weight_in in in_edges[node].items():
+        max_cost = weight_in + max_out
+        witnesses = _witness_distances(out_edges, u, node, max_cost)
+        for w, weight_out in outgoing.items():
+            if w == u:
+                continue
+            cost = weight_in + weight_out
+            if witnesses.get(w, float('inf')) > cost:
+                shortcuts.append((u, w, cost))
+    return shortcuts
+
+
+def _priority(out_edges, in_edges, deleted_neighbors, node, shortcuts=None):
+    if shortcuts is None:
+        shortcuts = _shortcuts(out_edges, in_edges, node)
+    removed = len(out_edges[node]) + len(in_edges[node])
+    return len(shortcuts) - removed + deleted_neighbors[node]
+
+
+def _to_csr(count, edges):
+    """edges: lista por nodo de (destino, peso, nodo intermedio) -> arrays CSR"""
+    offsets = array('i', [0])
+    targets = array('i')
+    weights = array('d')
+    middles = array('i')
+    for node in range(count):
+        for target, weight, middle in edges[node]:
+            targets.append(target)
+            weights.append(weight)
+            middles.append(middle)
+        offsets.append(len(targets))
+    return offsets, targets, weights, middles
+
+
+def build_contraction_hierarchy(airspace, directed=False):
+    """
+    Contrae el grafo de segmentos del espacio aéreo.
+
+    Args:
+        airspace: Instancia de AirSpace
+        directed: Si es True, los segmentos solo se recorren de origen a destino
+
+    Returns:
+        Una instancia de ContractionHierarchy
+    """
+    graph = get_csr_graph(airspace, directed)
+    count = len(graph)
+
+    # Grafo restante: solo el tramo más corto entre cada par de nodos, sin bucles
+    out_edges = [{} for _ in range(count)]
+    in_edges = [{} for _ in range(count)]
+    for u in range(count):
+        for w, weight in graph.edges(u):
+            if w != u and weight < out_edges[u].get(w, float('inf')):
+                out_edges[u][w] = weight
+                in_edges[w][u] = weight
+    middles = {}  # (u, w) -> nodo contraído que sustituye el atajo
+
+    deleted_neighbors = [0] * count
+    queue = [(_priority(out_edges, in_edges, deleted_neighbors, node), node) for node in range(count)]
+    heapq.heapify(queue)
+    rank = array('i', [0]) * count
+    contracted = [False] * count
+    up = [[] for _ in range(count)]
+    down = [[] for _ in range(count)]
+
+    next_rank = 0
+    while queue:
+        _, node = heapq.heappop(queue)
+        if contracted[node]:
+            continue
+        # Actualización perezosa: si la prioridad ha empeorado, se vuelve a encolar
+        shortcuts = _shortcuts(out_edges, in_edges, node)
+        priority = _priority(out_edges, in_edges, deleted_neighbors, node, shortcuts)
+        if queue and priority > queue[0][0]:
+            heapq.heappush(queue, (priority, node))
+            continue
+
+        rank[node] = next_rank
+        next_rank += 1
+        contracted[node] = True
+
+        # Los vecinos que quedan se contraerán después, así que tienen mayor rango
+        for w, weight in out_edges[node].items():
+            up[node].append((w, weight, middles.get((node, w), -1)))
+            del in_edges[w][node]
+            deleted_neighbors[w] += 1
+        for u, weight in in_edges[node].items():
+            down[node].append((u, weight, middles.get((u, node), -1)))
+            del out_edges[u][node]
+            deleted_neighbors[u] += 1
+        out_edges[node] = {}
+        in_edges[node] = {}
+
+        for u, w, cost in shortcuts:
+            if cost < out_edges[u].get(w, float('inf')):
+                out_edges[u][w] = cost
+                in_edges[w][u] = cost
+                middles[(u, w)] = node
+
+    return ContractionHierarchy(graph.node_numbers, rank, *_to_csr(count, up), *_to_csr(count, down),
+                                directed=directed)
+
+
+def _edge_middle(hierarchy, a, b):
+    """Nodo intermedio del tramo a -> b de la jerarquía (-1 si es original)"""
+    if hierarchy.rank[a] < hierarchy.rank[b]:
+        offsets, targets, weights, middles, node, target = (hierarchy.up_offsets, hierarchy.up_targets,
+                                                            hierarchy.up_weights, hierarchy.up_middles, a, b)
+    else:
+        offsets, targets, weights, middles, node, target = (hierarchy.down_offsets, hierarchy.down_targets,
+                                                            hierarchy.down_weights, hierarchy.down_middles, b, a)
+    for i in range(offsets[node], offsets[node + 1]):
+        if targets[i] == target:
+            return middles[i]
+    raise KeyError((a, b))
+
+
+def _unpack(hierarchy, nodes):
+    """Sustituye los atajos de una secuencia de nodos por los tramos originales"""
+    path = [nodes[0]]
+    for a, b in zip(nodes, nodes[1:]):
+        stack = [(a, b)]
+        while stack:
+            u, w = stack.pop()
+            middle = _edge_middle(hierarchy, u, w)
+            if middle < 0:
+                path.append(w)
+            else:
+                # Primero u -> middle y después middle -> w
+                stack.append((middle, w))
+                stack.append((u, middle))
+    return path
+
+
+def query_contraction_hierarchy(hierarchy, start, end):
+    """
+    Búsqueda bidireccional ascendente entre dos identificadores densos.
+
+    Returns:
+        Una tupla (lista de identificadores de la ruta original, distancia) o None si no hay ruta
+    """
+    infinity = float('inf')
+    distances = ({start: 0.0}, {end: 0.0})
+    previous = ({start: None}, {end: None})
+    queues = ([(0.0, start)], [(0.0, end)])
+    up = (hierarchy.up_offsets, hierarchy.up_targets, hierarchy.up_weights)
+    down = (hierarchy.down_offsets, hierarchy.down_targets, hierarchy.down_weights)
+    # Cada lado relaja los tramos de su grafo y usa los del otro para detenerse (stall-on-demand)
+    graphs = ((up, down), (down, up))
+    best = infinity
+    meeting = None
+
+    while True:
+        # Cada lado sigue mientras su mínimo pendiente pueda mejorar la mejor ruta
+        forward = queues[0][0][0] if queues[0] else infinity
+        backward = queues[1][0][0] if queues[1] else infinity
+        if min(forward, backward) >= best:
+            break
+        side = 0 if forward <= backward else 1
+        distance, node = heapq.heappop(queues[side])
+        own = distances[side]
+        if distance > own[node]:
+            continue
+
+        remaining = distances[1 - side].get(node)
+        if remaining is not None and distance + remaining < best:
+            best = distance + remaining
+            meeting = node
+
+        (offsets, targets, weights), (stall_offsets, stall_targets, stall_weights) = graphs[side]
+        # Si se llega antes a node bajando desde un nodo de mayor rango, su distancia no es
+        # la mínima y no hace falta seguir desde él
+        first = stall_offsets[node]
+        last = stall_offsets[node + 1]
+        stalled = False
+        for neighbor, weight in zip(stall_targets[first:last], stall_weights[first:last]):
+            if own.get(neighbor, infinity) + weight < distance:
+                stalled = True
+                break
+        if stalled:
+            continue
+
+        first = offsets[node]
+        last = offsets[node + 1]
+        for neighbor, weight in zip(targets[first:last], weights[first:last]):
+            new_distance = distance + weight
+            if new_distance < own.get(neighbor, infinity):
+                own[neighbor] = new_distance
+                previous[side][neighbor] = node
+                heapq.heappush(queues[side], (new_distance, neighbor))
+
+    if meeting is None:
+        return None
+
+    nodes = []
+    node = meeting
+    while node is not None:
+        nodes.append(node)
+        node = previous[0][node]
+    nodes.reverse()
+    node = previous[1][meeting]
+    while node is not None:
+        nodes.append(node)
+        node = previous[1][node]
+    return _unpack(hierarchy, nodes), best
+
+
+def get_contraction_hierarchy(airspace, directed=False):
+    """Jerarquía del espacio aéreo, recalculada solo si éste cambia"""
+    key = "contraction_hierarchy_directed" if directed else "contraction_hierarchy"
+    return get_derived(airspace, key, lambda a: build_contraction_hierarchy(a, directed))
+
+
+def find_shortest_path_ch(airspace, start_number, end_number, directed=False):
+    """
+    Ruta más corta entre dos puntos con la jerarquía de contracción. Devuelve lo
+    mismo que airSpace.find_shortest_path: una tupla (lista de números de punto,
+    distancia), o ([], 0) si no hay ruta o el origen es igual al destino.
+    """
+    if start_number not in airspace.navpoints or end_number not in airspace.navpoints:
+        return [], 0
+    if start_number == end_number:
+        return [], 0
+
+    hierarchy = get_contraction_hierarchy(airspace, directed)
+    result = query_contraction_hierarchy(hierarchy, hierarchy.node_index[start_number],
+                                         hierarchy.node_index[end_number])
+    if result is None:
+        return [], 0
+    nodes, distance = result
+    return [hierarchy.node_numbers[node] for node in nodes], distance
+
+
+def _write_array(f, values):
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    values.tofile(f)
+
+
+def _read_array(data, offset, typecode, count):
+    values = array(typecode)
+    end = offset + values.itemsize * count
+    values.frombytes(data[offset:end])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values, end
+
+
+def save_contraction_hierarchy(hierarchy, filename):
+    """Guarda la jerarquía en el formato binario versionado"""
+    with open(filename, 'wb') as f:
+        f.write(struct.pack(HEADER_FORMAT, CH_MAGIC, CH_VERSION, int(hierarchy.directed), hierarchy.source_hash,
+                            len(hierarchy.node_numbers), len(hierarchy.up_targets), len(hierarchy.down_targets)))
+        for values in (hierarchy.node_numbers, hierarchy.rank,
+                       hierarchy.up_offsets, hierarchy.up_targets, hierarchy.up_weights, hierarchy.up_middles,
+                       hierarchy.down_offsets, hierarchy.down_targets, hierarchy.down_weights,
+                       hierarchy.down_middles):
+            _write_array(f, values)
+
+
+def load_contraction_hierarchy(filename, expected_hash=None):
+    """
+    Lee una jerarquía guardada con save_contraction_hierarchy.
+    Devuelve None si el fichero no existe, tiene otro formato o su hash no coincide.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    header_size = struct.calcsize(HEADER_FORMAT)
+    if len(data) < header_size:
+        return None
+    magic, version, directed, source_hash, nodes, up_count, down_count = struct.unpack_from(HEADER_FORMAT, data)
+    if magic != CH_MAGIC or version != CH_VERSION:
+        return None
+    if expected_hash is not None and source_hash != expected_hash:
+        return None
+
+    offset = header_size
+    node_numbers, offset = _read_array(data, offset, 'q', nodes)
+    rank, offset = _read_array(data, offset, 'i', nodes)
+    sections = []
+    for count in (up_count, down_count):
+        offsets, offset = _read_array(data, offset, 'i', nodes + 1)
+        targets, offset = _read_array(data, offset, 'i', count)
+        weights, offset = _read_array(data, offset, 'd', count)
+        middles, offset = _read_array(data, offset, 'i', count)
+        sections.extend((offsets, targets, weights, middles))
+    if offset != len(data):
+        return None
+
+    return ContractionHierarchy(node_numbers, rank, *sections, directed=bool(directed), source_hash=source_hash)
+
+
+def hierarchy_cache_path(airspace, source_hash, directed=False, cache_dir=None):
+    """Ruta del fichero de caché para los ficheros de entrada del espacio aéreo"""
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(airspace.source_files[0]))
+    suffix = "_directed" if directed else ""
+    return os.path.join(cache_dir, f"contraction_hierarchy_{source_hash.hex()[:16]}{suffix}.bin")
+
+
+def precompute_contraction_hierarchy(airspace, cache_dir=None, directed=False):
+    """
+    Prepara la jerarquía del espacio aéreo y la deja asociada a él para
+    find_shortest_path_ch. Si el espacio aéreo se cargó desde ficheros y no se
+    ha modificado después, se lee de la caché en disco cuando existe y coincide
+    con su contenido; si no, se calcula y se guarda para la próxima vez.
+    """
+    key = "contraction_hierarchy_directed" if directed else "contraction_hierarchy"
+    cache_file = None
+    source_hash = b""
+    if matches_source_files(airspace):
+        source_hash = hash_source_files(*airspace.source_files)
+        cache_file = hierarchy_cache_path(airspace, source_hash, directed, cache_dir)
+        hierarchy = load_contraction_hierarchy(cache_file, source_hash)
+        if (hierarchy is not None and hierarchy.directed == directed
+                and list(hierarchy.node_numbers) == list(airspace.navpoints)):
+            set_derived(airspace, key, hierarchy)
+            return hierarchy
+
+    hierarchy = build_contraction_hierarchy(airspace, directed)
+    hierarchy.source_hash = source_hash
+    if cache_file:
+        try:
+            save_contraction_hierarchy(hierarchy, cache_file)
+        except OSError as e:
+            logger.warning("No se pudo guardar la jerarquía de contracción: %s", e)
+    set_derived(airspace, key, hierarchy)
+    return hierarchy
@@ -0,0 +1,116 @@
+"""
+Representación CSR (compressed sparse row) de la red de navegación.
+
+Los puntos se numeran de forma densa (0..n-1, en el orden de airspace.navpoints)
+y los tramos de cada nodo quedan contiguos en dos arrays: targets (array('i'),
+nodo destino) y weights (array('d'), distancia). Los tramos del nodo u son los
+de las posiciones [offsets[u], offsets[u + 1]). En la versión no dirigida cada
+segmento aparece en los dos sentidos: primero los que salen del nodo y después
+los que llegan a él, en el mismo orden que airspace.outgoing e incoming. Los
+números de punto originales (node_numbers) se guardan en 64 bits, como en
+model_store y snapshot.
+"""
+
+from array import array
+
+import numpy as np
+
+from airSpace import get_derived
+
+
+class CSRGraph:
+    """Grafo inmutable en formato CSR construido con build_csr_graph"""
+    def __init__(self, node_numbers, offsets, targets, weights, directed):
+        self.node_numbers = node_numbers  # array('q'): identificador denso -> número de punto
+        self.offsets = offsets  # array('i'): n + 1 posiciones de inicio
+        self.targets = targets  # array('i'): identificador del nodo destino de cada tramo
+        self.weights = weights  # array('d'): distancia de cada tramo
+        self.directed = directed
+        self.node_index = {number: i for i, number in enumerate(node_numbers)}
+
+    def __len__(self):
+        return len(self.node_numbers)
+
+    @property
+    def edge_count(self):
+        return len(self.targets)
+
+    def edges(self, node):
+        """Pares (identificador destino, distancia) de los tramos que salen del nodo"""
+        start = self.offsets[node]
+        end = self.offsets[node + 1]
+        return zip(self.targets[start:end], self.weights[start:end])
+
+    def nbytes(self):
+        """Memoria ocupada por los arrays del grafo (sin el diccionario de números)"""
+        return sum(a.itemsize * len(a) for a in (self.node_numbers, self.offsets, self.targets, self.weights))
+
+
+def _to_array(typecode, values):
+    result = array(typecode)
+    result.frombytes(np.ascontiguousarray(values, dtype=np.dtype(typecode)).tobytes())
+    return result
+
+
+def _segment_columns(airspace):
+    columns = get_derived(airspace, "columns")
+    if columns is not None:
+        return columns.seg_origins, columns.seg_destinations, columns.seg_distances
+    segments = airspace.navsegments
+    count = len(segments)
+    # Los números de punto van en int64 y no en float64, que pierde precisión por encima de 2**53
+    return (np.fromiter((s.origin_number for s in segments), dtype=np.int64, count=count),
+            np.fromiter((s.destination_number for s in segments), dtype=np.int64, count=count),
+            np.fromiter((s.distance for s in segments), dtype=np.float64, count=count))
+
+
+def build_csr_graph(airspace, directed=False, reverse=False):
+    """
+    Construye el grafo CSR de un espacio aéreo. Los segmentos con algún extremo
+    que no es un NavPoint del espacio aéreo se descartan, igual que en las búsquedas.
+    Con directed y reverse, cada tramo va del destino del segmento a su origen
+    (los tramos de un nodo son los segmentos que llegan a él).
+    """
+    numbers = np.fromiter(airspace.navpoints, dtype=np.int64, count=len(airspace.navpoints))
+    if not len(numbers):
+        return CSRGraph(array('q'), array('i', [0]), array('i'), array('d'), directed)
+    origins, destinations, distances = _segment_columns(airspace)
+    if directed and reverse:
+        origins, destinations = destinations, origins
+
+    # Número de punto -> identificador denso con una búsqueda binaria vectorizada
+    sorter = np.argsort(numbers, kind="stable")
+    sorted_numbers = numbers[sorter]
+
+    def dense_ids(values):
+        positions = np.minimum(np.searchsorted(sorted_numbers, values), len(numbers) - 1)
+        return sorter[positions], sorted_numbers[positions] == values
+
+    origin_ids, origin_found = dense_ids(origins)
+    destination_ids, destination_found = dense_ids(destinations)
+    valid = origin_found & destination_found
+    sources = origin_ids[valid]
+    targets = destination_ids[valid]
+    weights = distances[valid]
+    if not directed:
+        sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        weights = np.concatenate((weights, weights))
+
+    # Ordenación estable: dentro de cada nodo, primero los tramos de salida en el orden de los segmentos
+    order = np.argsort(sources, kind="stable")
+    offsets = np.zeros(len(numbers) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=len(numbers)), out=offsets[1:])
+
+    return CSRGraph(_to_array('q', numbers), _to_array('i', offsets), _to_array('i', targets[order]),
+                    _to_array('d', weights[order]), directed)
+
+
+def get_csr_graph(airspace, directed=False):
+    """Grafo CSR del espacio aéreo, reconstruido solo si éste cambia"""
+    key = "csr_directed" if directed else "csr_undirected"
+    return get_derived(airspace, key, lambda a: build_csr_graph(a, directed))
+
+
+def get_reverse_csr_graph(airspace):
+    """Grafo CSR dirigido con los segmentos invertidos, reconstruido solo si el espacio aéreo cambia"""
+    return get_derived(airspace, "csr_reverse", lambda a: build_csr_graph(a, directed=True, reverse=True))
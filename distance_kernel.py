@@ -0,0 +1,166 @@
+"""
+Cálculo vectorizado de distancias ortodrómicas (haversine) con NumPy.
+
+Las coordenadas de todos los NavPoint se guardan en arrays float64 contiguos,
+ya convertidas a radianes y con el coseno de la latitud precalculado, de modo
+que las distancias de uno a muchos, de muchos a muchos y de todos los segmentos
+se calculan con unas pocas operaciones sobre arrays en lugar de un bucle en Python.
+"""
+
+import numpy as np
+
+from airSpace import get_derived
+
+EARTH_RADIUS = 6371.0
+
+
+class CoordinateArrays:
+    """Coordenadas de los NavPoint de un espacio aéreo en arrays contiguos"""
+    def __init__(self, numbers, latitudes, longitudes):
+        self.numbers = np.asarray(numbers, dtype=np.int64)
+        self.latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+        self.longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+        self.cos_latitudes = np.cos(self.latitudes)
+        self.index = {number: i for i, number in enumerate(self.numbers.tolist())}
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def indices(self, numbers):
+        """Posiciones en los arrays de una secuencia de números de punto"""
+        return np.fromiter((self.index[n] for n in numbers), dtype=np.intp)
+
+
+def _build_coordinate_arrays(airspace):
+    columns = get_derived(airspace, "columns")
+    if columns is not None:
+        # Recién cargado con bulk_loader: se aprovechan las columnas leídas
+        return CoordinateArrays(columns.nav_numbers, columns.nav_latitudes, columns.nav_longitudes)
+    points = list(airspace.navpoints.values())
+    return CoordinateArrays([p.number for p in points], [p.latitude for p in points],
+                            [p.longitude for p in points])
+
+
+def get_coordinate_arrays(airspace):
+    """Arrays de coordenadas del espacio aéreo, reconstruidos solo si éste cambia"""
+    return get_derived(airspace, "coordinate_arrays", _build_coordinate_arrays)
+
+
+def _haversine(lat1, lon1, cos_lat1, lat2, lon2, cos_lat2):
+    a = np.sin((lat2 - lat1) / 2) ** 2 + cos_lat1 * cos_lat2 * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def one_to_many(coords, latitude, longitude, indices=None):
+    """
+    Distancias en km desde una coordenada (en grados) a los puntos indicados
+    por sus posiciones, o a todos los puntos si indices es None.
+    """
+    lat = np.radians(latitude)
+    lon = np.radians(longitude)
+    if indices is None:
+        return _haversine(lat, lon, np.cos(lat), coords.latitudes, coords.longitudes, coords.cos_latitudes)
+    return _haversine(lat, lon, np.cos(lat), coords.latitudes[indices], coords.longitudes[indices],
+                      coords.cos_latitudes[indices])
+
+
+def many_to_many(coords, rows, columns):
+    """Matriz de distancias en km entre dos listas de posiciones (filas x columnas)"""
+    rows = np.asarray(rows)[:, np.newaxis]
+    columns = np.asarray(columns)[np.newaxis, :]
+    return _haversine(coords.latitudes[rows], coords.longitudes[rows], coords.cos_latitudes[rows],
+                      coords.latitudes[columns], coords.longitudes[columns], coords.cos_latitudes[columns])
+
+
+def pairwise(coords, first, second):
+    """Distancias en km entre los pares de posiciones first[i], second[i]"""
+    return _haversine(coords.latitudes[first], coords.longitudes[first], coords.cos_latitudes[first],
+                      coords.latitudes[second], coords.longitudes[second], coords.cos_latitudes[second])
+
+
+def path_length(coords, numbers):
+    """Longitud ortodrómica en km de una ruta dada por números de punto"""
+    if len(numbers) < 2:
+        return 0.0
+    positions = coords.indices(numbers)
+    return float(pairwise(coords, positions[:-1], positions[1:]).sum())
+
+
+def _build_segment_geometry(airspace):
+    coords = get_coordinate_arrays(airspace)
+    index = coords.index
+    segments = []
+    rows = []
+    for s in airspace.navsegments:
+        origin = index.get(s.origin_number)
+        destination = index.get(s.destination_number)
+        if origin is not None and destination is not None:
+            segments.append(s)
+            rows.append((origin, destination, s.distance))
+    table = np.array(rows, dtype=np.float64).reshape(-1, 3)
+    origins = table[:, 0].astype(np.intp)
+    destinations = table[:, 1].astype(np.intp)
+    return segments, table[:, 2].copy(), pairwise(coords, origins, destinations)
+
+
+def segment_distances(airspace):
+    """
+    Distancias almacenadas y geométricas de todos los segmentos cuyos extremos existen.
+
+    Returns:
+        Una tupla (segmentos, distancias almacenadas, distancias ortodrómicas),
+        con las distancias como arrays en el mismo orden que la lista de segmentos.
+    """
+    return get_derived(airspace, "segment_geometry", _build_segment_geometry)
+
+
+def validate_segment_distances(airspace, tolerance=0.01, absolute_tolerance=0.5):
+    """
+    Compara cada NavSegment.distance con la distancia ortodrómica entre sus extremos.
+
+    Args:
+        airspace: Instancia de AirSpace
+        tolerance: Diferencia relativa admitida
+        absolute_tolerance: Diferencia en km admitida siempre (redondeo en segmentos cortos)
+
+    Returns:
+        Lista de tuplas (segmento, distancia almacenada, distancia ortodrómica)
+        de los segmentos fuera de tolerancia, de mayor a menor diferencia relativa.
+    """
+    segments, stored, geometric = segment_distances(airspace)
+    difference = np.abs(stored - geometric)
+    invalid = np.nonzero(difference > np.maximum(absolute_tolerance, tolerance * geometric))[0]
+    relative = difference[invalid] / np.maximum(geometric[invalid], 1e-12)
+    order = invalid[np.argsort(-relative, kind="stable")]
+    return [(segments[i], float(stored[i]), float(geometric[i])) for i in order]
+
+
+def min_distance_ratio(airspace):
+    """Menor cociente distancia almacenada / ortodrómica de los segmentos, o None si no hay"""
+    _, stored, geometric = segment_distances(airspace)
+    valid = geometric > 0
+    if not valid.any():
+        return None
+    return float((stored[valid] / geometric[valid]).min())
+
+
+def heuristic_table(airspace, targets, scale=1.0):
+    """
+    Tabla de la heurística de A*: para cada punto, scale por la distancia
+    ortodrómica al destino más cercano.
+
+    Returns:
+        Diccionario número de punto -> valor de la heurística
+    """
+    coords = get_coordinate_arrays(airspace)
+    target_positions = coords.indices(t for t in targets if t in coords.index)
+    if not scale or not len(target_positions) or not len(coords):
+        return dict.fromkeys(coords.numbers.tolist(), 0.0)
+
+    nearest = None
+    for position in target_positions:
+        distances = _haversine(coords.latitudes[position], coords.longitudes[position],
+                               coords.cos_latitudes[position], coords.latitudes, coords.longitudes,
+                               coords.cos_latitudes)
+        nearest = distances if nearest is None else np.minimum(nearest, distances)
+    return dict(zip(coords.numbers.tolist(), (nearest * scale).tolist()))
@@ -2,15 +2,20 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
 from matplotlib.figure import Figure
+import logging
 import os
 import platform
 from airSpace import *
 from navSegment import get_origin_number, get_destination_number, get_distance
-from kml_generator import generate_airspace_kml, generate_path_kml, generate_neighbors_kml, save_kml_to_file
+from kml_generator import write_airspace_kml, save_airspace_kmz, generate_path_kml, generate_neighbors_kml, save_kml_to_file
 from music_generator import (MusicPlayer)
 import music_generator
 from PIL import Image, ImageTk, ImageFilter  # Añadir ImageFilter para el efecto de desenfoque
-from path import find_shortest_path_astar, find_multiple_paths_astar  # Importar el algoritmo A*
+from route_cache import cached_shortest_path_astar  # A* con caché de rutas
+from routing_service import (RoutingError, load_airspace, resolve_endpoint, check_connected, get_neighbors,
+                             find_route, find_alternative_routes, duplicate_name_warning)
+from distance_kernel import get_coordinate_arrays, path_length, validate_segment_distances
+from map_renderer import draw_airspace_map
 
 # Variables globales
 espacio_aereo = None
@@ -81,13 +86,7 @@ DARK_THEME = {
 }
 
 # Funciones de utilidad para obtener puntos y segmentos
-def get_navpoint_by_name(airspace, name):
-    """Obtiene un objeto NavPoint por su nombre."""
-    for point in airspace.navpoints.values():
-        if point.name == name:
-            return point
-    return None
-
+# (get_navpoint_by_name y get_navpoints_by_name vienen de airSpace y usan su índice de nombres)
 def get_navpoint_by_number(airspace, number):
     """Obtiene un objeto NavPoint por su número."""
     return airspace.navpoints.get(number)
@@ -100,6 +99,74 @@ def get_navsegment_by_number(airspace, number):
     """Obtiene un objeto NavSegment por su número."""
     return airspace.navsegments.get(number)
 
+def configurar_autocompletado(entry, variable, limite=8):
+    """
+    Muestra bajo la entrada una lista con los nombres de puntos y aeropuertos
+    que empiezan por el texto escrito (o, si no hay ninguno, los más parecidos).
+    """
+    popup = {"ventana": None, "lista": None}
+
+    def cerrar(event=None):
+        if popup["ventana"] is not None:
+            popup["ventana"].destroy()
+            popup["ventana"] = None
+            popup["lista"] = None
+
+    def elegir(event=None):
+        lista = popup["lista"]
+        if lista is not None and lista.curselection():
+            variable.set(lista.get(lista.curselection()[0]))
+            entry.icursor(tk.END)
+        cerrar()
+        entry.focus_set()
+
+    def actualizar(event):
+        if event.keysym in ("Return", "Escape", "Down", "Up", "Tab"):
+            return
+        texto = variable.get().strip()
+        if not espacio_aereo or not texto:
+            cerrar()
+            return
+        nombres = search_names_by_prefix(espacio_aereo, texto, limit=limite)
+        if not nombres:
+            nombres = search_names_fuzzy(espacio_aereo, texto, limit=limite)
+        if not nombres or nombres == [texto]:
+            cerrar()
+            return
+
+        if popup["ventana"] is None:
+            ventana = tk.Toplevel(entry)
+            ventana.wm_overrideredirect(True)
+            lista = tk.Listbox(ventana, height=limite, exportselection=False)
+            lista.pack(fill=tk.BOTH, expand=True)
+            lista.bind("<ButtonRelease-1>", elegir)
+            lista.bind("<Return>", elegir)
+            lista.bind("<Escape>", cerrar)
+            popup["ventana"] = ventana
+            popup["lista"] = lista
+        lista = popup["lista"]
+        lista.delete(0, tk.END)
+        for nombre in nombres:
+            lista.insert(tk.END, nombre)
+        lista.config(height=len(nombres))
+        x = entry.winfo_rootx()
+        y = entry.winfo_rooty() + entry.winfo_height()
+        popup["ventana"].geometry(f"{max(entry.winfo_width(), 120)}x{lista.winfo_reqheight()}+{x}+{y}")
+
+    def bajar(event):
+        lista = popup["lista"]
+        if lista is not None:
+            lista.focus_set()
+            lista.selection_clear(0, tk.END)
+            lista.selection_set(0)
+            lista.activate(0)
+
+    entry.bind("<KeyRelease>", actualizar, add="+")
+    entry.bind("<Down>", bajar, add="+")
+    entry.bind("<Escape>", cerrar, add="+")
+    entry.bind("<Return>", cerrar, add="+")
+    entry.bind("<Destroy>", cerrar, add="+")
+
 def explorar_archivo(variable_texto):
     nombre_archivo = filedialog.askopenfilename(
         initialdir=".",
@@ -129,17 +196,26 @@ def cargar_datos(app, archivo_nav, archivo_seg, archivo_aer, ventana):
     global ultimo_archivo_nav, ultimo_archivo_seg, ultimo_archivo_aer
 
     try:
-        espacio_aereo = AirSpace()
-
-        exito = load_from_files(espacio_aereo, archivo_nav, archivo_seg, archivo_aer)
+        # Usa la instantánea binaria si está al día con los ficheros (si no, la crea)
+        # y precalcula (o lee de la caché en disco) las rutas entre aeropuertos
+        espacio_aereo = load_airspace(archivo_nav, archivo_seg, archivo_aer)
+
+        if espacio_aereo:
+            # Comprobar que las distancias de los segmentos coinciden con las coordenadas
+            segmentos_erroneos = validate_segment_distances(espacio_aereo)
+            aviso_segmentos = ""
+            if segmentos_erroneos:
+                segmento, almacenada, geometrica = segmentos_erroneos[0]
+                aviso_segmentos = (f"\n\nAviso: {len(segmentos_erroneos)} segmentos tienen una distancia que no coincide "
+                                   f"con la de sus coordenadas (p. ej. {segmento.origin_number} -> "
+                                   f"{segmento.destination_number}: {almacenada:.2f} km frente a {geometrica:.2f} km).")
 
-        if exito:
             # Actualizar los últimos archivos cargados
             ultimo_archivo_nav = archivo_nav
             ultimo_archivo_seg = archivo_seg
             ultimo_archivo_aer = archivo_aer
             
-            messagebox.showinfo("Éxito", f"Datos cargados correctamente.\n\nPuntos de navegación: {len(espacio_aereo.navpoints)}\nSegmentos: {len(espacio_aereo.navsegments)}\nAeropuertos: {len(espacio_aereo.navairports)}", parent=ventana)
+            messagebox.showinfo("Éxito", f"Datos cargados correctamente.\n\nPuntos de navegación: {len(espacio_aereo.navpoints)}\nSegmentos: {len(espacio_aereo.navsegments)}\nAeropuertos: {len(espacio_aereo.navairports)}{aviso_segmentos}", parent=ventana)
             ventana.destroy()
 
             app.status.config(text=f"Datos cargados: {len(espacio_aereo.navpoints)} puntos, {len(espacio_aereo.navsegments)} segmentos, {len(espacio_aereo.navairports)} aeropuertos")
@@ -282,37 +358,6 @@ def mostrar_espacio_aereo(app, punto_destacado=None, vecinos=None, ruta=None):
     fig = Figure(figsize=(15, 12), dpi=100)
     ax = fig.add_subplot(111)
 
-    is_neighbor_view = bool(punto_destacado and vecinos)
-
-    lon_values = []
-    lat_values = []
-
-    point_cache = {}
-
-    for num, point in espacio_aereo.navpoints.items():
-        lon_values.append(point.longitude)
-        lat_values.append(point.latitude)
-        point_cache[point.number] = point
-
-
-    margin = 0.1
-    lon_min = min(lon_values) - margin
-    lon_max = max(lon_values) + margin
-    lat_min = min(lat_values) - margin
-    lat_max = max(lat_values) + margin
-
-
-    ax.set_xlim(lon_min, lon_max)
-    ax.set_ylim(lat_min, lat_max)
-    ax.set_autoscale_on(False)  # Disable autoscaling
-    ax.set_clip_on(True)
-
-    segment_color = 'cyan'
-    point_color = 'black'
-    highlight_color = 'red'
-    neighbor_color = highlight_color
-    path_color = '#00CCCC'
-
     fig.subplots_adjust(left=0.05, right=0.95, top=0.92, bottom=0.05)
 
     canvas = FigureCanvasTkAgg(fig, master=map_window)  # A tk.DrawingArea.
@@ -326,149 +371,32 @@ def mostrar_espacio_aereo(app, punto_destacado=None, vecinos=None, ruta=None):
 
     canvas.get_tk_widget().pack(side=tk.TOP, fill=tk.BOTH, expand=True)
 
-    # Función para redibujar el mapa según las opciones de visibilidad
+    # Las capas del mapa se crean una vez; los controles solo cambian su visibilidad
+    mapa = draw_airspace_map(ax, espacio_aereo, punto_destacado, vecinos, ruta,
+                             show_nodes.get(), show_segments.get(), show_distances.get())
+    is_neighbor_view = mapa.is_neighbor_view
+
+    # Función para aplicar las opciones de visibilidad al mapa
     def redraw_map():
-        ax.clear()
-        ax.set_xlim(lon_min, lon_max)
-        ax.set_ylim(lat_min, lat_max)
-        ax.set_autoscale_on(False)
-        ax.set_clip_on(True)
-        ax.set_clip_box(ax.bbox)
-
-        # Dibujar segmentos si están habilitados
-        if show_segments.get():
-            for segment in espacio_aereo.navsegments:
-                point1 = point_cache.get(segment.origin_number)
-                point2 = point_cache.get(segment.destination_number)
-
-                if point1 and point2:
-                    draw_this_segment = False
-                    current_line_color = segment_color
-                    current_line_width = 1.0
-
-                    if is_neighbor_view:
-                        neighbor_numbers = [n[0].number for n in vecinos]
-                        if (point1.number == punto_destacado.number and point2.number in neighbor_numbers) or \
-                           (point2.number == punto_destacado.number and point1.number in neighbor_numbers):
-                            current_line_color = segment_color
-                            current_line_width = 1.0
-                            draw_this_segment = True
-                    else:
-                        if ruta:
-                            draw_this_segment = False
-                            for i in range(len(ruta) - 1):
-                                if ((ruta[i].number == point1.number and ruta[i+1].number == point2.number) or
-                                    (ruta[i].number == point2.number and ruta[i+1].number == point1.number)):
-                                    draw_this_segment = True
-                                    current_line_color = '#00CCCC'
-                                    current_line_width = 1.5
-
-                                    if ruta[i].number == point1.number and ruta[i+1].number == point2.number:
-                                        start_point = (point1.longitude, point1.latitude)
-                                        end_point = (point2.longitude, point2.latitude)
-                                    else:
-                                        start_point = (point2.longitude, point2.latitude)
-                                        end_point = (point1.longitude, point1.latitude)
-                                    break
-                        else:
-                            draw_this_segment = True
-                            current_line_color = segment_color
-                            current_line_width = 1.0
-
-                    if draw_this_segment:
-                        start_point = (point1.longitude, point1.latitude)
-                        end_point = (point2.longitude, point2.latitude)
-
-                        # Usar ax.plot en lugar de ax.annotate para mejorar el comportamiento al hacer zoom
-                        x_coords = [start_point[0], end_point[0]]
-                        y_coords = [start_point[1], end_point[1]]
-                        line = ax.plot(x_coords, y_coords, color=current_line_color, 
-                                      linewidth=current_line_width, 
-                                      clip_on=True, zorder=5)[0]
-                        
-                        # Añadir una flecha de dirección
-                        mid_point = 0.5  # Punto medio del segmento
-                        arrow_props = dict(arrowstyle='-|>', color=current_line_color, 
-                                         shrinkA=0, shrinkB=0, 
-                                         lw=current_line_width*1.5, 
-                                         mutation_scale=12,  # Aumentar el tamaño de la punta de flecha
-                                         clip_on=True)
-                        ax.annotate('', 
-                                  xy=(x_coords[0] + mid_point*(x_coords[1]-x_coords[0]), 
-                                     y_coords[0] + mid_point*(y_coords[1]-y_coords[0])),
-                                  xytext=(x_coords[0] + (mid_point-0.02)*(x_coords[1]-x_coords[0]), 
-                                         y_coords[0] + (mid_point-0.02)*(y_coords[1]-y_coords[0])),
-                                  arrowprops=arrow_props,
-                                  clip_on=True)
-
-                        # Mostrar distancias si están habilitadas
-                        if show_distances.get():
-                            mid_x = (point1.longitude + point2.longitude) / 2
-                            mid_y = (point1.latitude + point2.latitude) / 2
-                            ax.text(mid_x, mid_y, f"{segment.distance:.1f}",
-                                    fontsize=6, ha='center', va='center',
-                                    bbox=dict(facecolor='white', alpha=0.5, pad=0.5), zorder=2, clip_on=True)
-
-        # Dibujar nodos si están habilitados
-        if show_nodes.get():
-            for num, point in espacio_aereo.navpoints.items():
-                this_color = point_color
-                this_size = 5
-                this_alpha = 1.0
-                this_zorder = 10
-
-                if ruta and any(p.number == point.number for p in ruta):
-                    this_color = '#00CCCC'
-                    this_size = 10
-                    this_zorder = 20
-                elif ruta:
-                    this_alpha = 0.5
-                    this_size = 4
-                elif is_neighbor_view:
-                    neighbor_numbers = [n[0].number for n in vecinos]
-                    if point.number == punto_destacado.number:
-                        this_color = highlight_color
-                        this_size = 30
-                    elif point.number in neighbor_numbers:
-                        this_color = neighbor_color
-                        this_size = 20
-                    else:
-                        this_color = 'gray'
-                        this_size = 5
-
-                ax.scatter(point.longitude, point.latitude, color=this_color, s=this_size, alpha=this_alpha, zorder=this_zorder, clip_on=True)
-
-                ax.text(point.longitude + 0.01, point.latitude + 0.01, point.name,
-                        fontsize=6, ha='left', va='bottom', zorder=6, clip_on=True)
-
-        if not is_neighbor_view and not ruta:
-            ax.grid(True, linestyle=':', alpha=0.7, color='red')
-
-        for spine in ax.spines.values():
-            spine.set_visible(True)
-            spine.set_edgecolor('black')
-            spine.set_linewidth(0.5)
-
-        if ruta:
-            total_cost = 0
-            for i in range(len(ruta) - 1):
-                current_point = ruta[i]
-                next_point = ruta[i+1]
-                
-                # Buscar el segmento entre los puntos y sumar su distancia
-                for segment in espacio_aereo.navsegments:
-                    if ((get_origin_number(segment) == current_point.number and get_destination_number(segment) == next_point.number) or
-                        (get_origin_number(segment) == next_point.number and get_destination_number(segment) == current_point.number)):
-                        total_cost += get_distance(segment)
-                        break
-            
-            ax.set_title(f"Gráfico con camino. Coste = {total_cost:.8f}", pad=20, y=1.02)
-        elif is_neighbor_view:
-            ax.set_title(f"Grafico con los vecinos del nodo {punto_destacado.name}", fontsize=14, pad=20, y=1.02)
-        else:
-            ax.set_title("Gráfico con nodos y segmentos", fontsize=14, pad=20, y=1.02)
+        mapa.update(show_nodes.get(), show_segments.get(), show_distances.get())
+        canvas.draw_idle()
 
-        canvas.draw()
+    if ruta:
+        total_cost = 0
+        for i in range(len(ruta) - 1):
+            current_point = ruta[i]
+            next_point = ruta[i+1]
+            
+            # Buscar el segmento entre los puntos y sumar su distancia
+            segment = find_segment_between(espacio_aereo, current_point.number, next_point.number)
+            if segment:
+                total_cost += get_distance(segment)
+        
+        ax.set_title(f"Gráfico con camino. Coste = {total_cost:.8f}", pad=20, y=1.02)
+    elif is_neighbor_view:
+        ax.set_title(f"Grafico con los vecinos del nodo {punto_destacado.name}", fontsize=14, pad=20, y=1.02)
+    else:
+        ax.set_title("Gráfico con nodos y segmentos", fontsize=14, pad=20, y=1.02)
 
     # Ahora conectamos los comandos a los checkbuttons
     nodes_check.config(command=redraw_map)
@@ -476,7 +404,7 @@ def mostrar_espacio_aereo(app, punto_destacado=None, vecinos=None, ruta=None):
     distances_check.config(command=redraw_map)
 
     # Dibujo inicial del mapa
-    redraw_map()
+    canvas.draw()
 
     instructions_text = "Utilice la barra de herramientas para navegar por el mapa y los controles de visibilidad para personalizar la vista."
     instructions_label = tk.Label(map_window, text=instructions_text, font=("Arial", 10), bg=app.tema["bg"], fg=app.tema["fg"])
@@ -537,6 +465,7 @@ def mostrar_vecinos(app):
     nav_point = tk.StringVar()
     point_entry = tk.Entry(input_frame, textvariable=nav_point, width=20, bg=tema["entry_bg"], fg=tema["entry_fg"])
     point_entry.grid(row=0, column=1, padx=5, pady=5)
+    configurar_autocompletado(point_entry, nav_point)
 
     results_text = tk.Text(neighbors_window, width=50, height=15, bg=tema["text_bg"], fg=tema["text_fg"])
     results_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -573,24 +502,14 @@ def encontrar_y_mostrar_vecinos(app, results_text, nav_point):
         messagebox.showwarning("Advertencia", "Por favor ingrese un nombre de punto de navegación.")
         return
 
-    found_point = get_navpoint_by_name(espacio_aereo, nav_name)
-
-    if not found_point:
-        results_text.insert(tk.END, f"Punto de navegación '{nav_name}' no encontrado.")
+    try:
+        found_point, vecinos = get_neighbors(espacio_aereo, nav_name)
+    except RoutingError as e:
+        results_text.insert(tk.END, str(e))
         return
 
-    vecinos = []
-    for segment in espacio_aereo.navsegments:
-        if get_origin_number(segment) == found_point.number:
-            destination_number = get_destination_number(segment)
-            if destination_number in espacio_aereo.navpoints:
-                vecino = espacio_aereo.navpoints[destination_number]
-                distancia = get_distance(segment)
-                vecinos.append((vecino, distancia))
-
-    vecinos.sort(key=lambda x: x[0].name)
-
     result_text = f"Vecinos de {found_point.name} (Número: {found_point.number}):\n"
+    result_text += duplicate_name_warning(espacio_aereo, nav_name)
     result_text += f"Ubicación: ({found_point.latitude}, {found_point.longitude})\n\n"
 
     if vecinos:
@@ -627,14 +546,7 @@ def exportar_vecinos_a_google_earth(app, nav_point):
         return
         
     # Buscar vecinos del punto
-    vecinos = []
-    for segment in espacio_aereo.navsegments:
-        if get_origin_number(segment) == found_point.number:
-            destination_number = get_destination_number(segment)
-            if destination_number in espacio_aereo.navpoints:
-                vecino = espacio_aereo.navpoints[destination_number]
-                distancia = get_distance(segment)
-                vecinos.append((vecino, distancia))
+    found_point, vecinos = get_neighbors(espacio_aereo, found_point)
                 
     if not vecinos:
         messagebox.showwarning("Advertencia", f"No se encontraron vecinos para '{nav_name}'.")
@@ -702,11 +614,13 @@ def encontrar_ruta(app):
     origin_point = tk.StringVar()
     entrada_origen = tk.Entry(frame_entrada, textvariable=origin_point, bg=app.tema["entry_bg"], fg=app.tema["entry_fg"])
     entrada_origen.grid(row=0, column=1, padx=5, pady=5)
+    configurar_autocompletado(entrada_origen, origin_point)
 
     tk.Label(frame_entrada, text="Destino:", bg=app.tema["bg"], fg=app.tema["fg"]).grid(row=1, column=0, padx=5, pady=5)
     dest_point = tk.StringVar()
     entrada_destino = tk.Entry(frame_entrada, textvariable=dest_point, bg=app.tema["entry_bg"], fg=app.tema["entry_fg"])
     entrada_destino.grid(row=1, column=1, padx=5, pady=5)
+    configurar_autocompletado(entrada_destino, dest_point)
 
     # Frame para botones
     frame_botones = tk.Frame(ventana, bg=app.tema["bg"])
@@ -762,92 +676,56 @@ def encontrar_y_mostrar_ruta(app, path_text, origin_point, dest_point):
         messagebox.showwarning("Advertencia", "Por favor ingrese nombres para el origen y destino.")
         return
 
-    # Verificar si el origen es un aeropuerto
-    origin_is_airport = origin_name.startswith(("LE", "LF"))
-    if origin_is_airport:
-        origin_airport = get_navairport_by_name(espacio_aereo, origin_name)
-        if not origin_airport:
-            path_text.insert(tk.END, f"ERROR: No se encontró ningún aeropuerto con el código '{origin_name}'.\n")
-            path_text.insert(tk.END, "Por favor verifique que el código del aeropuerto de origen sea correcto.\n")
-            return
-        origin = origin_name  # Usamos el código del aeropuerto directamente
-    else:
-        # Buscar como punto de navegación normal
-        origin = get_navpoint_by_name(espacio_aereo, origin_name)
-        if not origin:
-            path_text.insert(tk.END, f"ERROR: No se encontró ningún punto con el nombre '{origin_name}'.\n")
-            path_text.insert(tk.END, "Por favor verifique que el nombre del punto de origen sea correcto.\n")
-            return
-
-    # Verificar si el destino es un aeropuerto
-    dest_is_airport = dest_name.startswith(("LE", "LF"))
-    if dest_is_airport:
-        dest_airport = get_navairport_by_name(espacio_aereo, dest_name)
-        if not dest_airport:
-            path_text.insert(tk.END, f"ERROR: No se encontró ningún aeropuerto con el código '{dest_name}'.\n")
-            path_text.insert(tk.END, "Por favor verifique que el código del aeropuerto de destino sea correcto.\n")
-            return
-        dest = dest_name  # Usamos el código del aeropuerto directamente
-    else:
-        # Buscar como punto de navegación normal
-        dest = get_navpoint_by_name(espacio_aereo, dest_name)
-        if not dest:
-            path_text.insert(tk.END, f"ERROR: No se encontró ningún punto con el nombre '{dest_name}'.\n")
-            path_text.insert(tk.END, "Por favor verifique que el nombre del punto de destino sea correcto.\n")
-            return
-
-    # Si son puntos de navegación normales, verificar si tienen segmentos conectados
-    if not origin_is_airport and not dest_is_airport:
-        origin_has_segments = False
-        dest_has_segments = False
-        
-        for segment in espacio_aereo.navsegments:
-            if segment.origin_number == origin.number or segment.destination_number == origin.number:
-                origin_has_segments = True
-            if segment.origin_number == dest.number or segment.destination_number == dest.number:
-                dest_has_segments = True
-        
-        if not origin_has_segments:
-            path_text.insert(tk.END, f"ERROR: El punto '{origin.name}' no está conectado a ningún segmento.\n")
-            path_text.insert(tk.END, "Este punto está aislado en el grafo de navegación y no puede ser utilizado para ruteo.\n")
-            return
-        
-        if not dest_has_segments:
-            path_text.insert(tk.END, f"ERROR: El punto '{dest.name}' no está conectado a ningún segmento.\n")
-            path_text.insert(tk.END, "Este punto está aislado en el grafo de navegación y no puede ser utilizado para ruteo.\n")
-            return
+    # Resolver aeropuertos, puntos o coordenadas y comprobar que los puntos tienen segmentos
+    try:
+        origin = resolve_endpoint(espacio_aereo, origin_name, True)
+        path_text.insert(tk.END, origin.message)
+        dest = resolve_endpoint(espacio_aereo, dest_name, False)
+        path_text.insert(tk.END, dest.message)
+        check_connected(espacio_aereo, origin, dest)
+    except RoutingError as e:
+        path_text.insert(tk.END, str(e))
+        return
 
     # Mensaje personalizado según los tipos de origen y destino
-    if origin_is_airport and dest_is_airport:
+    if origin.is_airport and dest.is_airport:
         path_text.insert(tk.END, f"Buscando ruta del aeropuerto {origin_name} al aeropuerto {dest_name} usando algoritmo A*...\n\n")
         
         # Mostrar información de los aeropuertos para depuración
         path_text.insert(tk.END, f"[Debug] Aeropuerto origen ({origin_name}):\n")
-        if origin_airport.sids:
-            path_text.insert(tk.END, f"  SIDs: {origin_airport.sids}\n")
+        posicion_origen = get_airport_position(espacio_aereo, origin.airport)
+        if posicion_origen:
+            path_text.insert(tk.END, f"  Posición: ({posicion_origen[0]:.6f}, {posicion_origen[1]:.6f})\n")
+        if origin.airport.sids:
+            path_text.insert(tk.END, f"  SIDs: {origin.airport.sids}\n")
         else:
             path_text.insert(tk.END, "  No tiene SIDs definidos\n")
         
         path_text.insert(tk.END, f"[Debug] Aeropuerto destino ({dest_name}):\n")
-        if dest_airport.stars:
-            path_text.insert(tk.END, f"  STARs: {dest_airport.stars}\n")
+        posicion_destino = get_airport_position(espacio_aereo, dest.airport)
+        if posicion_destino:
+            path_text.insert(tk.END, f"  Posición: ({posicion_destino[0]:.6f}, {posicion_destino[1]:.6f})\n")
+        if dest.airport.stars:
+            path_text.insert(tk.END, f"  STARs: {dest.airport.stars}\n")
         else:
             path_text.insert(tk.END, "  No tiene STARs definidos\n")
         
         path_text.insert(tk.END, "\n")
-    elif origin_is_airport:
+    elif origin.is_airport:
         path_text.insert(tk.END, f"Buscando ruta del aeropuerto {origin_name} al punto {dest_name} usando algoritmo A*...\n\n")
-    elif dest_is_airport:
+    elif dest.is_airport:
         path_text.insert(tk.END, f"Buscando ruta del punto {origin_name} al aeropuerto {dest_name} usando algoritmo A*...\n\n")
     else:
         path_text.insert(tk.END, f"Buscando ruta de {origin_name} a {dest_name} usando algoritmo A*...\n\n")
 
-    # Usar el algoritmo A* para encontrar la ruta (con depuración activada)
-    path_points, total_distance = find_shortest_path_astar(espacio_aereo, origin, dest, debug=True)
+    # Usar el algoritmo A* para encontrar la ruta (con depuración activada).
+    # Con aeropuertos se prueban todos los SIDs y STARs en una única búsqueda.
+    ruta = find_route(espacio_aereo, origin, dest, debug=True)
+    path_points, total_distance = ruta.path, ruta.distance
 
-    if not path_points:
+    if not ruta.found:
         path_text.insert(tk.END, "No se encontró ninguna ruta entre estos puntos.\n")
-        if origin_is_airport or dest_is_airport:
+        if origin.is_airport or dest.is_airport:
             path_text.insert(tk.END, "Esto puede deberse a que no existen SIDs o STARs que permitan conectar los aeropuertos,\n")
             path_text.insert(tk.END, "o a que se encuentran en componentes desconectados del grafo de navegación.\n")
         else:
@@ -855,8 +733,17 @@ def encontrar_y_mostrar_ruta(app, path_text, origin_point, dest_point):
             path_text.insert(tk.END, "Esto puede deberse a que se encuentran en componentes desconectados del grafo de navegación.\n")
         return
 
+    if not origin.is_airport:
+        path_text.insert(tk.END, duplicate_name_warning(espacio_aereo, origin_name))
+    if not dest.is_airport:
+        path_text.insert(tk.END, duplicate_name_warning(espacio_aereo, dest_name))
     path_text.insert(tk.END, f"Ruta encontrada: {len(path_points)} puntos\n")
-    path_text.insert(tk.END, f"Distancia total: {total_distance:.2f} km\n\n")
+    path_text.insert(tk.END, f"Distancia total: {total_distance:.2f} km\n")
+    if ruta.sid:
+        path_text.insert(tk.END, f"SID utilizado: {ruta.sid.name} (#{ruta.sid.number})\n")
+    if ruta.star:
+        path_text.insert(tk.END, f"STAR utilizado: {ruta.star.name} (#{ruta.star.number})\n")
+    path_text.insert(tk.END, "\n")
 
     path_text.insert(tk.END, "Puntos de la ruta:\n")
     for i, point in enumerate(path_points):
@@ -888,11 +775,13 @@ def comparar_rutas(app, origin_point=None, dest_point=None):
     origen = tk.StringVar(value=origin_point.get() if origin_point else "")
     entrada_origen = tk.Entry(frame_entrada, textvariable=origen, bg=app.tema["entry_bg"], fg=app.tema["entry_fg"])
     entrada_origen.pack(side=tk.LEFT, padx=5)
+    configurar_autocompletado(entrada_origen, origen)
 
     tk.Label(frame_entrada, text="Destino:", bg=app.tema["bg"], fg=app.tema["fg"]).pack(side=tk.LEFT, padx=5)
     destino = tk.StringVar(value=dest_point.get() if dest_point else "")
     entrada_destino = tk.Entry(frame_entrada, textvariable=destino, bg=app.tema["entry_bg"], fg=app.tema["entry_fg"])
     entrada_destino.pack(side=tk.LEFT, padx=5)
+    configurar_autocompletado(entrada_destino, destino)
 
     # Frame para resultados
     frame_resultados = tk.Frame(frame_principal, bg=app.tema["bg"])
@@ -940,77 +829,33 @@ def buscar_rutas(app, origen, destino, path_text, frame_botones):
             messagebox.showwarning("Advertencia", "Por favor ingrese nombres para el origen y destino.")
             return
 
-        # Verificar si el origen es un aeropuerto
-        origin_is_airport = origin_name.startswith(("LE", "LF"))
-        if origin_is_airport:
-            origin_airport = get_navairport_by_name(espacio_aereo, origin_name)
-            if not origin_airport:
-                path_text.insert(tk.END, f"ERROR: No se encontró ningún aeropuerto con el código '{origin_name}'.\n")
-                path_text.insert(tk.END, "Por favor verifique que el código del aeropuerto de origen sea correcto.\n")
-                return
-            origin = origin_name  # Usamos el código del aeropuerto directamente
-        else:
-            # Buscar como punto de navegación normal
-            origin = get_navpoint_by_name(espacio_aereo, origin_name)
-            if not origin:
-                path_text.insert(tk.END, f"ERROR: No se encontró ningún punto con el nombre '{origin_name}'.\n")
-                path_text.insert(tk.END, "Por favor verifique que el nombre del punto de origen sea correcto.\n")
-                return
-
-        # Verificar si el destino es un aeropuerto
-        dest_is_airport = dest_name.startswith(("LE", "LF"))
-        if dest_is_airport:
-            dest_airport = get_navairport_by_name(espacio_aereo, dest_name)
-            if not dest_airport:
-                path_text.insert(tk.END, f"ERROR: No se encontró ningún aeropuerto con el código '{dest_name}'.\n")
-                path_text.insert(tk.END, "Por favor verifique que el código del aeropuerto de destino sea correcto.\n")
-                return
-            dest = dest_name  # Usamos el código del aeropuerto directamente
-        else:
-            # Buscar como punto de navegación normal
-            dest = get_navpoint_by_name(espacio_aereo, dest_name)
-            if not dest:
-                path_text.insert(tk.END, f"ERROR: No se encontró ningún punto con el nombre '{dest_name}'.\n")
-                path_text.insert(tk.END, "Por favor verifique que el nombre del punto de destino sea correcto.\n")
-                return
-
-        # Si son puntos de navegación normales, verificar si tienen segmentos conectados
-        if not origin_is_airport and not dest_is_airport:
-            origin_has_segments = False
-            dest_has_segments = False
-            
-            for segment in espacio_aereo.navsegments:
-                if segment.origin_number == origin.number or segment.destination_number == origin.number:
-                    origin_has_segments = True
-                if segment.origin_number == dest.number or segment.destination_number == dest.number:
-                    dest_has_segments = True
-            
-            if not origin_has_segments:
-                path_text.insert(tk.END, f"ERROR: El punto '{origin.name}' no está conectado a ningún segmento.\n")
-                path_text.insert(tk.END, "Este punto está aislado en el grafo de navegación y no puede ser utilizado para ruteo.\n")
-                return
-            
-            if not dest_has_segments:
-                path_text.insert(tk.END, f"ERROR: El punto '{dest.name}' no está conectado a ningún segmento.\n")
-                path_text.insert(tk.END, "Este punto está aislado en el grafo de navegación y no puede ser utilizado para ruteo.\n")
-                return
+        # Resolver aeropuertos, puntos o coordenadas y comprobar que los puntos tienen segmentos
+        try:
+            origin = resolve_endpoint(espacio_aereo, origin_name, True)
+            path_text.insert(tk.END, origin.message)
+            dest = resolve_endpoint(espacio_aereo, dest_name, False)
+            path_text.insert(tk.END, dest.message)
+            check_connected(espacio_aereo, origin, dest)
+        except RoutingError as e:
+            path_text.insert(tk.END, str(e))
+            return
 
         # Mensaje personalizado según los tipos de origen y destino
-        if origin_is_airport and dest_is_airport:
+        if origin.is_airport and dest.is_airport:
             path_text.insert(tk.END, f"Buscando rutas alternativas del aeropuerto {origin_name} al aeropuerto {dest_name} usando algoritmo A*...\n\n")
-        elif origin_is_airport:
+        elif origin.is_airport:
             path_text.insert(tk.END, f"Buscando rutas alternativas del aeropuerto {origin_name} al punto {dest_name} usando algoritmo A*...\n\n")
-        elif dest_is_airport:
+        elif dest.is_airport:
             path_text.insert(tk.END, f"Buscando rutas alternativas del punto {origin_name} al aeropuerto {dest_name} usando algoritmo A*...\n\n")
         else:
             path_text.insert(tk.END, f"Buscando rutas alternativas de {origin_name} a {dest_name} usando algoritmo A*...\n\n")
 
-        # Encontrar múltiples rutas usando A*
-        rutas = find_multiple_paths_astar(espacio_aereo, origin, dest)
+        # Encontrar múltiples rutas (Yen + A*) que difieran al menos en un 30% de sus puntos
+        rutas = find_alternative_routes(espacio_aereo, origin, dest, min_difference=0.3)
 
         if not rutas:
             path_text.insert(tk.END, "No se encontraron rutas entre estos puntos.\n")
-            if origin_is_airport or dest_is_airport:
+            if origin.is_airport or dest.is_airport:
                 path_text.insert(tk.END, "Esto puede deberse a que no existen SIDs o STARs que permitan conectar los aeropuertos,\n")
                 path_text.insert(tk.END, "o a que se encuentran en componentes desconectados del grafo de navegación.\n")
             else:
@@ -1021,20 +866,7 @@ def buscar_rutas(app, origen, destino, path_text, frame_botones):
         app.rutas_alternativas = []
 
         # Mostrar cada ruta encontrada
-        for i, (distancia, ruta_nums) in enumerate(rutas):
-            if not isinstance(ruta_nums, list) or not isinstance(distancia, (int, float)):
-                continue
-
-            # Convertir números de puntos a objetos NavPoint
-            ruta = []
-            for num in ruta_nums:
-                navpoint = get_navpoint_by_number(espacio_aereo, num)
-                if navpoint:
-                    ruta.append(navpoint)
-
-            if len(ruta) != len(ruta_nums):
-                continue  # Si algún punto no se encontró, saltamos esta ruta
-
+        for i, (ruta, distancia) in enumerate(rutas):
             # Almacenar la ruta
             app.rutas_alternativas.append((ruta, distancia))
 
@@ -1073,31 +905,11 @@ def buscar_rutas(app, origen, destino, path_text, frame_botones):
         messagebox.showerror("Error", f"Error al buscar rutas: {str(e)}")
 
 def calcular_distancia_ruta(ruta):
-    distancia_total = 0
-    for i in range(len(ruta) - 1):
-        distancia_total += calcular_distancia_entre_puntos(ruta[i], ruta[i+1])
-    return distancia_total
+    coordenadas = get_coordinate_arrays(espacio_aereo)
+    return path_length(coordenadas, [punto.number for punto in ruta])
 
 def calcular_distancia_entre_puntos(point1, point2):
-    import math
-
-    # Convertir grados a radianes
-    lat1_rad = math.radians(point1.latitude)
-    lon1_rad = math.radians(point1.longitude)
-    lat2_rad = math.radians(point2.latitude)
-    lon2_rad = math.radians(point2.longitude)
-
-    # Radio de la Tierra en kilómetros
-    R = 6371.0
-
-    # Fórmula Haversine
-    dlon = lon2_rad - lon1_rad
-    dlat = lat2_rad - lat1_rad
-    a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    distance = R * c
-
-    return distance
+    return calculate_distance(espacio_aereo, point1, point2)
 
 # Funciones de integración con Google Earth
 def exportar_a_google_earth(app, ruta=None, punto_destacado=None, vecinos=None):
@@ -1146,23 +958,26 @@ def exportar_a_google_earth(app, ruta=None, punto_destacado=None, vecinos=None):
             messagebox.showerror("Error", f"Error al exportar vecinos: {str(e)}")
     else:
         # Exportar todo el espacio aéreo
-        kml_content = generate_airspace_kml(espacio_aereo)
-
         # Solicitar ubicación para guardar
         filename = filedialog.asksaveasfilename(
             defaultextension=".kml",
-            filetypes=[("Archivos KML", "*.kml"), ("Todos los archivos", "*.*")],
+            filetypes=[("Archivos KML", "*.kml"), ("Archivos KMZ comprimidos", "*.kmz"), ("Todos los archivos", "*.*")],
             title="Guardar espacio aéreo como KML"
         )
 
         if filename:
-            # Asegurarse de que el archivo tenga extensión .kml
-            if not filename.lower().endswith('.kml'):
+            # Asegurarse de que el archivo tenga extensión .kml o .kmz
+            if not filename.lower().endswith(('.kml', '.kmz')):
                 filename += '.kml'
                 
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(kml_content)
+                if filename.lower().endswith('.kmz'):
+                    # KMZ compacto: carpetas y estilos compartidos, comprimido según se escribe
+                    save_airspace_kmz(espacio_aereo, filename)
+                else:
+                    # El documento se escribe según se genera, sin construirlo entero en memoria
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        write_airspace_kml(espacio_aereo, f)
                 messagebox.showinfo("Éxito", f"Espacio aéreo exportado a {filename}")
 
                 # Preguntar si quiere abrir en Google Earth
@@ -1191,14 +1006,7 @@ def exportar_vecinos_a_google_earth(app, nav_point):
         return
         
     # Buscar vecinos del punto
-    vecinos = []
-    for segment in espacio_aereo.navsegments:
-        if get_origin_number(segment) == found_point.number:
-            destination_number = get_destination_number(segment)
-            if destination_number in espacio_aereo.navpoints:
-                vecino = espacio_aereo.navpoints[destination_number]
-                distancia = get_distance(segment)
-                vecinos.append((vecino, distancia))
+    found_point, vecinos = get_neighbors(espacio_aereo, found_point)
                 
     if not vecinos:
         messagebox.showwarning("Advertencia", f"No se encontraron vecinos para '{nav_name}'.")
@@ -1270,7 +1078,7 @@ def exportar_ruta_a_google_earth(app, origin_point, dest_point):
         return
 
     # Usar el algoritmo A* para encontrar la ruta
-    path_points, total_distance = find_shortest_path_astar(espacio_aereo, origin, dest)
+    path_points, total_distance = cached_shortest_path_astar(espacio_aereo, origin, destination)
 
     if not path_points:
         messagebox.showwarning("Advertencia", "No se encontró ninguna ruta entre estos puntos.")
@@ -1629,6 +1437,9 @@ def debug_airport_info(app, path_text):
     
     for code, airport in espacio_aereo.navairports.items():
         path_text.insert(tk.END, f"Aeropuerto: {code}\n")
+        position = get_airport_position(espacio_aereo, airport)
+        if position:
+            path_text.insert(tk.END, f"  Posición: ({position[0]:.6f}, {position[1]:.6f})\n")
         
         # Mostrar SIDs
         if airport.sids:
@@ -1931,6 +1742,7 @@ class AplicacionNavegacionEspacioAereo(tk.Tk):
         espacio_aereo = None
         
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
     app = AplicacionNavegacionEspacioAereo()
     app.mainloop()
 
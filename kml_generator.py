@@ -4,240 +4,309 @@ Este módulo maneja la generación de archivos KML para visualización en Google
 de elementos del espacio aéreo incluyendo puntos de navegación, aeropuertos, segmentos y rutas.
 """
 
+import io
+import zipfile
+
+from airSpace import find_segment_between, get_airport_position
+
 # Constantes globales para el encabezado y pie de KML
 KML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n<kml xmlns="http://www.opengis.net/kml/2.2">\n<Document>\n'
 KML_FOOTER = '</Document>\n</kml>'
+# Fragmentos que se acumulan antes de pasarlos al fichero de una sola vez
+WRITE_BUFFER_PARTS = 512
 
 def generate_point_kml(name, longitude, latitude, description=None, icon_style=None):
     """Generar KML para un único punto"""
-    kml_content = f'  <Placemark>\n    <name>{name}</name>\n'
+    parts = [f'  <Placemark>\n    <name>{name}</name>\n']
     
     if description:
-        kml_content += f'    <description>{description}</description>\n'
+        parts.append(f'    <description>{description}</description>\n')
         
     if icon_style:
-        kml_content += f'    <styleUrl>#{icon_style}</styleUrl>\n'
+        parts.append(f'    <styleUrl>#{icon_style}</styleUrl>\n')
         
-    kml_content += f'    <Point>\n      <coordinates>{longitude},{latitude},0</coordinates>\n    </Point>\n  </Placemark>\n'
-    return kml_content
+    parts.append(f'    <Point>\n      <coordinates>{longitude},{latitude},0</coordinates>\n    </Point>\n  </Placemark>\n')
+    return "".join(parts)
 
 def generate_line_kml(name, coordinates, description=None, line_style=None, z_index=0):
     """Generar KML para una línea (ruta o segmento)"""
-    kml_content = f'  <Placemark>\n    <name>{name}</name>\n'
+    parts = [f'  <Placemark>\n    <name>{name}</name>\n']
     
     if description:
-        kml_content += f'    <description>{description}</description>\n'
+        parts.append(f'    <description>{description}</description>\n')
         
     if line_style:
-        kml_content += f'    <styleUrl>#{line_style}</styleUrl>\n'
+        parts.append(f'    <styleUrl>#{line_style}</styleUrl>\n')
         
     # Añadir z-index para controlar el orden de renderizado    
     if z_index > 0:
-        kml_content += f'    <drawOrder>{z_index}</drawOrder>\n'
+        parts.append(f'    <drawOrder>{z_index}</drawOrder>\n')
         
-    kml_content += '    <LineString>\n      <altitudeMode>clampToGround</altitudeMode>\n      <extrude>1</extrude>\n      <tessellate>1</tessellate>\n      <coordinates>\n'
+    parts.append('    <LineString>\n      <altitudeMode>clampToGround</altitudeMode>\n      <extrude>1</extrude>\n      <tessellate>1</tessellate>\n      <coordinates>\n')
     
     # Añadir coordenadas en formato: longitud,latitud,0
-    for lon, lat in coordinates:
-        kml_content += f'        {lon},{lat},0\n'
+    parts.extend(f'        {lon},{lat},0\n' for lon, lat in coordinates)
         
-    kml_content += '      </coordinates>\n    </LineString>\n  </Placemark>\n'
-    return kml_content
+    parts.append('      </coordinates>\n    </LineString>\n  </Placemark>\n')
+    return "".join(parts)
 
 def add_style(style_id, color, icon=None, width=None):
     """Añadir una definición de estilo al KML"""
-    style = f'  <Style id="{style_id}">\n'
-    
     if icon:
-        style += f'    <IconStyle>\n      <color>{color}</color>\n      <Icon>\n        <href>{icon}</href>\n      </Icon>\n    </IconStyle>\n'
+        body = f'    <IconStyle>\n      <color>{color}</color>\n      <Icon>\n        <href>{icon}</href>\n      </Icon>\n    </IconStyle>\n'
     else:
-        style += f'    <LineStyle>\n      <color>{color}</color>\n      <width>{width}</width>\n    </LineStyle>\n'
+        body = f'    <LineStyle>\n      <color>{color}</color>\n      <width>{width}</width>\n    </LineStyle>\n'
+    return f'  <Style id="{style_id}">\n{body}  </Style>\n'
+
+
+def generate_plain_lines_kml(coordinate_lists, indent='    '):
+    """LineString sin atributos opcionales, uno por lista de coordenadas (para Placemark compactos y MultiGeometry)"""
+    return "".join(
+        f'{indent}<LineString><tessellate>1</tessellate><coordinates>'
+        + " ".join(f'{lon},{lat},0' for lon, lat in coordinates)
+        + '</coordinates></LineString>\n'
+        for coordinates in coordinate_lists)
+
+class KMLWriter:
+    """
+    Escribe un documento KML en un fichero abierto según se generan sus
+    elementos, sin construir el documento entero en memoria. Los fragmentos se
+    agrupan y se escriben de WRITE_BUFFER_PARTS en WRITE_BUFFER_PARTS.
+
+    Uso:
+        with open("espacio.kml", "w", encoding="utf-8") as f, KMLWriter(f) as kml:
+            kml.style("navpoint_style", "ff0000ff", icon=...)
+            kml.point(...)
+    """
+    def __init__(self, output, buffer_parts=WRITE_BUFFER_PARTS):
+        self.output = output
+        self.buffer_parts = buffer_parts
+        self.parts = []
+        self.placemarks = 0
+
+    def __enter__(self):
+        self.write(KML_HEADER)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.write(KML_FOOTER)
+        self.flush()
+        return False
+
+    def write(self, text):
+        self.parts.append(text)
+        if len(self.parts) >= self.buffer_parts:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.output.write("".join(self.parts))
+            self.parts.clear()
+
+    def style(self, style_id, color, icon=None, width=None):
+        self.write(add_style(style_id, color, icon, width))
+
+    def point(self, name, longitude, latitude, description=None, icon_style=None):
+        self.placemarks += 1
+        self.write(generate_point_kml(name, longitude, latitude, description, icon_style))
+
+    def line(self, name, coordinates, description=None, line_style=None, z_index=0):
+        self.placemarks += 1
+        self.write(generate_line_kml(name, coordinates, description, line_style, z_index))
+
+    def plain_line(self, name, coordinates, line_style):
+        """Línea sin descripción ni orden de dibujo, con el estilo compartido line_style"""
+        self.placemarks += 1
+        self.write(f'  <Placemark><name>{name}</name><styleUrl>#{line_style}</styleUrl>\n'
+                   + generate_plain_lines_kml([coordinates]) + '  </Placemark>\n')
+
+    def multi_line(self, name, coordinate_lists, line_style):
+        """Un único Placemark con todas las líneas en un MultiGeometry"""
+        self.placemarks += 1
+        self.write(f'  <Placemark>\n    <name>{name}</name>\n    <styleUrl>#{line_style}</styleUrl>\n    <MultiGeometry>\n')
+        batch = []
+        for coordinates in coordinate_lists:
+            batch.append(coordinates)
+            if len(batch) >= self.buffer_parts:
+                self.write(generate_plain_lines_kml(batch, '      '))
+                batch.clear()
+        self.write(generate_plain_lines_kml(batch, '      '))
+        self.write('    </MultiGeometry>\n  </Placemark>\n')
+
+    def open_folder(self, name):
+        self.write(f'  <Folder>\n    <name>{name}</name>\n')
+
+    def close_folder(self):
+        self.write('  </Folder>\n')
+
+
+def airport_coordinates(airspace, airport):
+    """(longitud, latitud) del aeropuerto para el KML o None si no tiene puntos asociados"""
+    position = get_airport_position(airspace, airport)
+    return (position[1], position[0]) if position else None
+
+def write_airspace_kml(airspace, output):
+    """Escribir en output (fichero de texto abierto) el KML de todo el espacio aéreo"""
+    with KMLWriter(output) as kml:
+        # Añadir estilos
+        kml.style("navpoint_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+        kml.style("airport_style", "ff00ff00", icon="http://maps.google.com/mapfiles/kml/shapes/airports.png")
+        kml.style("segment_style", "ffffff00", width="1")  # Color celeste en formato AABBGGRR (el color aparece invertido en KML)
+        kml.style("path_style", "ff800080", width="4")  # Morado verdadero (menos rosa)
         
-    style += '  </Style>\n'
-    return style
+        # Añadir puntos de navegación
+        for number, point in airspace.navpoints.items():
+            kml.point(point.name, point.longitude, point.latitude, f"Punto de Navegación #{number}", "navpoint_style")
+        
+        # Añadir aeropuertos
+        for name, airport in airspace.navairports.items():
+            airport_coords = airport_coordinates(airspace, airport)
+            if airport_coords:
+                kml.point(name, airport_coords[0], airport_coords[1], f"Aeropuerto: {name}", "airport_style")
+        
+        # Añadir segmentos
+        navpoints = airspace.navpoints
+        for segment in airspace.navsegments:
+            origin = navpoints.get(segment.origin_number)
+            destination = navpoints.get(segment.destination_number)
+            
+            if origin and destination:
+                kml.line(
+                    f"Segmento {origin.name} - {destination.name}",
+                    [(origin.longitude, origin.latitude), (destination.longitude, destination.latitude)],
+                    f"Distancia: {segment.distance:.2f} km",
+                    "segment_style",
+                    z_index=1  # Z-index base para los segmentos normales
+                )
 
 def generate_airspace_kml(airspace):
     """Generar KML para todo el espacio aéreo"""
-    kml_content = KML_HEADER
-    
-    # Añadir estilos
-    kml_content += add_style("navpoint_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
-    kml_content += add_style("airport_style", "ff00ff00", icon="http://maps.google.com/mapfiles/kml/shapes/airports.png")
-    kml_content += add_style("segment_style", "ffffff00", width="1")  # Color celeste en formato AABBGGRR (el color aparece invertido en KML)
-    kml_content += add_style("path_style", "ff800080", width="4")  # Morado verdadero (menos rosa)
-    
-    # Añadir puntos de navegación
-    for number, point in airspace.navpoints.items():
-        description = f"Punto de Navegación #{number}"
-        kml_content += generate_point_kml(
-            point.name, 
-            point.longitude, 
-            point.latitude, 
-            description,
-            "navpoint_style"
-        )
-    
-    # Añadir aeropuertos
-    for name, airport in airspace.navairports.items():
-        # Encontrar un punto de navegación asociado con este aeropuerto para obtener coordenadas
-        airport_coords = None
-        for point in airspace.navpoints.values():
-            if point.name == name or point.number in airport.sids or point.number in airport.stars:
-                airport_coords = (point.longitude, point.latitude)
-                break
+    output = io.StringIO()
+    write_airspace_kml(airspace, output)
+    return output.getvalue()
+
+def write_airspace_folders_kml(airspace, output, merge_segments=False):
+    """
+    Escribir en output un KML compacto del espacio aéreo: puntos, aeropuertos y
+    segmentos en carpetas, con estilos compartidos y sin descripciones ni
+    atributos repetidos en cada segmento.
+
+    Args:
+        merge_segments: Si es True, todos los segmentos forman un único
+                        Placemark con un MultiGeometry
+
+    Returns:
+        Número de Placemark escritos
+    """
+    navpoints = airspace.navpoints
+    with KMLWriter(output) as kml:
+        kml.write(f'  <name>{airspace.name or "Espacio aéreo"}</name>\n')
+        kml.style("navpoint_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+        kml.style("airport_style", "ff00ff00", icon="http://maps.google.com/mapfiles/kml/shapes/airports.png")
+        kml.style("segment_style", "ffffff00", width="1")
+
+        kml.open_folder("Puntos de navegación")
+        for number, point in navpoints.items():
+            kml.point(point.name, point.longitude, point.latitude, icon_style="navpoint_style")
+        kml.close_folder()
+
+        kml.open_folder("Aeropuertos")
+        for name, airport in airspace.navairports.items():
+            airport_coords = airport_coordinates(airspace, airport)
+            if airport_coords:
+                kml.point(name, airport_coords[0], airport_coords[1], icon_style="airport_style")
+        kml.close_folder()
+
+        kml.open_folder("Segmentos")
+        lines = ((segment, navpoints.get(segment.origin_number), navpoints.get(segment.destination_number))
+                 for segment in airspace.navsegments)
+        lines = ((segment, origin, destination) for segment, origin, destination in lines if origin and destination)
+        if merge_segments:
+            kml.multi_line("Segmentos", ([(origin.longitude, origin.latitude), (destination.longitude, destination.latitude)]
+                                         for _, origin, destination in lines), "segment_style")
+        else:
+            for segment, origin, destination in lines:
+                kml.plain_line(f"{origin.name} - {destination.name}",
+                               [(origin.longitude, origin.latitude), (destination.longitude, destination.latitude)],
+                               "segment_style")
+        kml.close_folder()
+    return kml.placemarks
+
+def save_airspace_kmz(airspace, filename, merge_segments=False, compresslevel=6):
+    """
+    Guardar el espacio aéreo como KMZ (doc.kml comprimido en un zip). El KML se
+    comprime según se escribe, sin construirlo entero en memoria.
+
+    Returns:
+        Número de Placemark escritos
+    """
+    with zipfile.ZipFile(filename, 'w', zipfile.ZIP_DEFLATED, compresslevel=compresslevel) as archive:
+        with archive.open("doc.kml", 'w') as raw, io.TextIOWrapper(raw, encoding='utf-8') as output:
+            return write_airspace_folders_kml(airspace, output, merge_segments)
+
+def write_path_kml(path_name, path_points, output):
+    """Escribir en output el KML de una ruta específica"""
+    with KMLWriter(output) as kml:
+        # Añadir estilos
+        kml.style("point_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+        kml.style("path_style", "ff800080", width="3")  # Morado verdadero (menos rosa)
         
-        if airport_coords:
-            description = f"Aeropuerto: {name}"
-            kml_content += generate_point_kml(
-                name,
-                airport_coords[0],
-                airport_coords[1],
-                description,
-                "airport_style"
-            )
-    
-    # Añadir segmentos
-    for segment in airspace.navsegments:
-        origin = airspace.navpoints.get(segment.origin_number)
-        destination = airspace.navpoints.get(segment.destination_number)
+        # Añadir puntos de la ruta
+        for point in path_points:
+            kml.point(point.name, point.longitude, point.latitude, f"Punto de Navegación: {point.name}", "point_style")
         
-        if origin and destination:
-            segment_name = f"Segmento {origin.name} - {destination.name}"
-            coordinates = [(origin.longitude, origin.latitude), 
-                           (destination.longitude, destination.latitude)]
-            
-            description = f"Distancia: {segment.distance:.2f} km"
-            kml_content += generate_line_kml(
-                segment_name,
-                coordinates,
-                description,
-                "segment_style",
-                z_index=1  # Z-index base para los segmentos normales
+        # Añadir la línea de la ruta
+        if len(path_points) >= 2:
+            kml.line(
+                path_name,
+                [(point.longitude, point.latitude) for point in path_points],
+                f"Ruta con {len(path_points)} puntos",
+                "path_style",
+                z_index=10  # Z-index alto para que se vea encima de todo
             )
     
-    kml_content += KML_FOOTER
-    return kml_content
-    
 def generate_path_kml(path_name, path_points):
     """Generar KML para una ruta específica"""
-    kml_content = KML_HEADER
-    
-    # Añadir estilos
-    kml_content += add_style("point_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
-    kml_content += add_style("path_style", "ff800080", width="3")  # Morado verdadero (menos rosa)
-    
-    # Añadir puntos de la ruta
-    for point in path_points:
-        kml_content += generate_point_kml(
-            point.name, 
-            point.longitude, 
-            point.latitude, 
-            f"Punto de Navegación: {point.name}",
-            "point_style"
-        )
-    
-    # Añadir la línea de la ruta
-    if len(path_points) >= 2:
-        coordinates = [(point.longitude, point.latitude) for point in path_points]
-        kml_content += generate_line_kml(
-            path_name,
-            coordinates,
-            f"Ruta con {len(path_points)} puntos",
-            "path_style",
-            z_index=10  # Z-index alto para que se vea encima de todo
-        )
-    
-    kml_content += KML_FOOTER
-    return kml_content
+    output = io.StringIO()
+    write_path_kml(path_name, path_points, output)
+    return output.getvalue()
 
-def generate_neighbors_kml(central_point, neighbors, airspace=None):
-    """Generar KML para un punto central y sus vecinos"""
-    kml_content = KML_HEADER
-    
-    # Añadir estilos
-    kml_content += add_style("central_point_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
-    kml_content += add_style("neighbor_point_style", "ff00ff00", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
-    kml_content += add_style("connection_style", "ffaa0000", width="3")  # Azul oscuro, más grueso
-    
-    # Añadir punto central
-    kml_content += generate_point_kml(
-        central_point.name, 
-        central_point.longitude, 
-        central_point.latitude, 
-        f"Punto Central: {central_point.name}",
-        "central_point_style"
-    )
-    
-    # Añadir vecinos y sus conexiones al punto central
-    for neighbor_info in neighbors:
-        neighbor = neighbor_info[0]
-        distance = neighbor_info[1]
+def write_neighbors_kml(central_point, neighbors, output, airspace=None):
+    """Escribir en output el KML de un punto central y sus vecinos"""
+    with KMLWriter(output) as kml:
+        # Añadir estilos
+        kml.style("central_point_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+        kml.style("neighbor_point_style", "ff00ff00", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+        kml.style("connection_style", "ffaa0000", width="3")  # Azul oscuro, más grueso
         
-        # Añadir punto vecino
-        kml_content += generate_point_kml(
-            neighbor.name, 
-            neighbor.longitude, 
-            neighbor.latitude, 
-            f"Vecino: {neighbor.name}, Distancia: {distance:.2f}",
-            "neighbor_point_style"
-        )
+        # Añadir punto central
+        kml.point(central_point.name, central_point.longitude, central_point.latitude,
+                  f"Punto Central: {central_point.name}", "central_point_style")
         
-        # Si tenemos acceso al espacio aéreo completo, usamos los segmentos originales
-        if airspace:
-            segment_found = False
-            for segment in airspace.navsegments:
-                if ((segment.origin_number == central_point.number and segment.destination_number == neighbor.number) or
-                    (segment.destination_number == central_point.number and segment.origin_number == neighbor.number)):
-                    
-                    segment_name = f"Conexión: {central_point.name} - {neighbor.name}"
-                    coordinates = [
-                        (central_point.longitude, central_point.latitude),
-                        (neighbor.longitude, neighbor.latitude)
-                    ]
-                    
-                    kml_content += generate_line_kml(
-                        segment_name,
-                        coordinates,
-                        f"Distancia: {segment.distance:.2f} km",
-                        "connection_style",
-                        z_index=5  # Z-index intermedio
-                    )
-                    segment_found = True
-                    break
-                    
-            # Si no encontramos un segmento existente, creamos una línea directa
-            if not segment_found:
-                segment_name = f"Conexión: {central_point.name} - {neighbor.name}"
-                coordinates = [
-                    (central_point.longitude, central_point.latitude),
-                    (neighbor.longitude, neighbor.latitude)
-                ]
-                
-                kml_content += generate_line_kml(
-                    segment_name,
-                    coordinates,
-                    f"Distancia: {distance:.2f} km",
-                    "connection_style",
-                    z_index=5  # Z-index intermedio
-                )
-        else:
-            # Crear una línea directa
-            segment_name = f"Conexión: {central_point.name} - {neighbor.name}"
-            coordinates = [
-                (central_point.longitude, central_point.latitude),
-                (neighbor.longitude, neighbor.latitude)
-            ]
+        # Añadir vecinos y sus conexiones al punto central
+        for neighbor, distance in neighbors:
+            # Añadir punto vecino
+            kml.point(neighbor.name, neighbor.longitude, neighbor.latitude,
+                      f"Vecino: {neighbor.name}, Distancia: {distance:.2f}", "neighbor_point_style")
             
-            kml_content += generate_line_kml(
-                segment_name,
-                coordinates,
-                f"Distancia: {distance:.2f} km",
+            # Si tenemos acceso al espacio aéreo completo, usamos la distancia del segmento original;
+            # si no existe, se dibuja una línea directa con la distancia del vecino
+            segment = find_segment_between(airspace, central_point.number, neighbor.number) if airspace else None
+            line_distance = segment.distance if segment else distance
+            kml.line(
+                f"Conexión: {central_point.name} - {neighbor.name}",
+                [(central_point.longitude, central_point.latitude), (neighbor.longitude, neighbor.latitude)],
+                f"Distancia: {line_distance:.2f} km",
                 "connection_style",
                 z_index=5  # Z-index intermedio
             )
-    
-    kml_content += KML_FOOTER
-    return kml_content
+
+def generate_neighbors_kml(central_point, neighbors, airspace=None):
+    """Generar KML para un punto central y sus vecinos"""
+    output = io.StringIO()
+    write_neighbors_kml(central_point, neighbors, output, airspace)
+    return output.getvalue()
 
 def save_kml_to_file(kml_content, filename):
     """Guardar contenido KML en un archivo"""
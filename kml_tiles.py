@@ -0,0 +1,254 @@
+"""
+Exportación KML por teselas con nivel de detalle (Region y NetworkLink).
+
+Los puntos se reparten en un quadtree de latitud/longitud sobre los límites
+del espacio aéreo: una tesela con más de max_points puntos se divide en cuatro
+hasta max_depth niveles. Cada segmento va a la tesela más pequeña que contiene
+sus dos extremos, así que los segmentos largos quedan en los niveles altos. El
+reparto se calcula con una sola pasada por los puntos y otra por los
+segmentos.
+
+Cada tesela se escribe en su propio fichero con una Region y enlaces
+(NetworkLink con viewRefreshMode onRegion) a sus hijas, de modo que el visor
+solo carga el detalle de la zona visible. Los ficheros de las teselas se
+escriben en varios procesos.
+"""
+
+import multiprocessing
+import os
+
+import numpy as np
+
+from distance_kernel import get_coordinate_arrays
+from kml_generator import KMLWriter, airport_coordinates
+
+DEFAULT_MAX_POINTS = 256
+DEFAULT_MAX_DEPTH = 8
+# Tamaño en píxeles a partir del cual se carga y se muestra una tesela
+LOD_MIN_PIXELS = 256
+TILES_DIRECTORY = "tiles"
+ROOT_FILE = "doc.kml"
+
+
+class Tile:
+    """Tesela del quadtree; x e y cuentan desde el oeste y el sur en su nivel"""
+    __slots__ = ("level", "x", "y", "points", "segments", "children")
+
+    def __init__(self, level, x, y):
+        self.level = level
+        self.x = x
+        self.y = y
+        self.points = []  # filas (nombre, longitud, latitud), solo en las hojas
+        self.segments = []  # filas (nombre, lon1, lat1, lon2, lat2)
+        self.children = {}  # (x, y) de la hija -> Tile, vacío en las hojas
+
+    @property
+    def key(self):
+        return f"{self.level}_{self.x}_{self.y}"
+
+    def walk(self):
+        """Genera la tesela y todas sus descendientes"""
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+
+class TileGrid:
+    """Límites del quadtree y conversión de coordenadas a celdas del nivel más profundo"""
+    def __init__(self, west, south, east, north, max_depth):
+        self.west = west
+        self.south = south
+        # Un espacio aéreo con todos los puntos en la misma longitud o latitud sigue teniendo área
+        self.width = max(east - west, 1e-6)
+        self.height = max(north - south, 1e-6)
+        self.max_depth = max_depth
+        self.cells = 1 << max_depth
+
+    def cell(self, longitude, latitude):
+        cx = int((longitude - self.west) / self.width * self.cells)
+        cy = int((latitude - self.south) / self.height * self.cells)
+        return min(max(cx, 0), self.cells - 1), min(max(cy, 0), self.cells - 1)
+
+    def bounds(self, tile):
+        """(oeste, sur, este, norte) de una tesela"""
+        width = self.width / (1 << tile.level)
+        height = self.height / (1 << tile.level)
+        west = self.west + tile.x * width
+        south = self.south + tile.y * height
+        return west, south, west + width, south + height
+
+
+def _grid_for(airspace, max_depth):
+    if not airspace.navpoints:
+        # Sin puntos queda una única tesela vacía
+        return TileGrid(0.0, 0.0, 0.0, 0.0, max_depth)
+    coords = get_coordinate_arrays(airspace)
+    latitudes = np.degrees(coords.latitudes)
+    longitudes = np.degrees(coords.longitudes)
+    # Margen para que las conversiones a radianes y de vuelta no dejen puntos fuera
+    margin = 1e-9
+    return TileGrid(float(longitudes.min()) - margin, float(latitudes.min()) - margin,
+                    float(longitudes.max()) + margin, float(latitudes.max()) + margin, max_depth)
+
+
+def _split(tile, cells, rows, max_points, max_depth):
+    """Divide recursivamente una tesela con las celdas y filas de sus puntos"""
+    if len(rows) <= max_points or tile.level >= max_depth:
+        tile.points = rows
+        return tile
+    shift = max_depth - tile.level - 1
+    groups = {}
+    for (cx, cy), row in zip(cells, rows):
+        child = groups.setdefault(((cx >> shift) & 1, (cy >> shift) & 1), ([], []))
+        child[0].append((cx, cy))
+        child[1].append(row)
+    for (dx, dy), (child_cells, child_rows) in sorted(groups.items()):
+        child = Tile(tile.level + 1, 2 * tile.x + dx, 2 * tile.y + dy)
+        tile.children[(child.x, child.y)] = _split(child, child_cells, child_rows, max_points, max_depth)
+    return tile
+
+
+def _segment_tile(root, first, second, max_depth):
+    """Tesela más pequeña del árbol que contiene las dos celdas"""
+    tile = root
+    while tile.children:
+        shift = max_depth - tile.level - 1
+        child = (first[0] >> shift, first[1] >> shift)
+        if child != (second[0] >> shift, second[1] >> shift):
+            break
+        tile = tile.children[child]
+    return tile
+
+
+def build_tiles(airspace, max_points=DEFAULT_MAX_POINTS, max_depth=DEFAULT_MAX_DEPTH):
+    """
+    Reparte los puntos y segmentos del espacio aéreo en un quadtree.
+
+    Returns:
+        Una tupla (TileGrid, Tile raíz)
+    """
+    grid = _grid_for(airspace, max_depth)
+    cell_of = {}
+    cells = []
+    rows = []
+    for number, point in airspace.navpoints.items():
+        cell = grid.cell(point.longitude, point.latitude)
+        cell_of[number] = cell
+        cells.append(cell)
+        rows.append((point.name, point.longitude, point.latitude))
+    root = _split(Tile(0, 0, 0), cells, rows, max_points, max_depth)
+
+    navpoints = airspace.navpoints
+    for segment in airspace.navsegments:
+        first = cell_of.get(segment.origin_number)
+        second = cell_of.get(segment.destination_number)
+        if first is None or second is None:
+            continue
+        origin = navpoints[segment.origin_number]
+        destination = navpoints[segment.destination_number]
+        _segment_tile(root, first, second, max_depth).segments.append(
+            (f"{origin.name} - {destination.name}", origin.longitude, origin.latitude,
+             destination.longitude, destination.latitude))
+    return grid, root
+
+
+def region_kml(bounds, min_pixels=LOD_MIN_PIXELS, indent='  '):
+    """Region con el recuadro (oeste, sur, este, norte) y su nivel de detalle"""
+    west, south, east, north = bounds
+    return (f'{indent}<Region>\n'
+            f'{indent}  <LatLonAltBox><north>{north}</north><south>{south}</south>'
+            f'<east>{east}</east><west>{west}</west></LatLonAltBox>\n'
+            f'{indent}  <Lod><minLodPixels>{min_pixels}</minLodPixels><maxLodPixels>-1</maxLodPixels></Lod>\n'
+            f'{indent}</Region>\n')
+
+
+def network_link_kml(name, href, bounds, min_pixels=LOD_MIN_PIXELS):
+    """NetworkLink que carga href cuando su Region se ve con suficiente tamaño"""
+    return (f'  <NetworkLink>\n    <name>{name}</name>\n'
+            + region_kml(bounds, min_pixels, '    ')
+            + f'    <Link><href>{href}</href><viewRefreshMode>onRegion</viewRefreshMode></Link>\n'
+            '  </NetworkLink>\n')
+
+
+def _write_styles(kml):
+    kml.style("navpoint_style", "ff0000ff", icon="http://maps.google.com/mapfiles/kml/shapes/placemark_circle.png")
+    kml.style("airport_style", "ff00ff00", icon="http://maps.google.com/mapfiles/kml/shapes/airports.png")
+    kml.style("segment_style", "ffffff00", width="1")
+
+
+def _write_tile(job):
+    """Escribe el fichero de una tesela; job contiene solo datos simples para poder enviarlo a otro proceso"""
+    filename, key, bounds, points, segments, links = job
+    with open(filename, 'w', encoding='utf-8') as output, KMLWriter(output) as kml:
+        kml.write(f'  <name>{key}</name>\n')
+        kml.write(region_kml(bounds))
+        _write_styles(kml)
+        for name, longitude, latitude in points:
+            kml.point(name, longitude, latitude, icon_style="navpoint_style")
+        for name, lon1, lat1, lon2, lat2 in segments:
+            kml.plain_line(name, [(lon1, lat1), (lon2, lat2)], "segment_style")
+        for link in links:
+            kml.write(network_link_kml(*link))
+    return kml.placemarks
+
+
+def _tile_jobs(grid, root, tiles_directory):
+    for tile in root.walk():
+        links = [(child.key, f"{child.key}.kml", grid.bounds(child)) for child in tile.children.values()]
+        yield (os.path.join(tiles_directory, f"{tile.key}.kml"), tile.key, grid.bounds(tile),
+               tile.points, tile.segments, links)
+
+
+def write_tiles(grid, root, directory, processes=1):
+    """
+    Escribe un fichero por tesela en directory/tiles.
+
+    Args:
+        processes: Procesos que escriben las teselas (None usa todos los núcleos; 1 no crea procesos)
+
+    Returns:
+        Número total de Placemark escritos
+    """
+    tiles_directory = os.path.join(directory, TILES_DIRECTORY)
+    os.makedirs(tiles_directory, exist_ok=True)
+    jobs = _tile_jobs(grid, root, tiles_directory)
+    if processes == 1:
+        return sum(_write_tile(job) for job in jobs)
+    with multiprocessing.Pool(processes) as pool:
+        return sum(pool.imap_unordered(_write_tile, jobs, chunksize=8))
+
+
+def write_root_kml(airspace, grid, root, directory):
+    """Escribe directory/doc.kml: los aeropuertos, siempre visibles, y el enlace a la tesela raíz"""
+    with open(os.path.join(directory, ROOT_FILE), 'w', encoding='utf-8') as output, KMLWriter(output) as kml:
+        kml.write(f'  <name>{airspace.name or "Espacio aéreo"}</name>\n')
+        _write_styles(kml)
+        kml.open_folder("Aeropuertos")
+        for name, airport in airspace.navairports.items():
+            airport_coords = airport_coordinates(airspace, airport)
+            if airport_coords:
+                kml.point(name, airport_coords[0], airport_coords[1], icon_style="airport_style")
+        kml.close_folder()
+        # La tesela raíz se carga sin límite de tamaño
+        kml.write(network_link_kml("Espacio aéreo por teselas", f"{TILES_DIRECTORY}/{root.key}.kml",
+                                   grid.bounds(root), min_pixels=0))
+
+
+def export_tiled_kml(airspace, directory, max_points=DEFAULT_MAX_POINTS, max_depth=DEFAULT_MAX_DEPTH,
+                     processes=1):
+    """
+    Escribe el espacio aéreo por teselas: directory/doc.kml (aeropuertos y
+    enlace a la tesela raíz) y un fichero por tesela en directory/tiles.
+
+    Args:
+        max_points: Puntos a partir de los cuales se divide una tesela
+        max_depth: Nivel máximo del quadtree
+        processes: Procesos que escriben las teselas (None usa todos los núcleos)
+
+    Returns:
+        La Tile raíz del quadtree escrito
+    """
+    grid, root = build_tiles(airspace, max_points, max_depth)
+    write_tiles(grid, root, directory, processes)
+    write_root_kml(airspace, grid, root, directory)
+    return root
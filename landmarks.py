@@ -0,0 +1,157 @@
+"""
+Heurística ALT (A*, landmarks y desigualdad triangular).
+
+Se eligen unos pocos puntos de referencia (landmarks) repartidos por la red y
+se calculan con Dijkstra las distancias desde cada uno a todos los puntos y de
+todos los puntos hasta él. Por la desigualdad triangular, para cualquier
+landmark L la distancia de v a t cumple
+
+    d(v, t) >= d(L, t) - d(L, v)    y    d(v, t) >= d(v, L) - d(t, L)
+
+así que el máximo de esas cotas es una heurística admisible y consistente para
+A* con las distancias de los segmentos, sin depender de la geometría.
+"""
+
+import heapq
+from array import array
+
+from airSpace import get_derived, set_derived
+from csr_graph import get_csr_graph, get_reverse_csr_graph
+
+INFINITY = float('inf')
+
+
+class LandmarkTable:
+    """Distancias desde y hasta cada landmark, indexadas por identificador denso del grafo CSR"""
+    def __init__(self, landmarks, from_distances, to_distances, directed=False):
+        self.landmarks = landmarks  # array('i'): identificadores densos de los landmarks
+        self.from_distances = from_distances  # lista de array('d'): d(L, v) por landmark
+        self.to_distances = to_distances  # lista de array('d'): d(v, L); las mismas si no es dirigido
+        self.directed = directed
+
+    def __len__(self):
+        return len(self.landmarks)
+
+    def nbytes(self):
+        arrays = self.from_distances + (self.to_distances if self.directed else [])
+        return sum(a.itemsize * len(a) for a in arrays) + self.landmarks.itemsize * len(self.landmarks)
+
+
+def _distances_from(graph, source):
+    """Dijkstra completo desde un identificador denso; infinito en los nodos inalcanzables"""
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    distances = array('d', [INFINITY]) * len(graph)
+    distances[source] = 0.0
+    queue = [(0.0, source)]
+    while queue:
+        distance, node = heapq.heappop(queue)
+        if distance > distances[node]:
+            continue
+        first = offsets[node]
+        last = offsets[node + 1]
+        for neighbor, weight in zip(targets[first:last], weights[first:last]):
+            new_distance = distance + weight
+            if new_distance < distances[neighbor]:
+                distances[neighbor] = new_distance
+                heapq.heappush(queue, (new_distance, neighbor))
+    return distances
+
+
+def select_landmarks(airspace, count=8):
+    """
+    Elige landmarks por el método del más alejado: el primero es el punto más
+    lejano a un punto inicial y cada uno de los siguientes el que está más lejos
+    de los ya elegidos (sobre el grafo no dirigido). Los puntos inalcanzables
+    desde los landmarks elegidos no se consideran.
+
+    Returns:
+        Lista de identificadores densos del grafo CSR
+    """
+    graph = get_csr_graph(airspace)
+    if not len(graph) or count <= 0:
+        return []
+
+    # El punto inicial es el de más tramos, que está en la componente principal
+    start = max(range(len(graph)), key=lambda node: graph.offsets[node + 1] - graph.offsets[node])
+    nearest = _distances_from(graph, start)
+    landmarks = []
+    while len(landmarks) < count:
+        candidate = -1
+        best = 0.0
+        for node, distance in enumerate(nearest):
+            if best < distance < INFINITY:
+                candidate, best = node, distance
+        if candidate < 0:
+            break
+        landmarks.append(candidate)
+        for node, distance in enumerate(_distances_from(graph, candidate)):
+            if distance < nearest[node]:
+                nearest[node] = distance
+    return landmarks
+
+
+def build_landmarks(airspace, count=8, directed=False):
+    """Elige los landmarks y calcula sus distancias sobre el grafo dirigido o no dirigido"""
+    landmarks = select_landmarks(airspace, count)
+    graph = get_csr_graph(airspace, directed)
+    from_distances = [_distances_from(graph, landmark) for landmark in landmarks]
+    if directed:
+        reverse = get_reverse_csr_graph(airspace)
+        to_distances = [_distances_from(reverse, landmark) for landmark in landmarks]
+    else:
+        to_distances = from_distances
+    return LandmarkTable(array('i', landmarks), from_distances, to_distances, directed)
+
+
+def precompute_landmarks(airspace, count=8, directed=False):
+    """
+    Calcula los landmarks y los deja asociados al espacio aéreo: a partir de ese
+    momento astar_search los combina con la heurística ortodrómica.
+    """
+    table = build_landmarks(airspace, count, directed)
+    set_derived(airspace, "landmarks_directed" if directed else "landmarks", table)
+    return table
+
+
+def get_landmarks(airspace, directed=False):
+    """Landmarks vigentes del espacio aéreo o None si no se han calculado para esta versión"""
+    return get_derived(airspace, "landmarks_directed" if directed else "landmarks")
+
+
+def landmark_bound(table, node, target_rows):
+    """
+    Cota inferior de la distancia de node al destino más cercano.
+
+    Args:
+        table: LandmarkTable
+        node: Identificador denso del nodo
+        target_rows: Resultado de target_landmark_rows para los destinos
+
+    Returns:
+        La cota en km (infinito si ningún destino es alcanzable desde node)
+    """
+    from_distances = table.from_distances
+    to_distances = table.to_distances
+    best = INFINITY
+    for row in target_rows:
+        bound = 0.0
+        for i, (from_target, to_target) in enumerate(row):
+            from_node = from_distances[i][node]
+            to_node = to_distances[i][node]
+            # d(v, t) >= d(L, t) - d(L, v): si L llega a v pero no a t, v tampoco llega a t
+            if from_node < INFINITY:
+                bound = max(bound, from_target - from_node)
+            # d(v, t) >= d(v, L) - d(t, L): si t llega a L pero v no, v no llega a t
+            if to_target < INFINITY:
+                bound = max(bound, to_node - to_target)
+        if bound < best:
+            best = bound
+    return best
+
+
+def target_landmark_rows(table, targets):
+    """Distancias (d(L, t), d(t, L)) de cada landmark para cada destino"""
+    return [[(table.from_distances[i][t], table.to_distances[i][t]) for i in range(len(table))]
+            for t in targets]
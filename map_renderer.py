@@ -0,0 +1,206 @@
+"""
+Dibujo del mapa del espacio aéreo con matplotlib.
+
+Los segmentos se dibujan con una única LineCollection, sus flechas de
+dirección con un único quiver y los puntos con un único scatter con colores y
+tamaños por punto, en lugar de un artista por elemento. Cada capa (segmentos,
+distancias y puntos) se crea la primera vez que se muestra y los controles de
+visibilidad solo la muestran u ocultan. No depende de tkinter, así que
+funciona con cualquier backend de matplotlib, también Agg.
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba, to_rgba_array
+
+from airSpace import get_airport_position
+
+SEGMENT_COLOR = 'cyan'
+POINT_COLOR = 'black'
+HIGHLIGHT_COLOR = 'red'
+NEIGHBOR_COLOR = HIGHLIGHT_COLOR
+PATH_COLOR = '#00CCCC'
+AIRPORT_COLOR = 'green'
+# Longitud de las flechas de dirección en pulgadas (no depende del zoom)
+ARROW_LENGTH = 0.09
+
+
+def map_bounds(airspace, margin=0.1):
+    """(lon_min, lon_max, lat_min, lat_max) de todos los puntos con un margen en grados"""
+    longitudes = [p.longitude for p in airspace.navpoints.values()]
+    latitudes = [p.latitude for p in airspace.navpoints.values()]
+    return (min(longitudes) - margin, max(longitudes) + margin,
+            min(latitudes) - margin, max(latitudes) + margin)
+
+
+class AirspaceMap:
+    """
+    Capas del mapa de un espacio aéreo en unos ejes de matplotlib.
+
+    Con highlight y neighbors se dibujan solo los segmentos entre el punto y
+    sus vecinos; con route, solo los segmentos de la ruta; sin ninguno de los
+    dos, todos los segmentos.
+    """
+    def __init__(self, ax, airspace, highlight=None, neighbors=None, route=None):
+        self.ax = ax
+        self.airspace = airspace
+        self.highlight = highlight
+        self.neighbor_numbers = {n[0].number for n in neighbors} if highlight and neighbors else set()
+        self.is_neighbor_view = bool(self.neighbor_numbers)
+        self.route = route or []
+        self.layers = {}  # capa -> lista de artistas ya creados
+        self._segments = None
+
+    def _visible_segments(self):
+        """Segmentos que se dibujan en esta vista, como (segmento, origen, destino)"""
+        if self._segments is None:
+            navpoints = self.airspace.navpoints
+            route_edges = set()
+            for first, second in zip(self.route, self.route[1:]):
+                route_edges.add((first.number, second.number))
+                route_edges.add((second.number, first.number))
+            center = self.highlight.number if self.is_neighbor_view else None
+            segments = []
+            for segment in self.airspace.navsegments:
+                origin = navpoints.get(segment.origin_number)
+                destination = navpoints.get(segment.destination_number)
+                if not origin or not destination:
+                    continue
+                if self.is_neighbor_view:
+                    visible = ((origin.number == center and destination.number in self.neighbor_numbers) or
+                               (destination.number == center and origin.number in self.neighbor_numbers))
+                elif self.route:
+                    visible = (origin.number, destination.number) in route_edges
+                else:
+                    visible = True
+                if visible:
+                    segments.append((segment, origin, destination))
+            self._segments = segments
+        return self._segments
+
+    def _segment_style(self):
+        if self.route and not self.is_neighbor_view:
+            return PATH_COLOR, 1.5
+        return SEGMENT_COLOR, 1.0
+
+    def _build_segments(self):
+        segments = self._visible_segments()
+        if not segments:
+            return []
+        color, width = self._segment_style()
+        starts = np.array([(o.longitude, o.latitude) for _, o, _ in segments], dtype=float)
+        ends = np.array([(d.longitude, d.latitude) for _, _, d in segments], dtype=float)
+        lines = LineCollection(np.stack((starts, ends), axis=1), colors=color, linewidths=width, zorder=5)
+        self.ax.add_collection(lines, autolim=False)
+
+        # Una flecha de tamaño fijo con la punta en el punto medio de cada segmento, de origen a destino
+        vectors = ends - starts
+        lengths = np.hypot(vectors[:, 0], vectors[:, 1])
+        keep = lengths > 0
+        middles = (starts[keep] + ends[keep]) / 2
+        directions = vectors[keep] / lengths[keep, None]
+        arrows = self.ax.quiver(middles[:, 0], middles[:, 1], directions[:, 0], directions[:, 1],
+                                color=color, angles='xy', pivot='tip', scale_units='inches',
+                                scale=1 / ARROW_LENGTH, units='inches', width=0.012 * width,
+                                headwidth=4, headlength=5, headaxislength=4.5, zorder=5)
+        return [lines, arrows]
+
+    def _build_distances(self):
+        # Los textos no se pueden agrupar en un solo artista; se crean solo si se piden
+        texts = []
+        for segment, origin, destination in self._visible_segments():
+            texts.append(self.ax.text((origin.longitude + destination.longitude) / 2,
+                                      (origin.latitude + destination.latitude) / 2,
+                                      f"{segment.distance:.1f}", fontsize=6, ha='center', va='center',
+                                      bbox=dict(facecolor='white', alpha=0.5, pad=0.5), zorder=2, clip_on=True))
+        return texts
+
+    def _point_styles(self, points):
+        """Colores RGBA y tamaños de los puntos según la vista"""
+        count = len(points)
+        colors = np.tile(to_rgba(POINT_COLOR), (count, 1))
+        sizes = np.full(count, 5.0)
+        if self.route:
+            route_numbers = {p.number for p in self.route}
+            on_route = np.fromiter((p.number in route_numbers for p in points), dtype=bool, count=count)
+            colors[on_route] = to_rgba(PATH_COLOR)
+            sizes[on_route] = 10.0
+            colors[~on_route, 3] = 0.5
+            sizes[~on_route] = 4.0
+        elif self.is_neighbor_view:
+            colors[:] = to_rgba('gray')
+            neighbor = np.fromiter((p.number in self.neighbor_numbers for p in points), dtype=bool, count=count)
+            colors[neighbor] = to_rgba(NEIGHBOR_COLOR)
+            sizes[neighbor] = 20.0
+            center = np.fromiter((p.number == self.highlight.number for p in points), dtype=bool, count=count)
+            colors[center] = to_rgba(HIGHLIGHT_COLOR)
+            sizes[center] = 30.0
+        return colors, sizes
+
+    def _build_nodes(self):
+        points = list(self.airspace.navpoints.values())
+        colors, sizes = self._point_styles(points)
+        # Los puntos destacados (más grandes) se dibujan los últimos para que queden encima
+        order = np.argsort(sizes, kind='stable')
+        longitudes = np.array([p.longitude for p in points])[order]
+        latitudes = np.array([p.latitude for p in points])[order]
+        artists = [self.ax.scatter(longitudes, latitudes, c=colors[order], s=sizes[order], zorder=10,
+                                   linewidths=0, clip_on=True)]
+        artists.extend(self.ax.text(p.longitude + 0.01, p.latitude + 0.01, p.name, fontsize=6, ha='left',
+                                    va='bottom', zorder=6, clip_on=True) for p in points)
+
+        # Aeropuertos en la posición guardada en cada NavAirport
+        airports = [(code, get_airport_position(self.airspace, airport))
+                    for code, airport in self.airspace.navairports.items()]
+        airports = [(code, position) for code, position in airports if position]
+        if airports:
+            artists.append(self.ax.scatter([p[1] for _, p in airports], [p[0] for _, p in airports],
+                                           marker='^', c=to_rgba_array([AIRPORT_COLOR] * len(airports)),
+                                           s=40, zorder=15, clip_on=True))
+            artists.extend(self.ax.text(p[1] + 0.01, p[0] - 0.01, code, fontsize=7, ha='left', va='top',
+                                        color=AIRPORT_COLOR, zorder=15, clip_on=True) for code, p in airports)
+        return artists
+
+    def set_layer_visible(self, layer, visible):
+        """Muestra u oculta una capa ("segments", "distances" o "nodes"), creándola si hace falta"""
+        if visible and layer not in self.layers:
+            self.layers[layer] = getattr(self, f"_build_{layer}")()
+        for artist in self.layers.get(layer, ()):
+            artist.set_visible(visible)
+
+    def update(self, show_nodes=True, show_segments=True, show_distances=True):
+        """Aplica los controles de visibilidad; las distancias solo se ven con los segmentos"""
+        self.set_layer_visible("segments", show_segments)
+        self.set_layer_visible("distances", show_segments and show_distances)
+        self.set_layer_visible("nodes", show_nodes)
+
+
+def draw_airspace_map(ax, airspace, highlight=None, neighbors=None, route=None,
+                      show_nodes=True, show_segments=True, show_distances=True, bounds=None):
+    """
+    Prepara los ejes (límites, rejilla y bordes) y dibuja el mapa.
+
+    Args:
+        highlight, neighbors: Punto destacado y lista de tuplas (vecino, distancia)
+        route: Lista de NavPoint de una ruta
+        bounds: (lon_min, lon_max, lat_min, lat_max); por defecto los de map_bounds
+
+    Returns:
+        El AirspaceMap, cuyo método update cambia la visibilidad de las capas
+    """
+    lon_min, lon_max, lat_min, lat_max = bounds or map_bounds(airspace)
+    ax.set_xlim(lon_min, lon_max)
+    ax.set_ylim(lat_min, lat_max)
+    ax.set_autoscale_on(False)
+    ax.set_clip_on(True)
+
+    airspace_map = AirspaceMap(ax, airspace, highlight, neighbors, route)
+    airspace_map.update(show_nodes, show_segments, show_distances)
+
+    if not airspace_map.is_neighbor_view and not route:
+        ax.grid(True, linestyle=':', alpha=0.7, color='red')
+    for spine in ax.spines.values():
+        spine.set_visible(True)
+        spine.set_edgecolor('black')
+        spine.set_linewidth(0.5)
+    return airspace_map
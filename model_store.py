@@ -0,0 +1,166 @@
+"""
+Almacenamiento por columnas (struct-of-arrays) de puntos y segmentos.
+
+En lugar de un objeto por punto o segmento, cada atributo se guarda en un
+array contiguo (array('q') para los números, array('d') para coordenadas y
+distancias) y los nombres repetidos se guardan una sola vez. Los objetos que
+se piden al almacén son vistas ligeras (NavPointView, NavSegmentView) que leen
+de los arrays y se comportan como NavPoint y NavSegment de solo lectura, así
+que funcionan con navpoint_to_str, get_coords, navsegment_to_str, etc.
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+class NavPointView:
+    """Vista de solo lectura de un punto de un NavPointStore"""
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def number(self):
+        return self._store.numbers[self._index]
+
+    @property
+    def name(self):
+        return self._store.names[self._store.name_ids[self._index]]
+
+    @property
+    def latitude(self):
+        return self._store.latitudes[self._index]
+
+    @property
+    def longitude(self):
+        return self._store.longitudes[self._index]
+
+    def __eq__(self, other):
+        return (isinstance(other, NavPointView) and other._store is self._store
+                and other._index == self._index)
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
+
+class NavSegmentView:
+    """Vista de solo lectura de un segmento de un NavSegmentStore"""
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def origin_number(self):
+        return self._store.origins[self._index]
+
+    @property
+    def destination_number(self):
+        return self._store.destinations[self._index]
+
+    @property
+    def distance(self):
+        return self._store.distances[self._index]
+
+    def __eq__(self, other):
+        return (isinstance(other, NavSegmentView) and other._store is self._store
+                and other._index == self._index)
+
+    def __hash__(self):
+        return hash((id(self._store), self._index))
+
+
+class NavPointStore:
+    """Puntos de navegación en arrays paralelos, en el orden en que se dan"""
+    def __init__(self, numbers, names, latitudes, longitudes):
+        self.numbers = array('q', numbers)
+        self.latitudes = array('d', latitudes)
+        self.longitudes = array('d', longitudes)
+        self.names = []  # nombres distintos
+        self.name_ids = array('I')  # posición -> índice en names
+        name_ids = {}
+        for name in names:
+            name_id = name_ids.get(name)
+            if name_id is None:
+                name_id = name_ids[name] = len(self.names)
+                self.names.append(name)
+            self.name_ids.append(name_id)
+        # Búsqueda por número con bisect sobre los números ordenados, sin un diccionario por punto
+        self._order = array('I', sorted(range(len(self.numbers)), key=self.numbers.__getitem__))
+        self._sorted_numbers = array('q', (self.numbers[i] for i in self._order))
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def __getitem__(self, index):
+        if not -len(self.numbers) <= index < len(self.numbers):
+            raise IndexError("NavPointStore index out of range")
+        return NavPointView(self, index % len(self.numbers))
+
+    def __iter__(self):
+        for index in range(len(self.numbers)):
+            yield NavPointView(self, index)
+
+    def position(self, number):
+        """Posición del primer punto con ese número o None si no existe"""
+        i = bisect_left(self._sorted_numbers, number)
+        if i < len(self._sorted_numbers) and self._sorted_numbers[i] == number:
+            return self._order[i]
+        return None
+
+    def get(self, number):
+        """Vista del punto con ese número o None si no existe"""
+        index = self.position(number)
+        return NavPointView(self, index) if index is not None else None
+
+    def nbytes(self):
+        """Memoria de los arrays (sin contar los nombres)"""
+        return sum(a.itemsize * len(a) for a in (self.numbers, self.latitudes, self.longitudes,
+                                                 self.name_ids, self._order, self._sorted_numbers))
+
+
+class NavSegmentStore:
+    """Segmentos en arrays paralelos, en el orden en que se dan"""
+    def __init__(self, origins, destinations, distances):
+        self.origins = array('q', origins)
+        self.destinations = array('q', destinations)
+        self.distances = array('d', distances)
+
+    def __len__(self):
+        return len(self.origins)
+
+    def __getitem__(self, index):
+        if not -len(self.origins) <= index < len(self.origins):
+            raise IndexError("NavSegmentStore index out of range")
+        return NavSegmentView(self, index % len(self.origins))
+
+    def __iter__(self):
+        for index in range(len(self.origins)):
+            yield NavSegmentView(self, index)
+
+    def nbytes(self):
+        """Memoria de los arrays"""
+        return sum(a.itemsize * len(a) for a in (self.origins, self.destinations, self.distances))
+
+
+def stores_from_columns(columns):
+    """Crea los almacenes a partir de las columnas leídas con bulk_loader"""
+    points = NavPointStore(columns.nav_numbers.tolist(), columns.nav_names,
+                           columns.nav_latitudes.tolist(), columns.nav_longitudes.tolist())
+    segments = NavSegmentStore(columns.seg_origins.tolist(), columns.seg_destinations.tolist(),
+                               columns.seg_distances.tolist())
+    return points, segments
+
+
+def stores_from_airspace(airspace):
+    """Crea los almacenes con los puntos y segmentos de un espacio aéreo"""
+    navpoints = list(airspace.navpoints.values())
+    points = NavPointStore([p.number for p in navpoints], [p.name for p in navpoints],
+                           [p.latitude for p in navpoints], [p.longitude for p in navpoints])
+    segments = NavSegmentStore([s.origin_number for s in airspace.navsegments],
+                               [s.destination_number for s in airspace.navsegments],
+                               [s.distance for s in airspace.navsegments])
+    return points, segments
@@ -0,0 +1,132 @@
+"""
+Índice de búsqueda de nombres de puntos de navegación y aeropuertos.
+
+Ofrece búsqueda por prefijo (lista ordenada + búsqueda binaria) y búsqueda
+aproximada con distancia de edición acotada. Para la búsqueda aproximada se
+guardan todas las variantes de cada nombre con hasta max_distance letras
+borradas (método "symmetric delete"), así que una consulta solo compara con los
+nombres que comparten alguna variante en lugar de con todos.
+"""
+
+from bisect import bisect_left
+
+
+def _deletes(word, max_distance):
+    """Conjunto de variantes de word con hasta max_distance letras borradas"""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        next_frontier = set()
+        for variant in frontier:
+            for i in range(len(variant)):
+                next_frontier.add(variant[:i] + variant[i + 1:])
+        variants |= next_frontier
+        frontier = next_frontier
+    return variants
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """
+    Distancia de Levenshtein entre a y b, o max_distance + 1 si es mayor.
+    Solo se calcula la banda de la matriz que puede quedar por debajo del límite.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    # El prefijo y el sufijo comunes no cambian la distancia
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if not a or not b:
+        return len(a) + len(b) if len(a) + len(b) <= max_distance else max_distance + 1
+
+    if len(a) > len(b):
+        a, b = b, a
+
+    limit = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [limit] * (len(b) + 1)
+        current[0] = i
+        low = max(1, i - max_distance)
+        high = min(len(b), i + max_distance)
+        row_min = current[0] if low == 1 else limit
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return limit
+        previous = current
+    return previous[len(b)] if previous[len(b)] <= max_distance else limit
+
+
+class NameSearchIndex:
+    """Índice de prefijos y de búsqueda aproximada sobre una colección de nombres"""
+    def __init__(self, names, max_distance=2):
+        self.max_distance = max_distance
+        self.originals = {}  # nombre normalizado -> nombres originales
+        for name in names:
+            self.originals.setdefault(name.upper(), set()).add(name)
+        self.sorted_keys = sorted(self.originals)
+        self.deletes = None  # Se construye con la primera búsqueda aproximada
+
+    def _names(self, key):
+        return sorted(self.originals[key])
+
+    def prefix(self, prefix, limit=10):
+        """Nombres que empiezan por prefix (sin distinguir mayúsculas), en orden alfabético"""
+        prefix = prefix.upper()
+        results = []
+        position = bisect_left(self.sorted_keys, prefix)
+        while position < len(self.sorted_keys) and len(results) < limit:
+            key = self.sorted_keys[position]
+            if not key.startswith(prefix):
+                break
+            results.extend(self._names(key))
+            position += 1
+        return results[:limit]
+
+    def _build_deletes(self):
+        self.deletes = {}
+        for key in self.sorted_keys:
+            for variant in _deletes(key, self.max_distance):
+                self.deletes.setdefault(variant, []).append(key)
+
+    def fuzzy(self, name, max_distance=1, limit=10):
+        """
+        Nombres a distancia de edición <= max_distance de name, ordenados por
+        distancia y después alfabéticamente. Con distancia 1 (una errata) la
+        consulta compara con muy pocos candidatos; con 2 hay muchos más nombres
+        cortos que comparten variantes y es bastante más lenta.
+        """
+        if max_distance is None or max_distance > self.max_distance:
+            max_distance = self.max_distance
+        if self.deletes is None:
+            self._build_deletes()
+
+        query = name.upper()
+        candidates = set()
+        for variant in _deletes(query, max_distance):
+            candidates.update(self.deletes.get(variant, ()))
+
+        matches = []
+        for key in candidates:
+            distance = bounded_edit_distance(query, key, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, key))
+        matches.sort()
+
+        results = []
+        for _, key in matches:
+            results.extend(self._names(key))
+            if len(results) >= limit:
+                break
+        return results[:limit]
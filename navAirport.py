@@ -1,17 +1,49 @@
 class NavAirport:
+    # sids y stars conservan el orden de inserción; los conjuntos sirven para comprobar la pertenencia
+    __slots__ = ("name", "sids", "stars", "_sid_set", "_star_set", "latitude", "longitude")
+
     def __init__(self, name, sids=None, stars=None):
         self.name = name
-        self.sids = sids if sids is not None else []
-        self.stars = stars if stars is not None else []
+        self.sids = []
+        self.stars = []
+        self._sid_set = set()
+        self._star_set = set()
+        # Posición calculada por airSpace.get_airport_position (None hasta entonces o si no tiene puntos)
+        self.latitude = None
+        self.longitude = None
+        for number in sids or ():
+            add_sid(self, number)
+        for number in stars or ():
+            add_star(self, number)
 
 
 def add_sid(navairport, navpoint_number):
-    if navpoint_number not in navairport.sids:
+    if navpoint_number not in navairport._sid_set:
+        navairport._sid_set.add(navpoint_number)
         navairport.sids.append(navpoint_number)
         
 def add_star(navairport, navpoint_number):
-    if navpoint_number not in navairport.stars:
+    if navpoint_number not in navairport._star_set:
+        navairport._star_set.add(navpoint_number)
         navairport.stars.append(navpoint_number)
+
+def has_sid(navairport, navpoint_number):
+    """Indica si el punto es uno de los SIDs del aeropuerto"""
+    return navpoint_number in navairport._sid_set
+
+def has_star(navairport, navpoint_number):
+    """Indica si el punto es uno de los STARs del aeropuerto"""
+    return navpoint_number in navairport._star_set
+        
+def set_position(navairport, latitude, longitude):
+    navairport.latitude = latitude
+    navairport.longitude = longitude
+
+def get_position(navairport):
+    """(latitud, longitud) guardada en el aeropuerto o None si no tiene"""
+    if navairport.latitude is None:
+        return None
+    return navairport.latitude, navairport.longitude
         
 def navairport_to_str(navairport):
     return f"Aeropuerto: {navairport.name}, SIDs: {len(navairport.sids)}, STARs: {len(navairport.stars)}"
@@ -1,4 +1,7 @@
 class NavPoint:
+    # Sin __dict__ por instancia: los conjuntos de datos grandes tienen cientos de miles de puntos
+    __slots__ = ("number", "name", "latitude", "longitude")
+
     def __init__(self, number, name, latitude, longitude):
         # Inicializa un nuevo punto de navegación con número, nombre, latitud y longitud
         self.number = number
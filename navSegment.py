@@ -1,4 +1,6 @@
 class NavSegment:
+    __slots__ = ("origin_number", "destination_number", "distance")
+
     def __init__(self, origin_number, destination_number, distance):
         self.origin_number = origin_number
         self.destination_number = destination_number
@@ -2,6 +2,8 @@ import math
 
 class Node:
     """Clase que representa un nodo en un grafo con coordenadas"""
+    __slots__ = ("name", "coordx", "coordy", "neighbors")
+
     def __init__(self, name, coordx, coordy):
         """Inicializa un nodo con nombre y coordenadas x,y"""
         self.name = name
@@ -1,4 +1,10 @@
 import math
+import heapq
+from airSpace import calculate_distance, get_derived, get_navpoint_by_name, snap_to_graph
+from airport_matrix import lookup_airport_route
+from distance_kernel import heuristic_table, min_distance_ratio
+from csr_graph import get_csr_graph
+from landmarks import get_landmarks, landmark_bound, target_landmark_rows
 
 class Path:
     """
@@ -38,9 +44,10 @@ class Path:
             return None
         return self.nodes[-1]
     
-    def cost_to_node(self, node):
+    def cost_to_node(self, node, airspace):
         """
-        Retorna el costo desde el origen hasta un nodo específico en el camino.
+        Retorna el costo desde el origen hasta un nodo específico en el camino,
+        con las distancias de los segmentos del espacio aéreo.
         Retorna -1 si el nodo no está en el camino.
         """
         if not self.contains_node(node):
@@ -53,7 +60,7 @@ class Path:
         # Calcular la suma de distancias hasta el nodo
         cost = 0.0
         for i in range(index):
-            segment_cost = calculate_segment_distance(self.nodes[i], self.nodes[i+1])
+            segment_cost = calculate_segment_distance(self.nodes[i], self.nodes[i+1], airspace)
             cost += segment_cost
         
         return cost
@@ -71,487 +78,466 @@ def euclidean_distance(point1, point2):
     dy = point1.latitude - point2.latitude
     return math.sqrt(dx*dx + dy*dy)
 
-def calculate_segment_distance(point1, point2):
+def calculate_segment_distance(point1, point2, airspace):
     """
     Obtiene la distancia del segmento entre dos puntos.
     Devuelve únicamente la distancia definida en el segmento si existe.
     """
-    # Buscamos el segmento directo entre los puntos
-    for segment in point1.airspace.navsegments:
-        if ((segment.origin_number == point1.number and segment.destination_number == point2.number) or
-            (segment.destination_number == point1.number and segment.origin_number == point2.number)):
-            return segment.distance
+    # Buscamos el segmento directo entre los puntos en el índice del espacio aéreo
+    segment = airspace.segment_index.get((point1.number, point2.number))
+    if segment is None:
+        segment = airspace.segment_index.get((point2.number, point1.number))
+    if segment is not None:
+        return segment.distance
     
     # Si no hay segmento directo, devolvemos un valor alto
     return float('inf')
 
-def find_shortest_path_astar(airspace, origin, destination, max_iterations=5000, debug=False, custom_cost_func=None, recursion_level=0):
+def get_heuristic_scale(airspace):
     """
-    Implementación del algoritmo A* para encontrar la ruta más corta
-    entre dos puntos en el espacio aéreo.
+    Devuelve el factor que convierte la distancia ortodrómica (haversine) en una
+    cota inferior de las distancias de segmento del espacio aéreo.
+    
+    Las distancias de los ficheros Cat/Spain coinciden con la ortodrómica salvo
+    pequeñas diferencias de redondeo, así que el factor es el menor cociente
+    distancia_segmento / ortodrómica. Como la ortodrómica cumple la desigualdad
+    triangular, factor * ortodrómica(n, destino) nunca supera el coste real
+    restante y la heurística es admisible y consistente.
+    """
+    return get_derived(airspace, "heuristic_scale", _compute_heuristic_scale)
+
+def _compute_heuristic_scale(airspace):
+    scale = min_distance_ratio(airspace)
+    if scale is None or scale <= 0:
+        return 0.0
+    # Margen para que los errores de redondeo no hagan la heurística inadmisible
+    return scale * (1 - 1e-9)
+
+def astar_search(airspace, sources, targets, custom_cost_func=None, directed=False,
+                 use_heuristic=True, max_iterations=None, debug=False,
+                 banned_nodes=None, banned_edges=None, heuristic_cache=None, stats=None):
+    """
+    Núcleo del algoritmo A* sobre los índices de adyacencia del espacio aéreo.
+    
+    Usa un montículo binario, punteros al padre en lugar de copiar caminos y un
+    conjunto de nodos cerrados, y recorre el grafo CSR del espacio aéreo
+    (csr_graph) con identificadores densos. La heurística es la distancia
+    ortodrómica al destino más cercano escalada con get_heuristic_scale y, si se
+    han calculado con precompute_landmarks, la cota de los landmarks (ALT).
     
     Args:
         airspace: Instancia de AirSpace
-        origin: Punto de origen (número, NavPoint o código de aeropuerto)
-        destination: Punto de destino (número, NavPoint o código de aeropuerto)
-        max_iterations: Número máximo de iteraciones
+        sources: Números de los puntos de origen
+        targets: Números de los puntos de destino
+        custom_cost_func: Función opcional (nodo1, nodo2, distancia_base) -> costo
+        directed: Si es True, los segmentos solo se recorren de origen a destino
+        use_heuristic: Si es False, se comporta como Dijkstra
+        max_iterations: Número máximo de nodos a expandir (None para no limitar)
         debug: Si es True, imprime información de depuración
-        custom_cost_func: Función opcional para calcular el costo de un segmento.
-                          Recibe (nodo1, nodo2, distancia_base) y retorna un costo.
-        recursion_level: Nivel de recursión para prevenir llamadas infinitas
+        banned_nodes: Conjunto opcional de puntos por los que no puede pasar la ruta
+        banned_edges: Conjunto opcional de tramos (origen, destino) prohibidos
+        heuristic_cache: Diccionario opcional para compartir los valores de la
+                         heurística entre búsquedas con los mismos destinos
+        stats: Diccionario opcional en el que se guardan los nodos expandidos
+               ("settled") y las entradas añadidas a la cola ("pushed")
     
     Returns:
-        Una tupla con (camino, distancia_total) donde camino es una lista
-        de NavPoint y distancia_total es la distancia total en km.
+        Una tupla (lista de números de punto, distancia_total), o ([], inf) si
+        no existe ninguna ruta.
     """
-    # Verificar si origin o destination son códigos de aeropuerto
-    origin_is_airport = isinstance(origin, str) and origin.startswith(("LE", "LF"))
-    dest_is_airport = isinstance(destination, str) and destination.startswith(("LE", "LF"))
-    
-    # Prevenir recursión infinita
-    if recursion_level > 1:
-        print(f"ERROR: Recursión excesiva en find_shortest_path_astar (nivel {recursion_level})")
-        return [], 0
+    navpoints = airspace.navpoints
+    graph = get_csr_graph(airspace, directed)
+    node_index = graph.node_index
+    node_numbers = graph.node_numbers
+    offsets = graph.offsets
+    graph_targets = graph.targets
+    graph_weights = graph.weights
+    
+    target_ids = {node_index[t] for t in targets if t in node_index}
+    if not target_ids:
+        return [], float('inf')
+    
+    scale = get_heuristic_scale(airspace) if use_heuristic else 0.0
+    target_points = [navpoints[node_numbers[t]] for t in target_ids]
+    heuristics = heuristic_cache if heuristic_cache is not None else {}
+    # Las cotas de los landmarks también valen con custom_cost_func, que no puede abaratar los tramos
+    landmarks = get_landmarks(airspace, directed) if use_heuristic else None
+    target_rows = target_landmark_rows(landmarks, target_ids) if landmarks else None
+    
+    def heuristic(node):
+        number = node_numbers[node]
+        value = heuristics.get(number)
+        if value is None:
+            if scale:
+                point = navpoints[number]
+                value = scale * min(calculate_distance(airspace, point, t) for t in target_points)
+            else:
+                value = 0.0
+            if target_rows:
+                value = max(value, landmark_bound(landmarks, node, target_rows))
+            heuristics[number] = value
+        return value
+    
+    # Estado por identificador denso del grafo CSR; solo se guardan los nodos alcanzados
+    costs = {}
+    parents = {}
+    closed = {node_index[n] for n in banned_nodes if n in node_index} if banned_nodes else set()
+    banned = {(node_index[a], node_index[b]) for a, b in banned_edges
+              if a in node_index and b in node_index} if banned_edges else None
+    queue = []
+    counter = 0  # Desempate estable entre entradas con el mismo coste estimado
+    
+    for source in sources:
+        node = node_index.get(source)
+        if node is not None and node not in costs and node not in closed:
+            costs[node] = 0.0
+            parents[node] = None
+            heapq.heappush(queue, (heuristic(node), counter, node))
+            counter += 1
     
-    # Manejar aeropuertos
-    if origin_is_airport or dest_is_airport:
-        if debug:
-            print(f"Procesando búsqueda con aeropuertos: Origen={origin}, Destino={destination}")
-        
-        # Buscar la mejor ruta entre todos los pares posibles de SIDs y STARs
-        best_path = []
-        best_distance = float('inf')
+    iterations = 0
+    while queue:
+        _, _, current = heapq.heappop(queue)
+        if current in closed:
+            continue
         
-        # Obtener el aeropuerto de origen si es necesario
-        origin_airport = None
-        origin_points = []
-        if origin_is_airport:
-            origin_airport = airspace.navairports.get(origin)
+        if current in target_ids:
+            path = []
+            node = current
+            while node is not None:
+                path.append(node_numbers[node])
+                node = parents[node]
+            path.reverse()
             if debug:
-                print(f"Aeropuerto origen: {origin}, encontrado: {origin_airport is not None}")
-                if origin_airport:
-                    print(f"SIDs de {origin}: {origin_airport.sids}")
-            
-            if origin_airport and origin_airport.sids:
-                # Usar los SIDs como puntos de origen
-                for sid_num in origin_airport.sids:
-                    sid_point = airspace.navpoints.get(sid_num)
-                    if sid_point:
-                        origin_points.append(sid_point)
-                        if debug:
-                            print(f"Punto SID encontrado: {sid_point.name} (#{sid_point.number})")
-            
-            if not origin_points:
-                if debug:
-                    print(f"No se encontraron SIDs para el aeropuerto {origin}")
-                return [], 0
-        else:
-            # Convertir número a objeto NavPoint si es necesario
-            if isinstance(origin, int):
-                origin = airspace.navpoints.get(origin)
-            origin_points = [origin]
+                print(f"¡Ruta encontrada! Longitud: {len(path)}, Distancia: {costs[current]}, nodos expandidos: {iterations}")
+            if stats is not None:
+                stats["settled"] = iterations
+                stats["pushed"] = counter
+            return path, costs[current]
         
-        # Obtener el aeropuerto de destino si es necesario
-        dest_airport = None
-        dest_points = []
-        if dest_is_airport:
-            dest_airport = airspace.navairports.get(destination)
+        closed.add(current)
+        iterations += 1
+        if max_iterations is not None and iterations >= max_iterations:
             if debug:
-                print(f"Aeropuerto destino: {destination}, encontrado: {dest_airport is not None}")
-                if dest_airport:
-                    print(f"STARs de {destination}: {dest_airport.stars}")
-            
-            if dest_airport and dest_airport.stars:
-                # Usar los STARs como puntos de destino
-                for star_num in dest_airport.stars:
-                    star_point = airspace.navpoints.get(star_num)
-                    if star_point:
-                        dest_points.append(star_point)
-                        if debug:
-                            print(f"Punto STAR encontrado: {star_point.name} (#{star_point.number})")
-            
-            if not dest_points:
-                if debug:
-                    print(f"No se encontraron STARs para el aeropuerto {destination}")
-                return [], 0
-        else:
-            # Convertir número a objeto NavPoint si es necesario
-            if isinstance(destination, int):
-                destination = airspace.navpoints.get(destination)
-            dest_points = [destination]
+                print("Se alcanzó el límite máximo de iteraciones")
+            break
         
-        # Probar todas las combinaciones de puntos de origen y destino
-        for o_point in origin_points:
-            for d_point in dest_points:
-                if debug:
-                    print(f"Probando ruta desde {o_point.name} (#{o_point.number}) a {d_point.name} (#{d_point.number})")
-                
-                # Usar el A* estándar entre estos dos puntos (SIN RECURSIÓN)
-                path, distance = find_shortest_path_astar(
-                    airspace, o_point, d_point, max_iterations, debug, custom_cost_func, 
-                    recursion_level=recursion_level+1
-                )
-                
-                # Si encontramos una ruta mejor, la guardamos
-                if path and distance < best_distance:
-                    best_path = path
-                    best_distance = distance
-                    
-                    if debug:
-                        print(f"Nueva mejor ruta encontrada: {distance} km")
+        current_cost = costs[current]
+        start = offsets[current]
+        end = offsets[current + 1]
         
-        # Si se encontró alguna ruta, la devolvemos
-        if best_path:
-            if debug:
-                print(f"Ruta final: {len(best_path)} puntos, {best_distance} km")
-            return best_path, best_distance
+        if debug and start == end:
+            print(f"¡Advertencia! El nodo {navpoints[node_numbers[current]].name} no tiene segmentos conectados")
         
-        # Si no se encontró ninguna ruta
-        return [], 0
-    
-    # El resto de la función para búsqueda entre puntos normales
-    # Convertir números a objetos NavPoint si es necesario
-    if isinstance(origin, int):
-        origin = airspace.navpoints.get(origin)
-    if isinstance(destination, int):
-        destination = airspace.navpoints.get(destination)
-    
-    if not origin or not destination:
-        return [], 0
+        for neighbor, segment_distance in zip(graph_targets[start:end], graph_weights[start:end]):
+            if neighbor in closed:
+                continue
+            if banned and (current, neighbor) in banned:
+                continue
+            
+            if custom_cost_func:
+                segment_distance = custom_cost_func(navpoints[node_numbers[current]],
+                                                    navpoints[node_numbers[neighbor]], segment_distance)
+            
+            new_cost = current_cost + segment_distance
+            if new_cost < costs.get(neighbor, float('inf')):
+                estimate = heuristic(neighbor)
+                if estimate == float('inf'):
+                    continue  # Según los landmarks, desde neighbor no se llega a ningún destino
+                costs[neighbor] = new_cost
+                parents[neighbor] = current
+                heapq.heappush(queue, (new_cost + estimate, counter, neighbor))
+                counter += 1
     
     if debug:
-        print(f"Buscando ruta de {origin.name} (#{origin.number}) a {destination.name} (#{destination.number})")
-    
-    # Si origen y destino son el mismo punto
-    if origin.number == destination.number:
-        return [origin], 0
+        print(f"No se encontró ruta después de expandir {iterations} nodos")
+    if stats is not None:
+        stats["settled"] = iterations
+        stats["pushed"] = counter
+    return [], float('inf')
+
+def is_airport_code(airspace, value):
+    """
+    Indica si el origen o destino de una ruta es el código de un aeropuerto del
+    espacio aéreo. Hay puntos cuyo nombre empieza por LE o LF (LESBA, LEPES),
+    así que el prefijo no basta.
+    """
+    return isinstance(value, str) and value in airspace.navairports
+
+def resolve_route_endpoints(airspace, endpoint, is_origin, debug=False):
+    """
+    Convierte un origen o destino de ruta en la lista de NavPoint desde (o hasta)
+    los que se puede volar: los SIDs del aeropuerto de origen, los STARs del
+    aeropuerto de destino, el propio punto si no es un aeropuerto o, si es una
+    tupla (latitud, longitud), el punto conectado más cercano a esa coordenada.
     
-    # Inicializar el camino inicial con solo el nodo de origen
-    initial_path = Path([origin])
+    Returns:
+        Lista de NavPoint, vacía si el punto o aeropuerto no existe o no tiene
+        procedimientos.
+    """
+    if is_airport_code(airspace, endpoint):
+        airport = airspace.navairports[endpoint]
+        kind = "SIDs" if is_origin else "STARs"
+        if debug:
+            print(f"Aeropuerto {'origen' if is_origin else 'destino'}: {endpoint}")
+        
+        numbers = airport.sids if is_origin else airport.stars
+        if debug:
+            print(f"{kind} de {endpoint}: {numbers}")
+        points = [airspace.navpoints[n] for n in numbers if n in airspace.navpoints]
+        if debug and not points:
+            print(f"No se encontraron {kind} para el aeropuerto {endpoint}")
+        return points
+    
+    if isinstance(endpoint, tuple):
+        snapped = snap_to_graph(airspace, endpoint[0], endpoint[1])
+        if debug:
+            if snapped:
+                print(f"Coordenada {endpoint} ajustada a {snapped[0].name} (#{snapped[0].number}) a {snapped[1]:.2f} km")
+            else:
+                print(f"No hay ningún punto conectado cerca de {endpoint}")
+        return [snapped[0]] if snapped else []
+    
+    # Convertir número o nombre a objeto NavPoint si es necesario
+    if isinstance(endpoint, int):
+        endpoint = airspace.navpoints.get(endpoint)
+    elif isinstance(endpoint, str):
+        endpoint = get_navpoint_by_name(airspace, endpoint)
+    return [endpoint] if endpoint else []
+
+def find_route_with_procedures(airspace, origin, destination, max_iterations=None, debug=False,
+                               custom_cost_func=None, directed=False):
+    """
+    Busca la ruta más corta entre dos puntos o aeropuertos con una única búsqueda.
     
-    # Usamos distancia de segmento para heurística. Si no hay segmento, usamos un valor bajo
-    # para que al menos se considere esta ruta
-    try:
-        heuristic_distance = calculate_segment_distance(origin, destination)
-        if heuristic_distance == float('inf'):
-            # Si no hay segmento directo, usamos un valor bajo como heurística
-            heuristic_distance = 1.0  # Valor bajo para que no descarte esta ruta
-    except:
-        heuristic_distance = 1.0  # Valor bajo por defecto
+    Si el origen es un aeropuerto todos sus SIDs se usan a la vez como orígenes
+    (un superorigen virtual), y si el destino es un aeropuerto todos sus STARs
+    son destinos válidos (un superdestino virtual), de modo que el coste no
+    depende del número de procedimientos del aeropuerto.
     
-    initial_path.estimated_cost = heuristic_distance
+    Args:
+        Los mismos que find_shortest_path_astar.
     
-    # Lista de caminos a explorar
-    current_paths = [initial_path]
+    Returns:
+        Una tupla (camino, distancia_total, sid, star) donde sid y star son los
+        NavPoint del procedimiento utilizado, o None si el extremo correspondiente
+        no es un aeropuerto. Si no hay ruta devuelve ([], 0, None, None).
+    """
+    origin_points = resolve_route_endpoints(airspace, origin, True, debug)
+    dest_points = resolve_route_endpoints(airspace, destination, False, debug)
+    if not origin_points or not dest_points:
+        return [], 0, None, None
     
-    # Conjunto de nodos visitados para evitar ciclos
-    visited = set()
+    if debug:
+        origin_names = ", ".join(f"{p.name} (#{p.number})" for p in origin_points)
+        dest_names = ", ".join(f"{p.name} (#{p.number})" for p in dest_points)
+        print(f"Buscando ruta de [{origin_names}] a [{dest_names}]")
     
-    # Contador para limitar el número de iteraciones
-    iterations = 0
+    # Entre aeropuertos se usa la matriz precalculada si existe (precompute_airport_matrix)
+    cached = None
+    if is_airport_code(airspace, origin) and is_airport_code(airspace, destination) and custom_cost_func is None:
+        cached = lookup_airport_route(airspace, origin, destination, directed)
     
-    while current_paths and iterations < max_iterations:
-        iterations += 1
-        
-        # Encontrar el camino con menor costo estimado
-        current_paths.sort(key=lambda p: p.estimated_cost)
-        current_path = current_paths.pop(0)
-        
-        # Obtener el último nodo del camino actual
-        current_node = current_path.get_last_node()
-        
-        if debug and iterations % 100 == 0:
-            print(f"Iteración {iterations}, explorando {current_node.name}, caminos restantes: {len(current_paths)}")
-        
-        # Si ya hemos llegado al destino, retornamos el camino
-        if current_node.number == destination.number:
-            if debug:
-                print(f"¡Ruta encontrada! Longitud: {len(current_path.nodes)}, Distancia: {current_path.real_cost}")
-            return current_path.nodes, current_path.real_cost
-        
-        # Marcar el nodo como visitado
-        visited.add(current_node.number)
-        
-        # Obtener los vecinos del nodo actual
-        neighbors = []
-        
-        # Primero, añadir segmentos en la dirección correcta
-        for segment in airspace.navsegments:
-            if segment.origin_number == current_node.number:
-                neighbors.append((segment.destination_number, segment.distance))  
-        
-        if debug and len(neighbors) == 0:
-            print(f"¡Advertencia! El nodo {current_node.name} no tiene segmentos conectados")
-        
-        # Expandir el camino con cada vecino
-        for neighbor_number, segment_distance in neighbors:
-            # Evitar nodos ya visitados
-            if neighbor_number in visited:
-                continue
-            
-            # Evitar nodos que ya están en el camino para prevenir ciclos
-            if any(node.number == neighbor_number for node in current_path.nodes):
-                continue
-            
-            neighbor = airspace.navpoints.get(neighbor_number)
-            if not neighbor:
-                if debug:
-                    print(f"¡Error! Vecino {neighbor_number} no encontrado en el mapa")
-                continue
-            
-            # Crear una copia del camino actual
-            new_path = current_path.copy()
-            
-            # Aplicar función de costo personalizada si se proporciona
-            if custom_cost_func:
-                adjusted_distance = custom_cost_func(current_node, neighbor, segment_distance)
-            else:
-                adjusted_distance = segment_distance
-            
-            # Añadir el nuevo nodo al camino
-            new_path.add_node(neighbor, adjusted_distance)
-            
-            # Calcular el costo estimado total (real + heurística simplificada)
-            # Usamos como heurística solo un valor constante pequeño para priorizar rutas más cortas
-            # pero sin distorsionar la búsqueda del camino más corto
-            heuristic = 1.0  # Valor constante bajo en lugar de distancia euclidiana
-            new_path.estimated_cost = new_path.real_cost + heuristic
-            
-            # Añadir el nuevo camino a la lista de caminos a explorar
-            current_paths.append(new_path)
+    if cached is not None:
+        path_numbers, total_distance = cached
+        if debug:
+            print("Ruta obtenida de la matriz de aeropuertos precalculada")
+    else:
+        path_numbers, total_distance = astar_search(
+            airspace, [p.number for p in origin_points], [p.number for p in dest_points],
+            custom_cost_func=custom_cost_func, directed=directed,
+            max_iterations=max_iterations, debug=debug)
+    
+    if not path_numbers:
+        return [], 0, None, None
+    
+    path = [airspace.navpoints[number] for number in path_numbers]
+    sid = path[0] if is_airport_code(airspace, origin) else None
+    star = path[-1] if is_airport_code(airspace, destination) else None
+    if debug and (sid or star):
+        print(f"Procedimientos utilizados: SID={sid.name if sid else '-'}, STAR={star.name if star else '-'}")
+    return path, total_distance, sid, star
+
+def find_shortest_path_astar(airspace, origin, destination, max_iterations=None, debug=False, custom_cost_func=None, recursion_level=0, directed=False):
+    """
+    Implementación del algoritmo A* para encontrar la ruta más corta
+    entre dos puntos en el espacio aéreo.
     
-    # Si no encontramos un camino
-    if debug:
-        print(f"No se encontró ruta después de {iterations} iteraciones")
-        if iterations >= max_iterations:
-            print("Se alcanzó el límite máximo de iteraciones")
+    Args:
+        airspace: Instancia de AirSpace
+        origin: Punto de origen (número, nombre, NavPoint, código de aeropuerto o (latitud, longitud))
+        destination: Punto de destino (número, nombre, NavPoint, código de aeropuerto o (latitud, longitud))
+        max_iterations: Número máximo de nodos a expandir (None para no limitar)
+        debug: Si es True, imprime información de depuración
+        custom_cost_func: Función opcional para calcular el costo de un segmento.
+                          Recibe (nodo1, nodo2, distancia_base) y retorna un costo
+                          que no debe ser menor que distancia_base.
+        recursion_level: Se conserva por compatibilidad; ya no se usa
+        directed: Si es True, los segmentos solo se recorren de origen a destino
     
-    return [], 0
+    Returns:
+        Una tupla con (camino, distancia_total) donde camino es una lista
+        de NavPoint y distancia_total es la distancia total en km.
+    """
+    path, total_distance, _, _ = find_route_with_procedures(
+        airspace, origin, destination, max_iterations, debug, custom_cost_func, directed)
+    return path, total_distance
+
+
+def _edge_cost(airspace, number1, number2, directed=False):
+    """Distancia del tramo más corto entre dos puntos consecutivos de una ruta"""
+    cost = float('inf')
+    segment = airspace.segment_index.get((number1, number2))
+    if segment is not None:
+        cost = segment.distance
+    if not directed:
+        segment = airspace.segment_index.get((number2, number1))
+        if segment is not None and segment.distance < cost:
+            cost = segment.distance
+    return cost
 
+def _different_points_ratio(path, other):
+    """Proporción de puntos intermedios de path que no aparecen en other"""
+    inner = path[1:-1]
+    if not inner:
+        return 0.0
+    common = set(inner).intersection(other[1:-1])
+    return 1.0 - len(common) / len(inner)
 
-def find_multiple_paths_astar(airspace, origin, destination, max_paths=3, debug=False):
+def find_k_shortest_paths(airspace, sources, targets, k=3, directed=False, min_difference=None, max_candidates=None):
     """
-    Encuentra múltiples rutas entre dos puntos usando el algoritmo A*.
+    Algoritmo de Yen para las k rutas simples (sin ciclos) más cortas.
+    
+    Varios orígenes o destinos (SIDs y STARs de un aeropuerto) se tratan como
+    un superorigen y un superdestino virtuales, así que las alternativas pueden
+    usar procedimientos distintos. Cada desviación ("spur") es una búsqueda A*
+    sobre el mismo índice de adyacencia con los nodos y tramos ya usados
+    prohibidos, y todas comparten la tabla de heurística.
     
     Args:
         airspace: Instancia de AirSpace
-        origin: Punto de origen (número, NavPoint o código de aeropuerto)
-        destination: Punto de destino (número, NavPoint o código de aeropuerto)
-        max_paths: Número máximo de rutas a encontrar
+        sources: Números de los puntos de origen
+        targets: Números de los puntos de destino
+        k: Número de rutas a devolver
+        directed: Si es True, los segmentos solo se recorren de origen a destino
+        min_difference: Si se indica (0-1), solo se aceptan rutas con al menos esa
+                        proporción de puntos intermedios distintos de cada ruta ya aceptada
+        max_candidates: Número máximo de rutas candidatas a examinar cuando se usa
+                        min_difference (por defecto 20 * k)
     
     Returns:
-        Una lista de tuplas (distancia, [número de puntos]), cada una representando una ruta.
+        Una lista de tuplas (distancia, [números de punto]) ordenada por distancia.
     """
-    # Verificar si origin o destination son códigos de aeropuerto
-    origin_is_airport = isinstance(origin, str) and origin.startswith(("LE", "LF"))
-    dest_is_airport = isinstance(destination, str) and destination.startswith(("LE", "LF"))
+    sources = [s for s in dict.fromkeys(sources) if s in airspace.navpoints]
+    # Todas las búsquedas comparten destinos: la heurística se calcula de una vez para todos los puntos.
+    # Con landmarks la cota se combina en astar_search y la caché se rellena según se necesita
+    if get_landmarks(airspace, directed) is not None:
+        heuristic_cache = {}
+    else:
+        heuristic_cache = heuristic_table(airspace, targets, get_heuristic_scale(airspace))
+    
+    first_path, first_cost = astar_search(airspace, sources, targets, directed=directed,
+                                          heuristic_cache=heuristic_cache)
+    if not first_path:
+        return []
     
-    # Si alguno es un aeropuerto, buscar todas las combinaciones de SIDs y STARs
-    if origin_is_airport or dest_is_airport:
-        if debug:
-            print(f"Buscando múltiples rutas con aeropuertos: Origen={origin}, Destino={destination}")
-        
-        all_paths = []
+    if max_candidates is None:
+        max_candidates = 20 * k
+    
+    results = [(first_cost, first_path)]
+    expanded = [first_path]  # Rutas ya usadas como base de desviaciones
+    candidates = []
+    seen = {tuple(first_path)}
+    counter = 0
+    examined = 0
+    
+    while len(results) < k:
+        previous = expanded[-1]
+        root_cost = 0.0
         
-        # Obtener el aeropuerto de origen si es necesario
-        origin_airport = None
-        origin_points = []
-        if origin_is_airport:
-            origin_airport = airspace.navairports.get(origin)
-            if debug:
-                print(f"Aeropuerto origen: {origin}, encontrado: {origin_airport is not None}")
-                if origin_airport:
-                    print(f"SIDs de {origin}: {origin_airport.sids}")
+        # El índice -1 representa el superorigen virtual: se desvía cambiando de origen
+        for i in range(-1, len(previous) - 1):
+            if i >= 1:
+                root_cost += _edge_cost(airspace, previous[i - 1], previous[i], directed)
+            root = previous[:i + 1]
             
-            if origin_airport and origin_airport.sids:
-                # Usar los SIDs como puntos de origen
-                for sid_num in origin_airport.sids:
-                    sid_point = airspace.navpoints.get(sid_num)
-                    if sid_point:
-                        origin_points.append(sid_point)
+            banned_edges = set()
+            banned_sources = set()
+            for path in expanded:
+                if len(path) > i + 1 and path[:i + 1] == root:
+                    if i == -1:
+                        banned_sources.add(path[0])
+                    else:
+                        banned_edges.add((path[i], path[i + 1]))
             
-            if not origin_points:
-                if debug:
-                    print(f"No se encontraron SIDs para el aeropuerto {origin}")
-                return []
-        else:
-            # Convertir número a objeto NavPoint si es necesario
-            if isinstance(origin, int):
-                origin = airspace.navpoints.get(origin)
-            origin_points = [origin]
-        
-        # Obtener el aeropuerto de destino si es necesario
-        dest_airport = None
-        dest_points = []
-        if dest_is_airport:
-            dest_airport = airspace.navairports.get(destination)
-            if debug:
-                print(f"Aeropuerto destino: {destination}, encontrado: {dest_airport is not None}")
-                if dest_airport:
-                    print(f"STARs de {destination}: {dest_airport.stars}")
+            if i == -1:
+                spur_sources = [s for s in sources if s not in banned_sources]
+                banned_nodes = None
+            else:
+                spur_sources = [root[-1]]
+                banned_nodes = set(root[:-1])
+            if not spur_sources:
+                continue
             
-            if dest_airport and dest_airport.stars:
-                # Usar los STARs como puntos de destino
-                for star_num in dest_airport.stars:
-                    star_point = airspace.navpoints.get(star_num)
-                    if star_point:
-                        dest_points.append(star_point)
+            spur_path, spur_cost = astar_search(
+                airspace, spur_sources, targets, directed=directed, banned_nodes=banned_nodes,
+                banned_edges=banned_edges, heuristic_cache=heuristic_cache)
+            if not spur_path:
+                continue
             
-            if not dest_points:
-                if debug:
-                    print(f"No se encontraron STARs para el aeropuerto {destination}")
-                return []
-        else:
-            # Convertir número a objeto NavPoint si es necesario
-            if isinstance(destination, int):
-                destination = airspace.navpoints.get(destination)
-            dest_points = [destination]
-        
-        # Probar todas las combinaciones de puntos de origen y destino
-        for o_point in origin_points:
-            for d_point in dest_points:
-                if debug:
-                    print(f"Probando múltiples rutas desde {o_point.name} (#{o_point.number}) a {d_point.name} (#{d_point.number})")
-                
-                # Encontrar una ruta estándar A* entre estos dos puntos
-                path, distance = find_shortest_path_astar(airspace, o_point, d_point, debug=debug)
-                
-                # Si encontramos una ruta, la agregamos a la lista
-                if path:
-                    path_numbers = [p.number for p in path]
-                    all_paths.append((distance, path_numbers))
-                    if debug:
-                        print(f"Ruta encontrada: {len(path)} puntos, {distance} km")
+            candidate = root[:-1] + spur_path
+            key = tuple(candidate)
+            if key not in seen:
+                seen.add(key)
+                heapq.heappush(candidates, (root_cost + spur_cost, counter, candidate))
+                counter += 1
         
-        # Ordenar las rutas por distancia y devolver hasta max_paths
-        all_paths.sort(key=lambda x: x[0])
-        return all_paths[:max_paths]
-    
-    # El resto de la función para búsqueda entre puntos normales
-    # Convertir números a objetos NavPoint si es necesario
-    if isinstance(origin, int):
-        origin = airspace.navpoints.get(origin)
-    if isinstance(destination, int):
-        destination = airspace.navpoints.get(destination)
-    
-    if not origin or not destination:
-        return []
-    
-    # Encontrar la primera ruta (la más corta) usando A*
-    first_path, first_distance = find_shortest_path_astar(airspace, origin, destination)
-    
-    if not first_path:
-        return []  # No se encontró ninguna ruta
-    
-    # Extraer solo los números de los puntos para facilitar la comparación
-    first_path_nums = [point.number for point in first_path]
+        # La mejor candidata pasa a ser la base de las siguientes desviaciones y
+        # se acepta si cumple la restricción de diversidad
+        if not candidates or (min_difference is not None and examined >= max_candidates):
+            break
+        cost, _, candidate = heapq.heappop(candidates)
+        examined += 1
+        expanded.append(candidate)
+        if min_difference is None or all(
+                _different_points_ratio(candidate, path) >= min_difference for _, path in results):
+            results.append((cost, candidate))
+    
+    return results
+
+def find_multiple_paths_astar(airspace, origin, destination, max_paths=3, debug=False, min_difference=None, directed=False):
+    """
+    Encuentra múltiples rutas entre dos puntos usando el algoritmo de Yen con A*.
     
-    # Añadir la primera ruta a la lista de resultados
-    result_paths = [(first_distance, first_path_nums)]
+    Args:
+        airspace: Instancia de AirSpace
+        origin: Punto de origen (número, nombre, NavPoint, código de aeropuerto o (latitud, longitud))
+        destination: Punto de destino (número, nombre, NavPoint, código de aeropuerto o (latitud, longitud))
+        max_paths: Número máximo de rutas a encontrar
+        debug: Si es True, imprime información de depuración
+        min_difference: Proporción mínima de puntos intermedios distintos entre
+                        rutas (None devuelve las k rutas más cortas sin filtrar)
+        directed: Si es True, los segmentos solo se recorren de origen a destino
     
-    # Conjunto de segmentos usados en la primera ruta
-    used_segments = set()
-    for i in range(len(first_path) - 1):
-        segment = (first_path[i].number, first_path[i+1].number)
-        used_segments.add(segment)
+    Returns:
+        Una lista de tuplas (distancia, [número de puntos]), cada una representando una ruta.
+    """
+    if debug:
+        print(f"Buscando múltiples rutas: Origen={origin}, Destino={destination}")
     
-    # Factor de penalización para segmentos ya utilizados - incrementamos el valor inicial
-    penalty_factor = 5.0
+    origin_points = resolve_route_endpoints(airspace, origin, True, debug)
+    dest_points = resolve_route_endpoints(airspace, destination, False, debug)
+    if not origin_points or not dest_points:
+        return []
     
-    # Conjunto para llevar un seguimiento de los puntos intermedios penalizados
-    # Esto nos permitirá generar rutas más diversas
-    penalized_points = set()
+    paths = find_k_shortest_paths(
+        airspace, [p.number for p in origin_points], [p.number for p in dest_points],
+        k=max_paths, directed=directed, min_difference=min_difference)
     
-    # Intentar encontrar rutas adicionales
-    for attempt in range(max_paths * 3):  # Aumentamos el número de intentos
-        if len(result_paths) >= max_paths:
-            break
-            
-        # Seleccionar puntos a penalizar de la ruta más reciente
-        if attempt > 0 and attempt % 3 == 0:
-            latest_path = [airspace.navpoints.get(num) for num in result_paths[-1][1]]
-            # Seleccionar algunos puntos intermedios para penalizar
-            if len(latest_path) > 3:  # Ignorar origen y destino
-                # Penalizar un punto intermedio diferente en cada intento
-                mid_idx = (attempt // 3) % (len(latest_path) - 2) + 1
-                if mid_idx < len(latest_path) - 1:
-                    mid_point = latest_path[mid_idx]
-                    penalized_points.add(mid_point.number)
-        
-        # Función de costo personalizada que penaliza segmentos ya utilizados
-        # y evita pasar por ciertos puntos intermedios
-        def custom_cost_func(node1, node2, base_distance):
-            # Penalizar segmentos ya utilizados
-            segment = (node1.number, node2.number)
-            if segment in used_segments:
-                return base_distance * penalty_factor
-            
-            # Penalizar puntos intermedios seleccionados
-            if node2.number in penalized_points and node2.number != destination.number:
-                return base_distance * (penalty_factor * 1.5)
-                
-            return base_distance
-        
-        # Encontrar otra ruta con la función de costo personalizada
-        next_path, next_distance = find_shortest_path_astar(
-            airspace, origin, destination, custom_cost_func=custom_cost_func)
-        
-        if not next_path:
-            break  # No se encontraron más rutas
-        
-        # Extraer solo los números de los puntos
-        next_path_nums = [point.number for point in next_path]
-        
-        # Verificar si esta ruta es suficientemente diferente de las anteriores
-        is_different = True
-        
-        # Una ruta es diferente si tiene al menos un 30% de puntos distintos a cualquier ruta anterior
-        for existing_distance, existing_path in result_paths:
-            # Calcular cuántos puntos diferentes hay entre las rutas
-            # Excluyendo origen y destino que siempre serán iguales
-            common_points = set(existing_path[1:-1]).intersection(set(next_path_nums[1:-1]))
-            
-            if len(next_path_nums) <= 2:
-                # Si la ruta solo tiene origen y destino, no es diferente
-                is_different = False
-                break
-                
-            different_points_ratio = 1.0 - (len(common_points) / (len(next_path_nums) - 2))
-            
-            # Si la ruta es muy similar a una existente, no la consideramos diferente
-            if different_points_ratio < 0.3:  # Al menos 30% de puntos diferentes
-                is_different = False
-                break
-        
-        if is_different:
-            # Añadir la nueva ruta a los resultados
-            result_paths.append((next_distance, next_path_nums))
-            
-            # Actualizar el conjunto de segmentos utilizados
-            for i in range(len(next_path) - 1):
-                segment = (next_path[i].number, next_path[i+1].number)
-                used_segments.add(segment)
-                
-            # Reducir el factor de penalización para el próximo intento
-            penalty_factor = 5.0  # Reiniciar el factor para el siguiente intento
-        else:
-            # Si encontramos una ruta similar, aumentamos el factor de penalización
-            penalty_factor *= 1.5
-            
-            # Si el factor es demasiado alto, es poco probable que encontremos nuevas rutas
-            if penalty_factor > 30:
-                # Reiniciar el factor de penalización y cambiar la estrategia
-                penalty_factor = 5.0
-                
-                # Si aún no tenemos suficientes rutas, podemos ser menos exigentes
-                if len(result_paths) < 2 and attempt > max_paths:
-                    break  # No se pueden encontrar más rutas diferentes
-    
-    # Ordenar las rutas por distancia
-    result_paths.sort(key=lambda x: x[0])
-    
-    # Devolver las rutas encontradas (hasta max_paths)
-    return result_paths[:max_paths]
+    if debug:
+        for distance, path_numbers in paths:
+            print(f"Ruta encontrada: {len(path_numbers)} puntos, {distance} km")
+    return paths
 
 def plot_path(graph, path):
     """
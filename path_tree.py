@@ -0,0 +1,188 @@
+"""
+Árboles de caminos mínimos desde un origen.
+
+Un ShortestPathTree guarda las distancias y los predecesores de todos los
+puntos (arrays indexados por el identificador denso del grafo CSR) calculados
+con un único Dijkstra, así que la ruta a cualquier destino se reconstruye en
+tiempo proporcional a su longitud. Los árboles de los orígenes consultados se
+guardan asociados a la versión del espacio aéreo para reutilizarlos.
+"""
+
+import heapq
+from array import array
+from collections import OrderedDict
+
+from airSpace import get_derived
+from csr_graph import get_csr_graph
+
+INFINITY = float('inf')
+# Árboles guardados por espacio aéreo; cada uno ocupa 12 bytes por punto
+MAX_CACHED_TREES = 16
+
+
+def shortest_path_tree_arrays(graph, sources, max_distance=None):
+    """
+    Dijkstra desde uno o varios nodos del grafo CSR.
+
+    Args:
+        graph: CSRGraph
+        sources: Identificadores densos de los orígenes (distancia 0)
+        max_distance: Si se indica, la búsqueda se detiene al superar esa distancia
+                      y los nodos más lejanos quedan con distancia infinita
+
+    Returns:
+        Una tupla (distancias, predecesores) con un array('d') y un array('i')
+        indexados por identificador; el predecesor es -1 en los orígenes y en
+        los nodos no alcanzados.
+    """
+    count = len(graph)
+    distances = array('d', [INFINITY]) * count
+    predecessors = array('i', [-1]) * count
+    offsets = graph.offsets
+    targets = graph.targets
+    weights = graph.weights
+    queue = []
+    for source in sources:
+        distances[source] = 0.0
+        queue.append((0.0, source))
+    limit = INFINITY if max_distance is None else max_distance
+
+    while queue:
+        current_distance, current = heapq.heappop(queue)
+        if current_distance > distances[current]:
+            continue
+        start = offsets[current]
+        end = offsets[current + 1]
+        for neighbor, segment_distance in zip(targets[start:end], weights[start:end]):
+            new_distance = current_distance + segment_distance
+            if new_distance < distances[neighbor] and new_distance <= limit:
+                distances[neighbor] = new_distance
+                predecessors[neighbor] = current
+                heapq.heappush(queue, (new_distance, neighbor))
+
+    return distances, predecessors
+
+
+class ShortestPathTree:
+    """Distancias y predecesores desde un conjunto de orígenes"""
+    def __init__(self, graph, sources, distances, predecessors, max_distance=None):
+        self.node_numbers = graph.node_numbers
+        self.node_index = graph.node_index
+        self.directed = graph.directed
+        self.sources = sources  # números de los puntos de origen
+        self.distances = distances  # array('d') por identificador denso
+        self.predecessors = predecessors  # array('i') por identificador denso, -1 si no hay
+        self.max_distance = max_distance  # límite de la búsqueda o None si es completa
+
+    def distance_to(self, number):
+        """Distancia mínima hasta el punto (infinito si no se alcanza)"""
+        node = self.node_index.get(number)
+        return self.distances[node] if node is not None else INFINITY
+
+    def path_to(self, number):
+        """Números de los puntos de la ruta desde el origen; lista vacía si no se alcanza"""
+        node = self.node_index.get(number)
+        if node is None or self.distances[node] == INFINITY:
+            return []
+        path = []
+        while node >= 0:
+            path.append(self.node_numbers[node])
+            node = self.predecessors[node]
+        path.reverse()
+        return path
+
+    def reachable_within(self, max_distance):
+        """Isocrona: pares (número, distancia) a max_distance km o menos, de menor a mayor distancia"""
+        if self.max_distance is not None and max_distance > self.max_distance:
+            raise ValueError("El árbol se calculó con un límite de distancia menor")
+        numbers = self.node_numbers
+        reachable = [(distance, numbers[node]) for node, distance in enumerate(self.distances)
+                     if distance <= max_distance]
+        reachable.sort()
+        return [(number, distance) for distance, number in reachable]
+
+
+def build_shortest_path_tree(airspace, sources, directed=False, max_distance=None):
+    """
+    Calcula el árbol de caminos mínimos desde unos puntos.
+
+    Args:
+        airspace: Instancia de AirSpace
+        sources: Números de los puntos de origen (los que no existen se ignoran)
+        directed: Si es True, los segmentos solo se recorren de origen a destino
+        max_distance: Límite opcional de la búsqueda en km
+
+    Returns:
+        Una instancia de ShortestPathTree
+    """
+    graph = get_csr_graph(airspace, directed)
+    sources = [s for s in dict.fromkeys(sources) if s in graph.node_index]
+    distances, predecessors = shortest_path_tree_arrays(graph, [graph.node_index[s] for s in sources],
+                                                        max_distance)
+    return ShortestPathTree(graph, sources, distances, predecessors, max_distance)
+
+
+def _resolve_sources(airspace, origin):
+    from path import resolve_route_endpoints
+    return [p.number for p in resolve_route_endpoints(airspace, origin, True)]
+
+
+def get_shortest_path_tree(airspace, origin, directed=False):
+    """
+    Árbol de caminos mínimos completo desde un origen, reutilizado mientras el
+    espacio aéreo no cambie.
+
+    Args:
+        origin: Número, nombre, NavPoint, código de aeropuerto (sus SIDs) o (latitud, longitud)
+    """
+    sources = tuple(_resolve_sources(airspace, origin))
+    trees = get_derived(airspace, "path_trees", lambda a: OrderedDict())
+    key = (sources, directed)
+    tree = trees.get(key)
+    if tree is None:
+        tree = build_shortest_path_tree(airspace, sources, directed)
+        trees[key] = tree
+        if len(trees) > MAX_CACHED_TREES:
+            trees.popitem(last=False)
+    else:
+        trees.move_to_end(key)
+    return tree
+
+
+def shortest_paths_from(airspace, origin, destinations, directed=False):
+    """
+    Rutas desde un origen a muchos destinos con un único árbol.
+
+    Args:
+        destinations: Números, nombres, NavPoint o códigos de aeropuerto (se
+                      elige el STAR más cercano)
+
+    Returns:
+        Lista de tuplas (lista de números de punto, distancia) en el orden de
+        destinations, con ([], inf) para los destinos que no se alcanzan.
+    """
+    from path import resolve_route_endpoints
+
+    tree = get_shortest_path_tree(airspace, origin, directed)
+    results = []
+    for destination in destinations:
+        candidates = [p.number for p in resolve_route_endpoints(airspace, destination, False)]
+        best = min(candidates, key=tree.distance_to, default=None)
+        if best is None or tree.distance_to(best) == INFINITY:
+            results.append(([], INFINITY))
+        else:
+            results.append((tree.path_to(best), tree.distance_to(best)))
+    return results
+
+
+def find_reachable_within(airspace, origin, max_distance, directed=False):
+    """
+    Isocrona: NavPoint a los que se llega desde el origen recorriendo como
+    máximo max_distance km de segmentos.
+
+    Returns:
+        Lista de tuplas (NavPoint, distancia) de menor a mayor distancia
+    """
+    sources = _resolve_sources(airspace, origin)
+    tree = build_shortest_path_tree(airspace, sources, directed, max_distance)
+    return [(airspace.navpoints[number], distance) for number, distance in tree.reachable_within(max_distance)]
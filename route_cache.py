@@ -0,0 +1,129 @@
+"""
+Caché LRU de búsquedas de rutas.
+
+Las claves incluyen el origen, el destino, la función de coste, las opciones de
+la búsqueda y la versión del espacio aéreo, de modo que cualquier llamada a
+add_navpoint, add_navsegment o add_navairport (que incrementan la versión)
+deja sin validez los resultados anteriores; al detectarlo la caché se vacía.
+Con debug, un acierto escribe la ruta guardada en lugar de la traza de la búsqueda.
+"""
+
+from collections import OrderedDict
+
+from navPoint import NavPoint
+from path import find_route_with_procedures, find_multiple_paths_astar
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+class RouteCache:
+    """Resultados de búsquedas recientes con expulsión del menos usado (LRU)"""
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # clave -> resultado, del menos al más usado
+        self.version = None  # versión del espacio aéreo de las entradas guardadas
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, airspace, key, compute, on_hit=None):
+        """
+        Devuelve el resultado guardado para key o lo calcula con compute() y lo
+        guarda. Si el resultado ya estaba guardado se llama a on_hit(resultado).
+        """
+        if self.version != airspace.version:
+            if self.entries:
+                self.invalidations += 1
+                self.entries.clear()
+            self.version = airspace.version
+
+        key = key + (airspace.version,)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            if on_hit is not None:
+                on_hit(self.entries[key])
+            return self.entries[key]
+
+        self.misses += 1
+        result = compute()
+        self.entries[key] = result
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        """Contadores de la caché como diccionario"""
+        return {"entries": len(self.entries), "max_entries": self.max_entries, "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions, "invalidations": self.invalidations}
+
+
+def get_route_cache(airspace):
+    """Caché de rutas asociada al espacio aéreo (se crea la primera vez)"""
+    if airspace.route_cache is None:
+        airspace.route_cache = RouteCache()
+    return airspace.route_cache
+
+
+def _endpoint_key(endpoint):
+    # Un NavPoint y su número son el mismo extremo; nombres, códigos y coordenadas se usan tal cual
+    if isinstance(endpoint, NavPoint):
+        return endpoint.number
+    return endpoint
+
+
+def _print_cached_route(airspace, result):
+    # Con debug, un acierto de la caché explica el resultado en lugar de no escribir nada
+    path, total_distance, sid, star = result
+    if not path:
+        print("Ruta obtenida de la caché de rutas: no hay ruta")
+        return
+    print(f"Ruta obtenida de la caché de rutas: {' -> '.join(p.name for p in path)} ({total_distance:.2f} km)")
+    if sid or star:
+        print(f"Procedimientos utilizados: SID={sid.name if sid else '-'}, STAR={star.name if star else '-'}")
+
+
+def _print_cached_alternatives(airspace, routes):
+    print(f"Rutas alternativas obtenidas de la caché de rutas: {len(routes)}")
+    for distance, path in routes:
+        names = ' -> '.join(airspace.navpoints[n].name if n in airspace.navpoints else str(n) for n in path)
+        print(f"  {names} ({distance:.2f} km)")
+
+
+def cached_route_with_procedures(airspace, origin, destination, max_iterations=None, debug=False,
+                                 custom_cost_func=None, directed=False):
+    """find_route_with_procedures con la caché de rutas del espacio aéreo"""
+    key = ("route", _endpoint_key(origin), _endpoint_key(destination), custom_cost_func, directed, max_iterations)
+    path, total_distance, sid, star = get_route_cache(airspace).lookup(
+        airspace, key, lambda: find_route_with_procedures(airspace, origin, destination, max_iterations, debug,
+                                                          custom_cost_func, directed),
+        on_hit=(lambda result: _print_cached_route(airspace, result)) if debug else None)
+    # Copia de la lista para que quien la reciba pueda modificarla sin alterar la caché
+    return list(path), total_distance, sid, star
+
+
+def cached_shortest_path_astar(airspace, origin, destination, max_iterations=None, debug=False,
+                               custom_cost_func=None, directed=False):
+    """find_shortest_path_astar con la caché de rutas del espacio aéreo"""
+    path, total_distance, _, _ = cached_route_with_procedures(
+        airspace, origin, destination, max_iterations, debug, custom_cost_func, directed)
+    return path, total_distance
+
+
+def cached_multiple_paths_astar(airspace, origin, destination, max_paths=3, debug=False,
+                                min_difference=None, directed=False):
+    """find_multiple_paths_astar con la caché de rutas del espacio aéreo"""
+    key = ("alternatives", _endpoint_key(origin), _endpoint_key(destination), max_paths, min_difference, directed)
+    routes = get_route_cache(airspace).lookup(
+        airspace, key, lambda: find_multiple_paths_astar(airspace, origin, destination, max_paths, debug,
+                                                         min_difference, directed),
+        on_hit=(lambda routes: _print_cached_alternatives(airspace, routes)) if debug else None)
+    return [(distance, list(path)) for distance, path in routes]
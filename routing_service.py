@@ -0,0 +1,236 @@
+"""
+Operaciones de enrutamiento sin interfaz gráfica.
+
+Reúne la carga de datos, la búsqueda de puntos, los vecinos y el cálculo de
+rutas que usa interface_v4, de modo que un servidor o un proceso por lotes los
+pueden importar sin tkinter, matplotlib, PIL ni pygame. Las consultas que no
+se pueden resolver lanzan RoutingError con el texto que se muestra al usuario.
+"""
+
+import logging
+
+from airSpace import (AirSpace, get_navpoint_by_name, get_navpoints_by_name, get_outgoing_segments,
+                      has_segments, search_names_by_prefix, search_names_fuzzy, snap_to_graph)
+from airport_matrix import precompute_airport_matrix
+from path import is_airport_code
+from route_cache import cached_route_with_procedures, cached_multiple_paths_astar
+from snapshot import load_with_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingError(Exception):
+    """Consulta que no se puede resolver; el mensaje explica el motivo"""
+
+
+class RouteEndpoint:
+    """Origen o destino de una ruta ya resuelto"""
+    __slots__ = ("text", "point", "airport", "message")
+
+    def __init__(self, text, point=None, airport=None, message=""):
+        self.text = text  # texto introducido por el usuario
+        self.point = point  # NavPoint, o None si es un aeropuerto
+        self.airport = airport  # NavAirport, o None si es un punto
+        self.message = message  # aviso para el usuario (coordenada ajustada a un punto)
+
+    @property
+    def is_airport(self):
+        return self.airport is not None
+
+    @property
+    def value(self):
+        """Origen o destino tal como lo esperan las búsquedas de path"""
+        return self.airport.name if self.airport is not None else self.point
+
+
+class RouteResult:
+    """Ruta calculada entre dos RouteEndpoint"""
+    __slots__ = ("origin", "destination", "path", "distance", "sid", "star")
+
+    def __init__(self, origin, destination, path, distance, sid=None, star=None):
+        self.origin = origin
+        self.destination = destination
+        self.path = path  # lista de NavPoint, vacía si no hay ruta
+        self.distance = distance
+        self.sid = sid  # SID usado si el origen es un aeropuerto
+        self.star = star  # STAR usado si el destino es un aeropuerto
+
+    @property
+    def found(self):
+        return bool(self.path)
+
+
+def load_airspace(nav_file, seg_file, aer_file, precompute=True, cache_dir=None):
+    """
+    Carga un espacio aéreo (con la instantánea binaria si está al día) y, si
+    se indica, prepara la matriz de rutas entre aeropuertos.
+
+    Args:
+        cache_dir: Directorio de la instantánea y de la matriz (por defecto el de nav_file)
+
+    Returns:
+        El AirSpace cargado o None si no se pudieron leer los ficheros
+    """
+    airspace = AirSpace()
+    if not load_with_snapshot(airspace, nav_file, seg_file, aer_file, cache_dir):
+        return None
+    if precompute:
+        try:
+            precompute_airport_matrix(airspace, cache_dir)
+        except Exception as e:  # La matriz solo acelera las consultas
+            logger.warning("No se pudo preparar la matriz de aeropuertos: %s", e)
+    return airspace
+
+
+def suggest_names(airspace, name, limit=5):
+    """Nombres de puntos parecidos a uno que no se ha encontrado"""
+    if not airspace:
+        return []
+    return search_names_fuzzy(airspace, name, limit=limit) or search_names_by_prefix(airspace, name, limit=limit)
+
+
+def _suggestion_line(airspace, name):
+    suggestions = suggest_names(airspace, name)
+    return f"¿Quizás quiso decir: {', '.join(suggestions)}?\n" if suggestions else ""
+
+
+def duplicate_name_warning(airspace, name):
+    """Aviso si varios puntos comparten el nombre (las búsquedas usan el primero); cadena vacía si no"""
+    points = get_navpoints_by_name(airspace, name)
+    if len(points) < 2:
+        return ""
+    numbers = ", ".join(f"#{p.number}" for p in points)
+    return f"Aviso: hay {len(points)} puntos llamados {name} ({numbers}); se usa #{points[0].number}.\n"
+
+
+def parse_coordinates(text):
+    """Convierte un texto 'latitud, longitud' en una tupla de floats o devuelve None"""
+    parts = text.replace(",", " ").split()
+    if len(parts) != 2:
+        return None
+    try:
+        return float(parts[0]), float(parts[1])
+    except ValueError:
+        return None
+
+
+def lookup_point(airspace, name):
+    """NavPoint con ese nombre; lanza RoutingError con sugerencias si no existe"""
+    point = get_navpoint_by_name(airspace, name)
+    if not point:
+        raise RoutingError(f"Punto de navegación '{name}' no encontrado.\n" + _suggestion_line(airspace, name))
+    return point
+
+
+def resolve_endpoint(airspace, text, is_origin):
+    """
+    Interpreta el origen o destino de una ruta introducido como texto: un
+    código de aeropuerto (LExx, LFxx), un nombre de punto o una coordenada
+    'latitud, longitud' que se ajusta al punto conectado más cercano.
+
+    Returns:
+        Un RouteEndpoint
+
+    Raises:
+        RoutingError: Si el aeropuerto o el punto no existen
+    """
+    role = "origen" if is_origin else "destino"
+    # Solo es un aeropuerto si existe con ese código: hay puntos llamados LESBA o LEKTO
+    if is_airport_code(airspace, text):
+        return RouteEndpoint(text, airport=airspace.navairports[text])
+
+    point = get_navpoint_by_name(airspace, text)
+    if point:
+        return RouteEndpoint(text, point=point)
+    coordinates = parse_coordinates(text)
+    snapped = snap_to_graph(airspace, *coordinates) if coordinates else None
+    if not snapped:
+        if text.startswith(("LE", "LF")):
+            raise RoutingError(f"ERROR: No se encontró ningún aeropuerto ni punto con el código '{text}'.\n"
+                               f"Por favor verifique que el código del aeropuerto de {role} sea correcto.\n"
+                               + _suggestion_line(airspace, text))
+        raise RoutingError(f"ERROR: No se encontró ningún punto con el nombre '{text}'.\n"
+                           f"Por favor verifique que el nombre del punto de {role} sea correcto.\n"
+                           + _suggestion_line(airspace, text))
+    point, distance = snapped
+    latitude, longitude = coordinates
+    return RouteEndpoint(text, point=point,
+                         message=f"Coordenada ({latitude}, {longitude}) ajustada al punto {point.name} "
+                                 f"(#{point.number}) a {distance:.2f} km.\n")
+
+
+def check_connected(airspace, origin, destination):
+    """
+    Comprueba que dos puntos (no aeropuertos) tienen algún segmento; lanza
+    RoutingError si alguno está aislado en el grafo de navegación.
+    """
+    if origin.is_airport or destination.is_airport:
+        return
+    for endpoint in (origin, destination):
+        if not has_segments(airspace, endpoint.point.number):
+            raise RoutingError(f"ERROR: El punto '{endpoint.point.name}' no está conectado a ningún segmento.\n"
+                               "Este punto está aislado en el grafo de navegación y no puede ser utilizado "
+                               "para ruteo.\n")
+
+
+def _resolve_pair(airspace, origin, destination):
+    if not isinstance(origin, RouteEndpoint):
+        origin = resolve_endpoint(airspace, origin, True)
+    if not isinstance(destination, RouteEndpoint):
+        destination = resolve_endpoint(airspace, destination, False)
+    check_connected(airspace, origin, destination)
+    return origin, destination
+
+
+def get_neighbors(airspace, point):
+    """
+    Vecinos a los que se llega con un segmento de salida.
+
+    Args:
+        point: NavPoint o nombre del punto
+
+    Returns:
+        Una tupla (NavPoint, lista de tuplas (vecino, distancia) ordenada por nombre)
+    """
+    if not hasattr(point, "number"):
+        point = lookup_point(airspace, point)
+    neighbors = []
+    for segment in get_outgoing_segments(airspace, point.number):
+        neighbor = airspace.navpoints.get(segment.destination_number)
+        if neighbor is not None:
+            neighbors.append((neighbor, segment.distance))
+    neighbors.sort(key=lambda item: item[0].name)
+    return point, neighbors
+
+
+def find_route(airspace, origin, destination, debug=False):
+    """
+    Ruta más corta (A* con la caché de rutas) entre dos textos o RouteEndpoint.
+    Con aeropuertos se prueban todos sus SIDs y STARs.
+
+    Returns:
+        Un RouteResult, con la ruta vacía si los extremos no están conectados
+
+    Raises:
+        RoutingError: Si un extremo no existe o es un punto aislado
+    """
+    origin, destination = _resolve_pair(airspace, origin, destination)
+    path, distance, sid, star = cached_route_with_procedures(airspace, origin.value, destination.value, debug=debug)
+    return RouteResult(origin, destination, path, distance, sid, star)
+
+
+def find_alternative_routes(airspace, origin, destination, max_paths=3, min_difference=0.3):
+    """
+    Rutas alternativas (Yen + A*) que difieren al menos en min_difference de sus puntos.
+
+    Returns:
+        Lista de tuplas (lista de NavPoint, distancia) de menor a mayor distancia
+    """
+    origin, destination = _resolve_pair(airspace, origin, destination)
+    routes = []
+    for distance, numbers in cached_multiple_paths_astar(airspace, origin.value, destination.value, max_paths,
+                                                         min_difference=min_difference):
+        path = [airspace.navpoints[n] for n in numbers if n in airspace.navpoints]
+        if len(path) == len(numbers):
+            routes.append((path, distance))
+    return routes
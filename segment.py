@@ -1,6 +1,8 @@
 from node import *
 
 class Segment:
+    __slots__ = ("name", "orig", "dest", "cost")
+
     def __init__(self, name, orig, dest):
         self.name = name
         self.orig = orig
@@ -0,0 +1,307 @@
+"""
+Instantánea binaria de un AirSpace cargado.
+
+Guarda los puntos como arrays paralelos (número, latitud, longitud, índice de
+nombre) con los nombres sin repetir, los segmentos como adyacencia CSR sobre
+las posiciones de los puntos y los aeropuertos con las listas de posiciones de
+sus SIDs y STARs. El fichero se abre con mmap y los arrays se leen como vistas
+de NumPy sobre él, sin copiarlos. Lleva el hash de los ficheros nav/seg/aer de
+origen, así que una instantánea desactualizada se detecta y se vuelve a generar.
+
+Las instantáneas se guardan por defecto junto al fichero nav, con el nombre
+airspace_<fichero nav>_<hash>.snap; al guardar una nueva se borran las
+anteriores de los mismos ficheros, de modo que solo queda una por conjunto de
+datos.
+"""
+
+import logging
+import mmap
+import os
+import re
+import struct
+import time
+
+import numpy as np
+
+from airSpace import load_from_files, populate_from_columns, set_name_from_file
+from airport_matrix import hash_source_files
+from bulk_loader import NetworkColumns
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b"ASNP"
+SNAPSHOT_VERSION = 1
+# magic, versión, reservado, hash sha256, nº de puntos, nº de nombres distintos,
+# nº de segmentos, nº de segmentos con extremos desconocidos, nº de aeropuertos, nº de SIDs, nº de STARs
+HEADER_FORMAT = "<4sHH32sIIIIIII"
+ALIGNMENT = 8
+
+
+def _padding(size):
+    return -size % ALIGNMENT
+
+
+class Snapshot:
+    """Vistas de solo lectura sobre una instantánea abierta con open_snapshot"""
+    def __init__(self, source_hash, numbers, latitudes, longitudes, name_ids, names,
+                 indptr, targets, distances, orphan_origins, orphan_destinations, orphan_distances,
+                 airport_codes, sid_indptr, sids, star_indptr, stars):
+        self.source_hash = source_hash
+        self.numbers = numbers  # int64: posición -> número de punto
+        self.latitudes = latitudes  # float64, grados
+        self.longitudes = longitudes  # float64, grados
+        self.name_ids = name_ids  # uint32: posición -> índice en names
+        self.names = names  # lista de nombres distintos
+        self.indptr = indptr  # int64: segmentos de la posición i en [indptr[i], indptr[i + 1])
+        self.targets = targets  # int32: posición del destino de cada segmento
+        self.distances = distances  # float64: distancia de cada segmento
+        self.orphan_origins = orphan_origins  # int64: segmentos con algún extremo sin punto
+        self.orphan_destinations = orphan_destinations
+        self.orphan_distances = orphan_distances
+        self.airport_codes = airport_codes  # lista de códigos
+        self.sid_indptr = sid_indptr  # int32: SIDs del aeropuerto a en [sid_indptr[a], sid_indptr[a + 1])
+        self.sids = sids  # int32: posiciones de los puntos SID
+        self.star_indptr = star_indptr
+        self.stars = stars
+
+    def to_columns(self):
+        """Convierte la instantánea en NetworkColumns para populate_from_columns"""
+        names = self.names
+        point_names = [names[i] for i in self.name_ids.tolist()]
+        origins = np.repeat(self.numbers, np.diff(self.indptr))
+        destinations = self.numbers[self.targets]
+        distances = self.distances
+        if len(self.orphan_origins):
+            origins = np.concatenate((origins, self.orphan_origins))
+            destinations = np.concatenate((destinations, self.orphan_destinations))
+            distances = np.concatenate((distances, self.orphan_distances))
+
+        numbers = self.numbers.tolist()
+        sids = self.sids.tolist()
+        stars = self.stars.tolist()
+        procedures = []
+        for a, code in enumerate(self.airport_codes):
+            procedures.append((code,
+                               [numbers[p] for p in sids[self.sid_indptr[a]:self.sid_indptr[a + 1]]],
+                               [numbers[p] for p in stars[self.star_indptr[a]:self.star_indptr[a + 1]]]))
+
+        columns = NetworkColumns(self.numbers, point_names, self.latitudes, self.longitudes,
+                                 origins, destinations, distances, [])
+        columns.airport_procedures = procedures
+        return columns
+
+
+def _write_array(f, values, dtype):
+    data = np.ascontiguousarray(values, dtype=dtype).tobytes()
+    f.write(data)
+    f.write(b"\0" * _padding(len(data)))
+
+
+def _write_blob(f, strings):
+    data = "\n".join(strings).encode("utf-8")
+    f.write(struct.pack("<Q", len(data)))
+    f.write(data)
+    f.write(b"\0" * _padding(len(data)))
+
+
+def save_snapshot(airspace, filename, source_hash=b""):
+    """Guarda el espacio aéreo en el formato binario versionado"""
+    points = list(airspace.navpoints.values())
+    position = {p.number: i for i, p in enumerate(points)}
+
+    name_ids = {}
+    for p in points:
+        name_ids.setdefault(p.name, len(name_ids))
+
+    # CSR por posición de origen; la ordenación estable conserva el orden de los segmentos repetidos
+    linked = []
+    orphans = []
+    for s in airspace.navsegments:
+        origin = position.get(s.origin_number)
+        destination = position.get(s.destination_number)
+        if origin is None or destination is None:
+            orphans.append(s)
+        else:
+            linked.append((origin, destination, s.distance))
+    linked.sort(key=lambda row: row[0])
+    counts = np.bincount(np.array([row[0] for row in linked], dtype=np.int64), minlength=len(points))
+    indptr = np.zeros(len(points) + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    codes = list(airspace.navairports)
+    sid_lists = [[position[n] for n in airspace.navairports[c].sids if n in position] for c in codes]
+    star_lists = [[position[n] for n in airspace.navairports[c].stars if n in position] for c in codes]
+
+    temporary = filename + ".tmp"
+    with open(temporary, 'wb') as f:
+        header = struct.pack(HEADER_FORMAT, SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, source_hash.ljust(32, b"\0"),
+                             len(points), len(name_ids), len(linked), len(orphans), len(codes),
+                             sum(map(len, sid_lists)), sum(map(len, star_lists)))
+        f.write(header)
+        f.write(b"\0" * _padding(len(header)))
+
+        _write_array(f, [p.number for p in points], "<i8")
+        _write_array(f, [p.latitude for p in points], "<f8")
+        _write_array(f, [p.longitude for p in points], "<f8")
+        _write_array(f, [name_ids[p.name] for p in points], "<u4")
+        _write_blob(f, name_ids)
+
+        _write_array(f, indptr, "<i8")
+        _write_array(f, [row[1] for row in linked], "<i4")
+        _write_array(f, [row[2] for row in linked], "<f8")
+        _write_array(f, [s.origin_number for s in orphans], "<i8")
+        _write_array(f, [s.destination_number for s in orphans], "<i8")
+        _write_array(f, [s.distance for s in orphans], "<f8")
+
+        _write_blob(f, codes)
+        for lists in (sid_lists, star_lists):
+            _write_array(f, np.cumsum([0] + [len(values) for values in lists]), "<i4")
+            _write_array(f, [value for values in lists for value in values], "<i4")
+    # Se sustituye de una vez para que otro proceso nunca lea un fichero a medias
+    os.replace(temporary, filename)
+
+
+class _Reader:
+    def __init__(self, buffer, offset):
+        self.buffer = buffer
+        self.offset = offset
+
+    def array(self, dtype, count):
+        dtype = np.dtype(dtype)
+        values = np.frombuffer(self.buffer, dtype=dtype, count=count, offset=self.offset)
+        size = dtype.itemsize * count
+        self.offset += size + _padding(size)
+        return values
+
+    def blob(self):
+        (size,) = struct.unpack_from("<Q", self.buffer, self.offset)
+        start = self.offset + 8
+        text = bytes(self.buffer[start:start + size]).decode("utf-8")
+        self.offset = start + size + _padding(size)
+        return text.split("\n") if text else []
+
+
+def open_snapshot(filename, expected_hash=None):
+    """
+    Abre una instantánea guardada con save_snapshot mediante mmap.
+    Devuelve None si el fichero no existe, tiene otro formato o su hash no coincide.
+    """
+    try:
+        with open(filename, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    snapshot = _read_snapshot(buffer, expected_hash)
+    if snapshot is None:
+        # Un fichero mapeado no se puede sustituir en Windows: se cierra antes de que
+        # load_with_snapshot guarde encima la instantánea nueva
+        buffer.close()
+    return snapshot
+
+
+def _read_snapshot(buffer, expected_hash):
+    """Snapshot con los arrays del buffer, o None si no es una instantánea válida"""
+    header_size = struct.calcsize(HEADER_FORMAT)
+    if len(buffer) < header_size:
+        return None
+    (magic, version, _, source_hash, points, names, linked, orphans,
+     airports, sid_count, star_count) = struct.unpack_from(HEADER_FORMAT, buffer)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION:
+        return None
+    if expected_hash is not None and source_hash != expected_hash:
+        return None
+
+    try:
+        reader = _Reader(buffer, header_size + _padding(header_size))
+        numbers = reader.array("<i8", points)
+        latitudes = reader.array("<f8", points)
+        longitudes = reader.array("<f8", points)
+        name_ids = reader.array("<u4", points)
+        name_list = reader.blob()
+        indptr = reader.array("<i8", points + 1)
+        targets = reader.array("<i4", linked)
+        distances = reader.array("<f8", linked)
+        orphan_origins = reader.array("<i8", orphans)
+        orphan_destinations = reader.array("<i8", orphans)
+        orphan_distances = reader.array("<f8", orphans)
+        airport_codes = reader.blob()
+        sid_indptr = reader.array("<i4", airports + 1)
+        sids = reader.array("<i4", sid_count)
+        star_indptr = reader.array("<i4", airports + 1)
+        stars = reader.array("<i4", star_count)
+    except (ValueError, struct.error):
+        return None
+    if reader.offset != len(buffer) or len(name_list) != names or len(airport_codes) != airports:
+        return None
+
+    return Snapshot(source_hash, numbers, latitudes, longitudes, name_ids, name_list,
+                    indptr, targets, distances, orphan_origins, orphan_destinations, orphan_distances,
+                    airport_codes, sid_indptr, sids, star_indptr, stars)
+
+
+def _snapshot_prefix(nav_file):
+    return f"airspace_{os.path.splitext(os.path.basename(nav_file))[0]}_"
+
+
+def snapshot_path(nav_file, source_hash, cache_dir=None):
+    """Ruta del fichero de instantánea para unos ficheros de entrada"""
+    if cache_dir is None:
+        cache_dir = os.path.dirname(os.path.abspath(nav_file))
+    return os.path.join(cache_dir, f"{_snapshot_prefix(nav_file)}{source_hash.hex()[:16]}.snap")
+
+
+def remove_stale_snapshots(nav_file, current_file):
+    """Borra las instantáneas de nav_file en el directorio de current_file salvo ésta"""
+    directory = os.path.dirname(current_file) or "."
+    pattern = re.compile(re.escape(_snapshot_prefix(nav_file)) + r"[0-9a-f]{16}\.snap")
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if pattern.fullmatch(name) and path != current_file:
+            try:
+                os.remove(path)
+            except OSError as e:
+                # Por ejemplo, si otro espacio aéreo la tiene abierta con mmap en Windows
+                logger.debug("No se pudo borrar la instantánea antigua %s: %s", path, e)
+
+
+def load_with_snapshot(airspace, nav_file, seg_file, aer_file, cache_dir=None):
+    """
+    Carga el espacio aéreo desde su instantánea si existe y coincide con el
+    contenido de los ficheros; si no, lo carga con load_from_files y guarda la
+    instantánea para la próxima vez.
+
+    Returns:
+        True si los datos se cargaron correctamente, False en caso contrario
+    """
+    start = time.perf_counter()
+    try:
+        source_hash = hash_source_files(nav_file, seg_file, aer_file)
+    except OSError as e:
+        logger.error("Error loading airspace data: %s", e)
+        return False
+    hash_time = time.perf_counter() - start
+
+    cache_file = snapshot_path(nav_file, source_hash, cache_dir)
+    snapshot = open_snapshot(cache_file, source_hash)
+    if snapshot is not None:
+        start = time.perf_counter()
+        set_name_from_file(airspace, nav_file)
+        populate_from_columns(airspace, snapshot.to_columns())
+        airspace.source_files = (nav_file, seg_file, aer_file)
+        airspace.source_version = airspace.version
+        airspace.load_timings = {"hash": hash_time, "snapshot": time.perf_counter() - start}
+        logger.info("Espacio aéreo leído de la instantánea %s en %.1f ms (hash %.1f ms)",
+                    cache_file, airspace.load_timings["snapshot"] * 1000, hash_time * 1000)
+        return True
+
+    if not load_from_files(airspace, nav_file, seg_file, aer_file):
+        return False
+    airspace.load_timings["hash"] = hash_time
+    try:
+        save_snapshot(airspace, cache_file, source_hash)
+    except OSError as e:
+        logger.warning("No se pudo guardar la instantánea del espacio aéreo: %s", e)
+        return True
+    remove_stale_snapshots(nav_file, cache_file)
+    return True
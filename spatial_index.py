@@ -0,0 +1,195 @@
+"""
+Índice espacial de los puntos de navegación.
+
+Los puntos se guardan como vectores unitarios (x, y, z) en un árbol k-d, de
+modo que la distancia euclídea entre vectores (la cuerda) crece igual que la
+distancia ortodrómica y las búsquedas son correctas en cualquier zona del globo.
+Cada nodo guarda además el rango de latitudes y longitudes de su subárbol para
+responder las consultas por rectángulo sin recorrer todos los puntos.
+"""
+
+import heapq
+import math
+
+EARTH_RADIUS = 6371.0
+
+
+def to_unit_vector(latitude, longitude):
+    """Convierte latitud y longitud en grados a un vector unitario (x, y, z)"""
+    lat = math.radians(latitude)
+    lon = math.radians(longitude)
+    cos_lat = math.cos(lat)
+    return (cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat))
+
+
+def chord_to_km(chord):
+    """Distancia ortodrómica en km correspondiente a una cuerda de la esfera unidad"""
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, chord / 2))
+
+
+def km_to_chord(distance):
+    """Cuerda de la esfera unidad correspondiente a una distancia ortodrómica en km"""
+    if distance >= math.pi * EARTH_RADIUS:
+        return 2.0
+    return 2 * math.sin(distance / (2 * EARTH_RADIUS))
+
+
+class SpatialIndex:
+    """
+    Árbol k-d implícito: los puntos se ordenan en self.order de forma que el
+    nodo del rango [lo, hi) es el elemento central y sus hijos son las dos mitades.
+    """
+    def __init__(self, points):
+        points = list(points)
+        self.numbers = [p.number for p in points]
+        self.latitudes = [p.latitude for p in points]
+        self.longitudes = [p.longitude for p in points]
+        self.coords = [to_unit_vector(p.latitude, p.longitude) for p in points]
+
+        count = len(points)
+        self.order = list(range(count))
+        self.axis = [0] * count
+        self.lat_min = [0.0] * count
+        self.lat_max = [0.0] * count
+        self.lon_min = [0.0] * count
+        self.lon_max = [0.0] * count
+        self._build(0, count)
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def _build(self, lo, hi):
+        # Se usa una pila para no depender del límite de recursión con muchos puntos
+        stack = [(lo, hi, False)]
+        while stack:
+            lo, hi, children_done = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if not children_done:
+                items = self.order[lo:hi]
+                spreads = []
+                for axis in range(3):
+                    values = [self.coords[i][axis] for i in items]
+                    spreads.append(max(values) - min(values))
+                axis = spreads.index(max(spreads))
+                items.sort(key=lambda i: self.coords[i][axis])
+                self.order[lo:hi] = items
+                self.axis[mid] = axis
+                stack.append((lo, hi, True))
+                stack.append((lo, mid, False))
+                stack.append((mid + 1, hi, False))
+                continue
+
+            # Rango de latitudes y longitudes del subárbol (nodo e hijos ya calculados)
+            i = self.order[mid]
+            lat_min = lat_max = self.latitudes[i]
+            lon_min = lon_max = self.longitudes[i]
+            for child in ((lo + mid) // 2 if lo < mid else None, (mid + 1 + hi) // 2 if mid + 1 < hi else None):
+                if child is None:
+                    continue
+                lat_min = min(lat_min, self.lat_min[child])
+                lat_max = max(lat_max, self.lat_max[child])
+                lon_min = min(lon_min, self.lon_min[child])
+                lon_max = max(lon_max, self.lon_max[child])
+            self.lat_min[mid], self.lat_max[mid] = lat_min, lat_max
+            self.lon_min[mid], self.lon_max[mid] = lon_min, lon_max
+
+    def nearest(self, latitude, longitude, k=1, max_distance=None, predicate=None):
+        """
+        Los k puntos más cercanos a una coordenada.
+
+        Args:
+            latitude, longitude: Coordenada de consulta en grados
+            k: Número máximo de puntos
+            max_distance: Si se indica, solo puntos a esa distancia (km) o menos
+            predicate: Función opcional número -> bool para filtrar los puntos
+
+        Returns:
+            Lista de tuplas (distancia en km, número de punto) de menor a mayor distancia
+        """
+        if k <= 0 or not self.numbers:
+            return []
+        query = to_unit_vector(latitude, longitude)
+        limit = km_to_chord(max_distance) ** 2 if max_distance is not None else float('inf')
+        best = []  # montículo de máximos (-cuerda², número)
+
+        stack = [(0, len(self.order))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            i = self.order[mid]
+            point = self.coords[i]
+            d2 = (point[0] - query[0]) ** 2 + (point[1] - query[1]) ** 2 + (point[2] - query[2]) ** 2
+            worst = -best[0][0] if len(best) == k else limit
+            if d2 <= worst and (predicate is None or predicate(self.numbers[i])):
+                if len(best) == k:
+                    heapq.heapreplace(best, (-d2, self.numbers[i]))
+                else:
+                    heapq.heappush(best, (-d2, self.numbers[i]))
+                worst = -best[0][0] if len(best) == k else limit
+
+            diff = query[self.axis[mid]] - point[self.axis[mid]]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            # El lado lejano se apila primero para visitar antes el cercano
+            if diff * diff <= worst:
+                stack.append(far)
+            stack.append(near)
+
+        return sorted((chord_to_km(math.sqrt(-d2)), number) for d2, number in best)
+
+    def within_radius(self, latitude, longitude, radius):
+        """Puntos a radius km o menos de la coordenada, como (distancia, número) ordenados"""
+        if not self.numbers:
+            return []
+        query = to_unit_vector(latitude, longitude)
+        limit = km_to_chord(radius) ** 2
+        results = []
+
+        stack = [(0, len(self.order))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            i = self.order[mid]
+            point = self.coords[i]
+            d2 = (point[0] - query[0]) ** 2 + (point[1] - query[1]) ** 2 + (point[2] - query[2]) ** 2
+            if d2 <= limit:
+                results.append((chord_to_km(math.sqrt(d2)), self.numbers[i]))
+            diff = query[self.axis[mid]] - point[self.axis[mid]]
+            if diff < 0 or diff * diff <= limit:
+                stack.append((lo, mid))
+            if diff >= 0 or diff * diff <= limit:
+                stack.append((mid + 1, hi))
+
+        results.sort()
+        return results
+
+    def within_bbox(self, min_lat, min_lon, max_lat, max_lon):
+        """
+        Números de los puntos dentro del rectángulo de latitudes y longitudes.
+        Si min_lon > max_lon el rectángulo cruza el antimeridiano.
+        """
+        if min_lon > max_lon:
+            return (self.within_bbox(min_lat, min_lon, max_lat, 180.0) +
+                    self.within_bbox(min_lat, -180.0, max_lat, max_lon))
+
+        results = []
+        stack = [(0, len(self.order))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if (self.lat_max[mid] < min_lat or self.lat_min[mid] > max_lat or
+                    self.lon_max[mid] < min_lon or self.lon_min[mid] > max_lon):
+                continue
+            i = self.order[mid]
+            if min_lat <= self.latitudes[i] <= max_lat and min_lon <= self.longitudes[i] <= max_lon:
+                results.append(self.numbers[i])
+            stack.append((lo, mid))
+            stack.append((mid + 1, hi))
+        return results
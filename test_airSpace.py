@@ -0,0 +1,165 @@
+from airSpace import (AirSpace, add_navpoint, add_navsegment, find_neighbors, find_shortest_path,
+                      get_outgoing_segments, get_incoming_segments, get_navsegment, find_segment_between,
+                      has_segments, get_navpoint_by_name, get_navpoints_by_name,
+                      search_names_by_prefix, search_names_fuzzy, get_airport_position)
+from navPoint import NavPoint
+from navSegment import NavSegment
+from name_search import bounded_edit_distance
+from path import astar_search
+from test_path import create_test_graph, load_dataset
+
+def test_adjacency_index():
+    """Prueba que el índice de adyacencia se mantiene al añadir segmentos"""
+    print("Probando el índice de adyacencia...")
+
+    airspace = AirSpace("Test")
+    for number in (1, 2, 3, 4):
+        add_navpoint(airspace, NavPoint(number, f"P{number}", 0, number))
+    add_navsegment(airspace, NavSegment(1, 2, 5.0))
+    add_navsegment(airspace, NavSegment(3, 1, 7.0))
+
+    assert [s.destination_number for s in get_outgoing_segments(airspace, 1)] == [2]
+    assert [s.origin_number for s in get_incoming_segments(airspace, 1)] == [3]
+    assert get_navsegment(airspace, 1, 2).distance == 5.0
+    assert get_navsegment(airspace, 2, 1) is None
+    assert find_segment_between(airspace, 2, 1).distance == 5.0
+    assert sorted(find_neighbors(airspace, 1)) == [2, 3]
+    assert has_segments(airspace, 3) and not has_segments(airspace, 4)
+
+    print("Pruebas del índice de adyacencia completadas con éxito.")
+
+def test_dijkstra_path_finding():
+    """Prueba Dijkstra sobre el grafo de ejemplo"""
+    print("Probando Dijkstra para encontrar la ruta más corta...")
+
+    airspace = create_test_graph()
+
+    # De A (1) a F (6): A -> K -> L -> E -> F
+    path, total_distance = find_shortest_path(airspace, 1, 6)
+    assert [airspace.navpoints[n].name for n in path] == ['A', 'K', 'L', 'E', 'F']
+    assert abs(total_distance - (5.39 + 5.1 + 5.39 + 4.12)) < 1e-9
+
+    print("Pruebas de Dijkstra completadas con éxito.")
+
+def test_name_index():
+    """Prueba el índice de nombres con nombres repetidos y puntos sustituidos"""
+    airspace = AirSpace("Test")
+    add_navpoint(airspace, NavPoint(1, "ALFA", 0, 0))
+    add_navpoint(airspace, NavPoint(2, "BRAVO", 0, 1))
+    add_navpoint(airspace, NavPoint(3, "ALFA", 1, 0))
+
+    assert get_navpoint_by_name(airspace, "ALFA").number == 1
+    assert [p.number for p in get_navpoints_by_name(airspace, "ALFA")] == [1, 3]
+    assert get_navpoint_by_name(airspace, "CHARLIE") is None
+
+    # Volver a añadir el punto 2 con otro nombre lo quita del nombre anterior
+    add_navpoint(airspace, NavPoint(2, "DELTA", 0, 1))
+    assert get_navpoints_by_name(airspace, "BRAVO") == []
+    assert get_navpoint_by_name(airspace, "DELTA").number == 2
+
+def test_name_search():
+    """Prueba la búsqueda de nombres por prefijo y con erratas"""
+    airspace = load_dataset("Cat")
+
+    assert search_names_by_prefix(airspace, "bcn") == ["BCN.A", "BCN.D", "BCN04", "BCN12", "BCN46"]
+    assert search_names_by_prefix(airspace, "LEB") == ["LEBL"]
+    assert search_names_by_prefix(airspace, "ZZZZ") == []
+    assert len(search_names_by_prefix(airspace, "G", limit=3)) == 3
+
+    assert search_names_fuzzy(airspace, "LEBX") == ["LEBL"]
+    assert search_names_fuzzy(airspace, "GALAX") == ["GALAT"]
+    assert search_names_fuzzy(airspace, "GLAT", max_distance=2)[0] == "GALAT"
+
+    # Las comprobaciones acotadas coinciden con la distancia de Levenshtein
+    assert bounded_edit_distance("GODOX", "GODOX", 2) == 0
+    assert bounded_edit_distance("GODOX", "GOODX", 2) == 2
+    assert bounded_edit_distance("GODOX", "AB", 2) == 3
+
+    # Un punto nuevo aparece en las búsquedas siguientes
+    add_navpoint(airspace, NavPoint(99999, "ZULU1", 41.0, 2.0))
+    assert search_names_by_prefix(airspace, "ZUL") == ["ZULU1"]
+
+def test_loader_resolves_procedures():
+    """Prueba que el cargador asocia los SIDs y STARs por nombre"""
+    airspace = load_dataset("Cat")
+    airport = airspace.navairports["LEBL"]
+    assert [airspace.navpoints[n].name for n in airport.sids] == ["BCN.D"]
+    assert [airspace.navpoints[n].name for n in airport.stars] == ["BCN.A"]
+
+def test_airport_positions():
+    """Prueba que la posición de cada aeropuerto es el centroide de sus SIDs y STARs"""
+    airspace = load_dataset("Spain")
+    for code, airport in airspace.navairports.items():
+        points = [airspace.navpoints[n] for n in airport.sids + airport.stars]
+        if not points:  # LEVX no tiene procedimientos
+            assert get_airport_position(airspace, code) is None and airport.latitude is None
+            continue
+        latitude, longitude = get_airport_position(airspace, code)
+        assert abs(latitude - sum(p.latitude for p in points) / len(points)) < 1e-12
+        assert abs(longitude - sum(p.longitude for p in points) / len(points)) < 1e-12
+        assert (airport.latitude, airport.longitude) == (latitude, longitude)
+    assert get_airport_position(airspace, "LEXX") is None
+
+    # Un punto con el nombre del aeropuerto tiene prioridad y se detecta al cambiar la versión
+    add_navpoint(airspace, NavPoint(999999, "LEBL", 41.3, 2.08))
+    assert get_airport_position(airspace, airspace.navairports["LEBL"]) == (41.3, 2.08)
+
+def test_bidirectional_dijkstra():
+    """Compara Dijkstra bidireccional con el unidireccional, dirigido y no dirigido"""
+    print("Probando Dijkstra bidireccional...")
+
+    airspace = load_dataset("Cat")
+    numbers = sorted(airspace.navpoints)
+    for origin in numbers[::7]:
+        for destination in numbers[::11]:
+            path, distance = find_shortest_path(airspace, origin, destination)
+            reference, expected = find_shortest_path(airspace, origin, destination, bidirectional=False)
+            assert bool(path) == bool(reference) and abs(distance - expected) < 1e-6
+            if path:
+                assert path[0] == origin and path[-1] == destination
+                total = sum(find_segment_between(airspace, a, b).distance for a, b in zip(path, path[1:]))
+                assert abs(total - distance) < 1e-6
+
+            path, distance = find_shortest_path(airspace, origin, destination, directed=True)
+            reference, expected = astar_search(airspace, [origin], [destination], directed=True,
+                                               use_heuristic=False)
+            if origin != destination:
+                assert bool(path) == bool(reference)
+                if path:
+                    assert abs(distance - expected) < 1e-6
+                    assert all(get_navsegment(airspace, a, b) for a, b in zip(path, path[1:]))
+
+    # Sentido único: 1 -> 2 -> 3
+    airspace = AirSpace("Test")
+    for number in (1, 2, 3):
+        add_navpoint(airspace, NavPoint(number, f"P{number}", 0, number))
+    add_navsegment(airspace, NavSegment(1, 2, 1.0))
+    add_navsegment(airspace, NavSegment(2, 3, 1.0))
+    assert find_shortest_path(airspace, 1, 3, directed=True) == ([1, 2, 3], 2.0)
+    assert find_shortest_path(airspace, 3, 1, directed=True) == ([], 0)
+    assert find_shortest_path(airspace, 3, 1) == ([3, 2, 1], 2.0)
+
+    print("Pruebas de Dijkstra bidireccional completadas con éxito.")
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    print("Iniciando pruebas del módulo airSpace.py...")
+
+    test_adjacency_index()
+    print()
+    test_dijkstra_path_finding()
+    print()
+    test_bidirectional_dijkstra()
+    print()
+    test_name_index()
+    print()
+    test_name_search()
+    print()
+    test_loader_resolves_procedures()
+    test_airport_positions()
+    print()
+
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
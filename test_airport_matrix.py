@@ -0,0 +1,77 @@
+import os
+import tempfile
+from airport_matrix import (build_airport_matrix, save_airport_matrix, load_airport_matrix,
+                            precompute_airport_matrix, hash_source_files)
+from airSpace import add_navsegment
+from navSegment import NavSegment
+from path import find_route_with_procedures
+from test_path import load_dataset
+
+def test_airport_matrix_matches_astar():
+    """Prueba que las consultas por tabla coinciden con la búsqueda A*"""
+    print("Probando la matriz de distancias entre aeropuertos...")
+
+    airspace = load_dataset("Cat")
+    names = sorted(airspace.navairports)
+    expected = {(o, d): find_route_with_procedures(airspace, o, d)[1] for o in names for d in names}
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        precompute_airport_matrix(airspace, cache_dir=cache_dir)
+        assert len(os.listdir(cache_dir)) == 1
+
+        for (origin, destination), distance in expected.items():
+            path, total_distance, sid, star = find_route_with_procedures(airspace, origin, destination)
+            assert abs(total_distance - distance) < 1e-6
+            if path:
+                assert sid.number in airspace.navairports[origin].sids
+                assert star.number in airspace.navairports[destination].stars
+
+    print("Pruebas de la matriz de aeropuertos completadas con éxito.")
+
+def test_airport_matrix_cache_roundtrip():
+    """Prueba que la caché en disco se lee igual y se descarta si cambian los ficheros"""
+    airspace = load_dataset("Cat")
+    matrix = build_airport_matrix(airspace)
+    matrix.source_hash = hash_source_files(*airspace.source_files)
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        filename = os.path.join(cache_dir, "matrix.bin")
+        save_airport_matrix(matrix, filename)
+
+        loaded = load_airport_matrix(filename, matrix.source_hash)
+        assert loaded.airport_names == matrix.airport_names
+        assert loaded.distances == matrix.distances
+        assert loaded.predecessors == matrix.predecessors
+
+        # Un hash distinto indica que los ficheros de entrada han cambiado
+        assert load_airport_matrix(filename, b"\0" * 32) is None
+
+def test_modified_airspace_ignores_disk_cache():
+    """Prueba que un espacio aéreo modificado después de cargarlo no usa la matriz guardada"""
+    airspace = load_dataset("Cat")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        precompute_airport_matrix(airspace, cache_dir=cache_dir)
+
+        # Un atajo directo entre un SID de LEBL y un STAR de LEGE
+        sid = airspace.navairports["LEBL"].sids[0]
+        star = airspace.navairports["LEGE"].stars[0]
+        add_navsegment(airspace, NavSegment(sid, star, 1.0))
+        precompute_airport_matrix(airspace, cache_dir=cache_dir)
+        assert find_route_with_procedures(airspace, "LEBL", "LEGE")[1] == 1.0
+        # La matriz del espacio aéreo modificado no sustituye a la de los ficheros
+        assert len(os.listdir(cache_dir)) == 1
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    print("Iniciando pruebas del módulo airport_matrix.py...")
+
+    test_airport_matrix_matches_astar()
+    print()
+    test_airport_matrix_cache_roundtrip()
+    test_modified_airspace_ignores_disk_cache()
+    print()
+
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import contextlib
+import csv
+import io
+import json
+import os
+import tempfile
+
+import batch_routes
+from batch_routes import read_pairs, solve_batch
+from path import find_shortest_path_astar
+from test_path import load_dataset
+
+CAT_FILES = ("Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt")
+
+def test_read_pairs():
+    """Prueba la lectura del fichero de pares"""
+    lines = ["# origen destino", "", "GODOX CASPE", "LEBL,LEGE", "  IZA\tSABAS  "]
+    assert list(read_pairs(lines)) == [("GODOX", "CASPE"), ("LEBL", "LEGE"), ("IZA", "SABAS")]
+    try:
+        list(read_pairs(["GODOX"]))
+        assert False, "Una línea con un solo punto debería ser un error"
+    except ValueError:
+        pass
+
+def test_solve_batch_in_processes():
+    """Compara los resultados del pool de procesos con las búsquedas directas"""
+    print("Probando el cálculo de rutas por lotes...")
+
+    airspace = load_dataset("Cat")
+    pairs = [("GODOX", "CASPE"), ("LEBL", "LEGE"), ("IZA", "SABAS"), ("GODOX", "NOEXISTE")] * 5
+    with tempfile.TemporaryDirectory() as directory:
+        for processes in (1, 2):
+            results = list(solve_batch(airspace, CAT_FILES, pairs, processes, chunksize=3, cache_dir=directory))
+            assert [r["index"] for r in results] == list(range(len(pairs)))
+            for result, (origin, destination) in zip(results, pairs):
+                path, distance = find_shortest_path_astar(airspace, origin, destination)
+                assert result["points"] == [p.name for p in path]
+                assert result["found"] == bool(path) and result["time_ms"] >= 0
+                if path:
+                    assert abs(result["distance_km"] - distance) < 1e-5
+
+        # Sin fork cada proceso carga el espacio aéreo desde la instantánea
+        batch_routes._init_worker(CAT_FILES, directory)
+        try:
+            assert len(batch_routes._worker_airspace.navpoints) == len(airspace.navpoints)
+            assert batch_routes._worker_solve((0, "GODOX", "CASPE"))["found"]
+        finally:
+            batch_routes._worker_airspace = None
+
+    print("Pruebas del cálculo de rutas por lotes completadas con éxito.")
+
+def test_command_line():
+    """Prueba la salida CSV y JSON por líneas del programa"""
+    with tempfile.TemporaryDirectory() as directory:
+        pairs_file = os.path.join(directory, "pares.txt")
+        with open(pairs_file, 'w') as f:
+            f.write("GODOX CASPE\nLEBL LEGE\n")
+
+        csv_file = os.path.join(directory, "rutas.csv")
+        batch_routes.main([pairs_file, "--dataset", "Cat", "-p", "1", "-o", csv_file, "--cache-dir", directory])
+        with open(csv_file, newline="") as f:
+            rows = list(csv.DictReader(f))
+        assert [row["origin"] for row in rows] == ["GODOX", "LEBL"]
+        assert rows[0]["points"].split()[0] == "GODOX" and rows[0]["found"] == "True"
+
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            batch_routes.main([pairs_file, "--dataset", "Cat", "-p", "1", "-f", "jsonl", "--cache-dir", directory])
+        results = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert [r["destination"] for r in results] == ["CASPE", "LEGE"]
+        assert results[1]["points"][0].endswith(".D") and results[1]["points"][-1].endswith(".A")
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_read_pairs()
+    test_solve_batch_in_processes()
+    print()
+    test_command_line()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import logging
+import os
+import tempfile
+
+from airSpace import AirSpace, load_from_files
+from bulk_loader import read_nav_columns, read_seg_columns, read_aer_entries
+from test_path import load_dataset
+
+def _write(directory, name, text):
+    path = os.path.join(directory, name)
+    with open(path, 'w') as f:
+        f.write(text)
+    return path
+
+def test_columns_match_files():
+    """Compara la lectura en columnas con el contenido de los ficheros"""
+    print("Probando la lectura en columnas...")
+
+    numbers, names, latitudes, longitudes = read_nav_columns("Cat_nav.txt")
+    with open("Cat_nav.txt") as f:
+        rows = [line.split() for line in f if line.strip()]
+    assert len(numbers) == len(rows)
+    assert numbers[0] == int(rows[0][0]) and names[-1] == rows[-1][1]
+    assert latitudes[10] == float(rows[10][2]) and longitudes[10] == float(rows[10][3])
+
+    origins, destinations, distances = read_seg_columns("Cat_seg.txt")
+    with open("Cat_seg.txt") as f:
+        rows = [line.split() for line in f if line.strip()]
+    assert len(origins) == len(rows)
+    assert (origins[5], destinations[5], distances[5]) == (int(rows[5][0]), int(rows[5][1]), float(rows[5][2]))
+
+    airspace = load_dataset("Cat")
+    airports = read_aer_entries("Cat_aer.txt")
+    assert [code for code, _, _ in airports] == list(airspace.navairports)
+    assert airspace.load_timings.keys() >= {"nav", "seg", "aer", "objects"}
+
+    print("Pruebas de la lectura en columnas completadas con éxito.")
+
+def test_headers_and_irregular_lines():
+    """Prueba las cabeceras, las líneas vacías y las columnas de más"""
+    with tempfile.TemporaryDirectory() as directory:
+        nav = _write(directory, "nav.txt", "number name lat lon\n1 ALFA 41.0 2.0\n\n2 BRAVO 41.5 2.5 extra\n3 X.D 41.1 2.1\n4 X.A 41.2 2.2\n")
+        seg = _write(directory, "seg.txt", "1 2 10.5\n2 3 7.25\n   \n3 4\n")
+        aer = _write(directory, "aer.txt", "# aeropuertos\nLEXX\nX.D\nX.A\n")
+
+        airspace = AirSpace()
+        assert load_from_files(airspace, nav, seg, aer)
+        assert sorted(airspace.navpoints) == [1, 2, 3, 4]
+        assert airspace.navpoints[2].name == "BRAVO" and airspace.navpoints[2].longitude == 2.5
+        assert [(s.origin_number, s.destination_number, s.distance) for s in airspace.navsegments] == [(1, 2, 10.5), (2, 3, 7.25)]
+        assert airspace.navairports["LEXX"].sids == [3] and airspace.navairports["LEXX"].stars == [4]
+
+def test_mismatched_lines_do_not_cancel_out():
+    """Prueba que una línea con una columna de más y otra con una de menos no se leen como columnas"""
+    with tempfile.TemporaryDirectory() as directory:
+        seg = _write(directory, "seg.txt", "1 2 3.0 4\n5 6\n")
+        origins, destinations, distances = read_seg_columns(seg)
+        assert list(origins) == [1] and list(destinations) == [2] and list(distances) == [3.0]
+
+def test_errors_are_logged():
+    """Prueba que un fichero erróneo se notifica por logging y no por la salida estándar"""
+    with tempfile.TemporaryDirectory() as directory:
+        nav = _write(directory, "nav.txt", "1 ALFA 41.0 2.0\n2 BRAVO norte 2.5\n")
+        seg = _write(directory, "seg.txt", "")
+        aer = _write(directory, "aer.txt", "")
+
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.getLogger("airSpace")
+        logger.addHandler(handler)
+        try:
+            assert not load_from_files(AirSpace(), nav, seg, aer)
+        finally:
+            logger.removeHandler(handler)
+        assert any(record.levelno == logging.ERROR for record in records)
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_columns_match_files()
+    print()
+    test_headers_and_irregular_lines()
+    test_mismatched_lines_do_not_cancel_out()
+    print()
+    test_errors_are_logged()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+import contextlib
+import io
+import logging
+import os
+import tempfile
+
+from airSpace import AirSpace, add_navpoint, add_navsegment, find_shortest_path, load_from_files
+from navPoint import NavPoint
+from navSegment import NavSegment
+from contraction_hierarchy import (find_shortest_path_ch, get_contraction_hierarchy, save_contraction_hierarchy,
+                                   load_contraction_hierarchy, precompute_contraction_hierarchy)
+from test_path import create_test_graph, load_dataset
+
+def test_matches_dijkstra():
+    """Compara las rutas de la jerarquía con Dijkstra en todos los pares de Cat"""
+    print("Probando la jerarquía de contracción...")
+
+    airspace = load_dataset("Cat")
+    numbers = sorted(airspace.navpoints)
+    for directed in (False, True):
+        for origin in numbers[::13]:
+            for destination in numbers[::7]:
+                expected_path, expected = find_shortest_path(airspace, origin, destination, directed)
+                path, distance = find_shortest_path_ch(airspace, origin, destination, directed)
+                assert bool(path) == bool(expected_path)
+                assert abs(distance - expected) < 1e-6
+                if path:
+                    # La ruta desempaquetada solo usa segmentos originales
+                    assert path[0] == origin and path[-1] == destination
+                    for a, b in zip(path, path[1:]):
+                        assert b in [s.destination_number for s in airspace.outgoing.get(a, [])] or (
+                            not directed and b in [s.origin_number for s in airspace.incoming.get(a, [])])
+
+    airspace = create_test_graph()
+    path, distance = find_shortest_path_ch(airspace, 1, 6)
+    assert [airspace.navpoints[n].name for n in path] == ['A', 'K', 'L', 'E', 'F']
+
+    print("Pruebas de la jerarquía de contracción completadas con éxito.")
+
+def test_hierarchy_invalidation_and_cache():
+    """Prueba que la jerarquía se recalcula al cambiar el grafo y que se guarda en disco"""
+    airspace = AirSpace("Test")
+    for number in (1, 2, 3):
+        add_navpoint(airspace, NavPoint(number, f"P{number}", 0, number))
+    add_navsegment(airspace, NavSegment(1, 2, 1.0))
+    hierarchy = get_contraction_hierarchy(airspace)
+    assert find_shortest_path_ch(airspace, 1, 3) == ([], 0)
+    add_navsegment(airspace, NavSegment(2, 3, 1.0))
+    assert get_contraction_hierarchy(airspace) is not hierarchy
+    assert find_shortest_path_ch(airspace, 1, 3) == ([1, 2, 3], 2.0)
+    assert find_shortest_path_ch(airspace, 3, 1, directed=True) == ([], 0)
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "ch.bin")
+        save_contraction_hierarchy(hierarchy, filename)
+        loaded = load_contraction_hierarchy(filename)
+        assert list(loaded.rank) == list(hierarchy.rank)
+        assert list(loaded.up_middles) == list(hierarchy.up_middles)
+        assert load_contraction_hierarchy(filename, expected_hash=b"x" * 32) is None
+
+        airspace = AirSpace()
+        load_from_files(airspace, "Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt")
+        built = precompute_contraction_hierarchy(airspace, cache_dir=directory)
+        assert any(name.startswith("contraction_hierarchy_") for name in os.listdir(directory))
+        reloaded = AirSpace()
+        load_from_files(reloaded, "Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt")
+        cached = precompute_contraction_hierarchy(reloaded, cache_dir=directory)
+        assert cached is not built and list(cached.up_targets) == list(built.up_targets)
+
+def test_cache_errors_are_logged():
+    """Prueba que un error al guardar la caché se notifica por logging y no por la salida estándar"""
+    airspace = load_dataset("Cat")
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger("contraction_hierarchy")
+    logger.addHandler(handler)
+    output = io.StringIO()
+    try:
+        with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(output):
+            hierarchy = precompute_contraction_hierarchy(airspace, cache_dir=os.path.join(directory, "no_existe"))
+    finally:
+        logger.removeHandler(handler)
+    assert hierarchy is get_contraction_hierarchy(airspace)
+    assert output.getvalue() == ""
+    assert any(record.levelno == logging.WARNING for record in records)
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_matches_dijkstra()
+    print()
+    test_hierarchy_invalidation_and_cache()
+    test_cache_errors_are_logged()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+from airSpace import (AirSpace, add_navpoint, add_navsegment, find_shortest_path,
+                      get_outgoing_segments, get_incoming_segments)
+from navPoint import NavPoint
+from navSegment import NavSegment
+from csr_graph import build_csr_graph, get_csr_graph
+from path import find_shortest_path_astar
+from test_path import load_dataset
+
+def test_csr_matches_adjacency():
+    """Compara los tramos del grafo CSR con los índices outgoing/incoming"""
+    print("Probando el grafo CSR...")
+
+    airspace = load_dataset("Cat")
+    directed = build_csr_graph(airspace, directed=True)
+    undirected = build_csr_graph(airspace)
+    assert list(directed.node_numbers) == list(airspace.navpoints)
+    assert undirected.edge_count == 2 * directed.edge_count
+
+    for number in airspace.navpoints:
+        node = directed.node_index[number]
+        outgoing = [(s.destination_number, s.distance) for s in get_outgoing_segments(airspace, number)]
+        incoming = [(s.origin_number, s.distance) for s in get_incoming_segments(airspace, number)]
+        assert [(directed.node_numbers[t], w) for t, w in directed.edges(node)] == outgoing
+        assert [(undirected.node_numbers[t], w) for t, w in undirected.edges(node)] == outgoing + incoming
+
+    print("Pruebas del grafo CSR completadas con éxito.")
+
+def test_csr_rebuilt_after_changes():
+    """Prueba que el grafo se descarta al modificar el espacio aéreo y que las rutas lo usan"""
+    airspace = AirSpace("Test")
+    for number in (1, 2, 3):
+        add_navpoint(airspace, NavPoint(number, f"P{number}", 0, number))
+    add_navsegment(airspace, NavSegment(1, 2, 5.0))
+    # Los segmentos con extremos desconocidos no entran en el grafo
+    add_navsegment(airspace, NavSegment(2, 99, 1.0))
+
+    graph = get_csr_graph(airspace)
+    assert graph.edge_count == 2
+    assert get_csr_graph(airspace) is graph
+    assert find_shortest_path(airspace, 1, 3) == ([], 0)
+
+    add_navsegment(airspace, NavSegment(3, 2, 4.0))
+    assert get_csr_graph(airspace) is not graph
+    assert find_shortest_path(airspace, 1, 3) == ([1, 2, 3], 9.0)
+    assert [p.number for p in find_shortest_path_astar(airspace, 1, 3)[0]] == [1, 2, 3]
+
+def test_empty_graph():
+    """Prueba el grafo de un espacio aéreo sin puntos"""
+    graph = build_csr_graph(AirSpace("Vacío"))
+    assert len(graph) == 0 and graph.edge_count == 0 and list(graph.offsets) == [0]
+
+def test_large_point_numbers():
+    """Prueba que los números de punto por encima de 2**31 no se truncan"""
+    airspace = AirSpace("Grandes")
+    add_navpoint(airspace, NavPoint(3_000_000_000, "A", 41.0, 2.0))
+    add_navpoint(airspace, NavPoint(2, "B", 41.1, 2.1))
+    add_navpoint(airspace, NavPoint(2**62, "C", 41.2, 2.2))
+    add_navsegment(airspace, NavSegment(3_000_000_000, 2, 15.0))
+    add_navsegment(airspace, NavSegment(2, 2**62, 10.0))
+    for directed in (False, True):
+        assert list(build_csr_graph(airspace, directed).node_numbers) == [3_000_000_000, 2, 2**62]
+    assert find_shortest_path(airspace, 3_000_000_000, 2**62) == ([3_000_000_000, 2, 2**62], 25.0)
+    path, distance = find_shortest_path_astar(airspace, "A", "C")
+    assert [p.name for p in path] == ["A", "B", "C"] and distance == 25.0
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_csr_matches_adjacency()
+    print()
+    test_csr_rebuilt_after_changes()
+    test_empty_graph()
+    test_large_point_numbers()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
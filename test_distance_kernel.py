@@ -0,0 +1,57 @@
+from airSpace import calculate_distance, add_navsegment
+from navSegment import NavSegment
+from distance_kernel import (get_coordinate_arrays, one_to_many, many_to_many, path_length,
+                             validate_segment_distances, heuristic_table)
+from test_path import load_dataset
+
+def test_kernel_matches_scalar_haversine():
+    """Compara las distancias vectorizadas con calculate_distance"""
+    print("Probando el cálculo vectorizado de distancias...")
+
+    airspace = load_dataset("Cat")
+    coords = get_coordinate_arrays(airspace)
+    points = [airspace.navpoints[n] for n in coords.numbers.tolist()]
+    origin = points[0]
+
+    distances = one_to_many(coords, origin.latitude, origin.longitude)
+    for point, distance in zip(points, distances):
+        assert abs(distance - calculate_distance(airspace, origin, point)) < 1e-6
+
+    matrix = many_to_many(coords, [0, 1, 2], [3, 4])
+    for i in range(3):
+        for j in range(2):
+            assert abs(matrix[i, j] - calculate_distance(airspace, points[i], points[3 + j])) < 1e-6
+
+    route = points[:4]
+    expected = sum(calculate_distance(airspace, a, b) for a, b in zip(route, route[1:]))
+    assert abs(path_length(coords, [p.number for p in route]) - expected) < 1e-6
+
+    targets = [points[5].number, points[9].number]
+    table = heuristic_table(airspace, targets, 0.5)
+    for point in points[:50]:
+        expected = 0.5 * min(calculate_distance(airspace, point, airspace.navpoints[t]) for t in targets)
+        assert abs(table[point.number] - expected) < 1e-6
+
+    print("Pruebas del cálculo vectorizado completadas con éxito.")
+
+def test_validate_segment_distances():
+    """Prueba que la validación detecta un segmento con una distancia incorrecta"""
+    airspace = load_dataset("Cat")
+    assert validate_segment_distances(airspace) == []
+
+    segment = airspace.navsegments[0]
+    wrong = NavSegment(segment.origin_number, segment.destination_number, segment.distance * 2 + 10)
+    add_navsegment(airspace, wrong)
+    invalid = validate_segment_distances(airspace)
+    assert len(invalid) == 1 and invalid[0][0] is wrong
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_kernel_matches_scalar_haversine()
+    print()
+    test_validate_segment_distances()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import io
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+import zipfile
+
+from airSpace import AirSpace, add_navpoint, add_navsegment, add_navairport, get_navpoint_by_name
+from navAirport import NavAirport
+from kml_generator import (KMLWriter, generate_airspace_kml, generate_path_kml, generate_neighbors_kml,
+                           write_airspace_kml, save_kml_to_file, save_airspace_kmz)
+from path import find_shortest_path_astar
+from routing_service import get_neighbors
+from test_path import load_dataset
+
+KML_NAMESPACE = "{http://www.opengis.net/kml/2.2}"
+
+def count_placemarks(document):
+    """Número de Placemark de un documento KML (que además debe ser XML válido)"""
+    return len(ET.fromstring(document.encode("utf-8")).findall(f".//{KML_NAMESPACE}Placemark"))
+
+class CountingWriter(io.StringIO):
+    """StringIO que cuenta las llamadas a write"""
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, text):
+        self.writes += 1
+        return super().write(text)
+
+def test_writer_buffers_output():
+    """Prueba que KMLWriter agrupa los fragmentos y cierra el documento"""
+    output = CountingWriter()
+    with KMLWriter(output, buffer_parts=10) as kml:
+        kml.style("point_style", "ff0000ff", icon="icono.png")
+        for i in range(25):
+            kml.point(f"P{i}", 2.0, 41.0 + i / 100, f"Punto {i}", "point_style")
+        kml.line("Línea", [(2.0, 41.0), (2.1, 41.1)], "Distancia", "point_style", z_index=3)
+        assert output.writes == 2  # 20 de los 28 fragmentos ya están en el fichero
+    assert kml.placemarks == 26
+    assert count_placemarks(output.getvalue()) == 26
+
+def test_airspace_kml():
+    """Prueba que la escritura incremental y el documento en memoria coinciden"""
+    print("Probando la generación de KML...")
+
+    airspace = load_dataset("Cat")
+    document = generate_airspace_kml(airspace)
+    segments = sum(1 for s in airspace.navsegments
+                   if s.origin_number in airspace.navpoints and s.destination_number in airspace.navpoints)
+    assert count_placemarks(document) >= len(airspace.navpoints) + segments
+
+    with tempfile.TemporaryDirectory() as directory:
+        streamed = os.path.join(directory, "incremental.kml")
+        with open(streamed, 'w', encoding='utf-8') as f:
+            write_airspace_kml(airspace, f)
+        saved = os.path.join(directory, "memoria.kml")
+        assert save_kml_to_file(document, saved)
+        with open(streamed, encoding='utf-8') as a, open(saved, encoding='utf-8') as b:
+            assert a.read() == b.read() == document
+
+    print("Pruebas de la generación de KML completadas con éxito.")
+
+def test_path_and_neighbors_kml():
+    """Prueba los documentos de una ruta y de los vecinos de un punto"""
+    airspace = load_dataset("Cat")
+    path, _ = find_shortest_path_astar(airspace, "GODOX", "CASPE")
+    assert count_placemarks(generate_path_kml("Ruta", path)) == len(path) + 1
+
+    point, neighbors = get_neighbors(airspace, get_navpoint_by_name(airspace, "GODOX"))
+    for source in (airspace, None):
+        document = generate_neighbors_kml(point, neighbors, source)
+        assert count_placemarks(document) == 1 + 2 * len(neighbors)
+
+def airport_placemarks(document):
+    """Coordenadas de los Placemark con el estilo de aeropuerto, por nombre"""
+    root = ET.fromstring(document.encode("utf-8"))
+    return {p.find(f"{KML_NAMESPACE}name").text: p.find(f".//{KML_NAMESPACE}coordinates").text
+            for p in root.iter(f"{KML_NAMESPACE}Placemark")
+            if p.find(f"{KML_NAMESPACE}styleUrl").text == "#airport_style"}
+
+def test_airport_coordinates_are_stable():
+    """Prueba que las coordenadas exportadas de los aeropuertos no dependen del orden de los puntos"""
+    airspace = load_dataset("Spain")
+    exported = airport_placemarks(generate_airspace_kml(airspace))
+    assert set(exported) == {code for code, a in airspace.navairports.items() if a.sids or a.stars}
+    lebl = [airspace.navpoints[n] for n in airspace.navairports["LEBL"].sids + airspace.navairports["LEBL"].stars]
+    assert exported["LEBL"] == f"{sum(p.longitude for p in lebl) / 2},{sum(p.latitude for p in lebl) / 2},0"
+
+    # El mismo espacio aéreo con los puntos añadidos en orden inverso
+    reversed_airspace = AirSpace()
+    for point in reversed(list(airspace.navpoints.values())):
+        add_navpoint(reversed_airspace, point)
+    for segment in airspace.navsegments:
+        add_navsegment(reversed_airspace, segment)
+    for airport in airspace.navairports.values():
+        add_navairport(reversed_airspace, NavAirport(airport.name, airport.sids, airport.stars))
+    assert airport_placemarks(generate_airspace_kml(reversed_airspace)) == exported
+    assert airport_placemarks(generate_airspace_kml(airspace)) == exported
+
+def test_airspace_kmz():
+    """Prueba el KMZ con carpetas y la fusión de los segmentos en un MultiGeometry"""
+    airspace = load_dataset("Cat")
+    full = ET.fromstring(generate_airspace_kml(airspace).encode("utf-8"))
+    segments = len(full.findall(f".//{KML_NAMESPACE}LineString"))
+    placemarks = len(full.findall(f".//{KML_NAMESPACE}Placemark"))
+
+    with tempfile.TemporaryDirectory() as directory:
+        for merge_segments in (False, True):
+            filename = os.path.join(directory, f"espacio_{merge_segments}.kmz")
+            written = save_airspace_kmz(airspace, filename, merge_segments)
+            with zipfile.ZipFile(filename) as archive:
+                assert archive.namelist() == ["doc.kml"]
+                root = ET.fromstring(archive.read("doc.kml"))
+            folders = root.findall(f"./{KML_NAMESPACE}Document/{KML_NAMESPACE}Folder")
+            assert [f.find(f"{KML_NAMESPACE}name").text for f in folders] == [
+                "Puntos de navegación", "Aeropuertos", "Segmentos"]
+            # Las mismas líneas, en Placemark separados o en un único MultiGeometry
+            assert len(root.findall(f".//{KML_NAMESPACE}LineString")) == segments
+            found = len(root.findall(f".//{KML_NAMESPACE}Placemark"))
+            assert written == found == (placemarks - segments + 1 if merge_segments else placemarks)
+            assert len(root.findall(f".//{KML_NAMESPACE}Style")) == 3
+            assert os.path.getsize(filename) < len(generate_airspace_kml(airspace)) / 4
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_writer_buffers_output()
+    test_airspace_kml()
+    print()
+    test_path_and_neighbors_kml()
+    test_airspace_kmz()
+    test_airport_coordinates_are_stable()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import tempfile
+import xml.etree.ElementTree as ET
+
+from airSpace import AirSpace
+from kml_tiles import build_tiles, export_tiled_kml, TILES_DIRECTORY, ROOT_FILE
+from test_path import load_dataset
+
+KML_NAMESPACE = "{http://www.opengis.net/kml/2.2}"
+
+def contains(bounds, longitude, latitude):
+    west, south, east, north = bounds
+    return west <= longitude <= east and south <= latitude <= north
+
+def test_build_tiles():
+    """Prueba que cada punto y cada segmento está en una única tesela que lo contiene"""
+    print("Probando el reparto en teselas...")
+
+    airspace = load_dataset("Spain")
+    grid, root = build_tiles(airspace, max_points=64, max_depth=6)
+    tiles = list(root.walk())
+    assert len(tiles) > 1 and all(t.level <= 6 for t in tiles)
+
+    points = [row for tile in tiles for row in tile.points]
+    assert sorted(points) == sorted((p.name, p.longitude, p.latitude) for p in airspace.navpoints.values())
+    assert sum(len(tile.segments) for tile in tiles) == len(airspace.navsegments)
+    for tile in tiles:
+        bounds = grid.bounds(tile)
+        assert all(contains(bounds, lon, lat) for _, lon, lat in tile.points)
+        assert not (tile.points and tile.children)
+        assert len(tile.points) <= 64 or tile.level == 6
+        for _, lon1, lat1, lon2, lat2 in tile.segments:
+            assert contains(bounds, lon1, lat1) and contains(bounds, lon2, lat2)
+            # Ninguna hija contiene los dos extremos del segmento
+            assert not any(contains(grid.bounds(child), lon1, lat1) and contains(grid.bounds(child), lon2, lat2)
+                           for child in tile.children.values())
+
+    print("Pruebas del reparto en teselas completadas con éxito.")
+
+def test_export_tiled_kml():
+    """Prueba los ficheros escritos en uno y en dos procesos"""
+    airspace = load_dataset("Cat")
+    with tempfile.TemporaryDirectory() as directory:
+        contents = []
+        for processes in (1, 2):
+            output = os.path.join(directory, str(processes))
+            root = export_tiled_kml(airspace, output, max_points=32, processes=processes)
+            tiles_directory = os.path.join(output, TILES_DIRECTORY)
+            names = sorted(os.listdir(tiles_directory))
+            assert names == sorted(f"{tile.key}.kml" for tile in root.walk())
+
+            # Los enlaces apuntan a ficheros existentes y cada tesela tiene su Region
+            document = ET.parse(os.path.join(output, ROOT_FILE)).getroot()
+            hrefs = [e.text for e in document.iter(f"{KML_NAMESPACE}href") if e.text.endswith(".kml")]
+            assert hrefs == [f"{TILES_DIRECTORY}/0_0_0.kml"]
+            for name in names:
+                tile = ET.parse(os.path.join(tiles_directory, name)).getroot()
+                assert tile.find(f"{KML_NAMESPACE}Document/{KML_NAMESPACE}Region") is not None
+                for link in tile.iter(f"{KML_NAMESPACE}NetworkLink"):
+                    href = link.find(f"{KML_NAMESPACE}Link/{KML_NAMESPACE}href").text
+                    assert os.path.exists(os.path.join(tiles_directory, href))
+            contents.append({name: open(os.path.join(tiles_directory, name), encoding='utf-8').read()
+                             for name in names})
+        assert contents[0] == contents[1]
+
+def test_empty_airspace():
+    """Prueba que un espacio aéreo sin puntos se exporta como una única tesela vacía"""
+    with tempfile.TemporaryDirectory() as directory:
+        root = export_tiled_kml(AirSpace(), directory)
+        assert not root.points and not root.segments and not root.children
+        assert os.listdir(os.path.join(directory, TILES_DIRECTORY)) == [f"{root.key}.kml"]
+        tile = ET.parse(os.path.join(directory, TILES_DIRECTORY, f"{root.key}.kml")).getroot()
+        assert not list(tile.iter(f"{KML_NAMESPACE}Placemark"))
+        ET.parse(os.path.join(directory, ROOT_FILE))
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_build_tiles()
+    test_export_tiled_kml()
+    test_empty_airspace()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
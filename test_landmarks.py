@@ -0,0 +1,73 @@
+from airSpace import add_navsegment, find_shortest_path
+from navSegment import NavSegment
+from csr_graph import get_csr_graph
+from landmarks import precompute_landmarks, get_landmarks, landmark_bound, target_landmark_rows
+from path import astar_search, find_k_shortest_paths
+from test_path import load_dataset
+
+def test_landmark_bounds_are_admissible():
+    """Comprueba que la cota de los landmarks nunca supera la distancia real"""
+    print("Probando la heurística de landmarks...")
+
+    airspace = load_dataset("Cat")
+    numbers = sorted(airspace.navpoints)
+    for directed in (False, True):
+        table = precompute_landmarks(airspace, 4, directed)
+        assert len(table) == 4 and len(set(table.landmarks)) == 4
+        node_index = get_csr_graph(airspace, directed).node_index
+        for target in numbers[::9]:
+            rows = target_landmark_rows(table, [node_index[target]])
+            for origin in numbers[::4]:
+                if origin == target:
+                    continue
+                path, distance = find_shortest_path(airspace, origin, target, directed)
+                bound = landmark_bound(table, node_index[origin], rows)
+                if path:
+                    assert bound <= distance + 1e-9
+                else:
+                    assert bound >= 0.0
+
+    print("Pruebas de la heurística de landmarks completadas con éxito.")
+
+def test_astar_with_landmarks():
+    """Prueba que A* con landmarks da las mismas rutas expandiendo menos nodos"""
+    airspace = load_dataset("Cat")
+    numbers = sorted(airspace.navpoints)
+    pairs = [(o, d) for o in numbers[::17] for d in numbers[::13] if o != d]
+    uniform = []
+    for origin, destination in pairs:
+        stats = {}
+        uniform.append((astar_search(airspace, [origin], [destination], use_heuristic=False, stats=stats),
+                        stats["settled"]))
+
+    precompute_landmarks(airspace)
+    settled_uniform = settled_landmarks = 0
+    for (origin, destination), ((_, expected), settled) in zip(pairs, uniform):
+        stats = {}
+        _, distance = astar_search(airspace, [origin], [destination], stats=stats)
+        assert distance == expected or abs(distance - expected) < 1e-6
+        settled_uniform += settled
+        settled_landmarks += stats["settled"]
+    assert settled_landmarks < settled_uniform / 2
+
+    expected = find_k_shortest_paths(airspace, [numbers[0]], [numbers[-1]], k=3)
+    airspace.derived.pop("landmarks")
+    assert [round(c, 6) for c, _ in expected] == [
+        round(c, 6) for c, _ in find_k_shortest_paths(airspace, [numbers[0]], [numbers[-1]], k=3)]
+
+    # Al cambiar el grafo las distancias dejan de valer y A* vuelve a la heurística ortodrómica
+    precompute_landmarks(airspace)
+    add_navsegment(airspace, NavSegment(numbers[0], numbers[-1], 1.0))
+    assert get_landmarks(airspace) is None
+    assert astar_search(airspace, [numbers[0]], [numbers[-1]])[1] == 1.0
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_landmark_bounds_are_admissible()
+    print()
+    test_astar_with_landmarks()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
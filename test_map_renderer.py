@@ -0,0 +1,97 @@
+import subprocess
+import sys
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from matplotlib.quiver import Quiver
+
+from airSpace import get_navpoint_by_name
+from map_renderer import draw_airspace_map, PATH_COLOR, HIGHLIGHT_COLOR
+from path import find_shortest_path_astar
+from routing_service import get_neighbors
+from test_path import load_dataset
+
+def new_axes():
+    figure = Figure(figsize=(6, 5), dpi=50)
+    FigureCanvasAgg(figure)
+    return figure, figure.add_subplot(111)
+
+def test_import_without_tkinter():
+    """Prueba que el módulo se puede usar sin interfaz gráfica"""
+    code = "import sys, map_renderer; print('tkinter' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+
+def test_full_map():
+    """Prueba que cada capa es una sola colección y que la visibilidad no crea artistas nuevos"""
+    print("Probando el dibujo del mapa...")
+
+    airspace = load_dataset("Cat")
+    figure, ax = new_axes()
+    airspace_map = draw_airspace_map(ax, airspace, show_distances=False)
+    figure.canvas.draw()
+
+    segments = sum(1 for s in airspace.navsegments
+                   if s.origin_number in airspace.navpoints and s.destination_number in airspace.navpoints)
+    lines = [c for c in ax.collections if isinstance(c, LineCollection)]
+    assert len(lines) == 1 and len(lines[0].get_segments()) == segments
+    assert len([c for c in ax.collections if isinstance(c, Quiver)]) == 1
+    assert len(airspace_map.layers["nodes"][0].get_offsets()) == len(airspace.navpoints)
+    assert "distances" not in airspace_map.layers
+
+    # Las distancias se crean al mostrarlas y solo se ven con los segmentos
+    artists = len(ax.get_children())
+    airspace_map.update(show_distances=True)
+    assert len(airspace_map.layers["distances"]) == segments
+    airspace_map.update(show_segments=False, show_distances=True)
+    assert not any(a.get_visible() for a in airspace_map.layers["distances"] + airspace_map.layers["segments"])
+    airspace_map.update(show_nodes=False)
+    assert not any(a.get_visible() for a in airspace_map.layers["nodes"])
+    assert len(ax.get_children()) == artists + segments
+    figure.canvas.draw()
+
+    print("Pruebas del dibujo del mapa completadas con éxito.")
+
+def test_route_and_neighbor_views():
+    """Prueba los segmentos, colores y tamaños de las vistas de ruta y de vecinos"""
+    airspace = load_dataset("Cat")
+    route, _ = find_shortest_path_astar(airspace, "GODOX", "CASPE")
+    figure, ax = new_axes()
+    airspace_map = draw_airspace_map(ax, airspace, route=route)
+    lines = airspace_map.layers["segments"][0]
+    # Se dibujan los segmentos de la ruta en los dos sentidos, si existen
+    legs = {frozenset((a.number, b.number)) for a, b in zip(route, route[1:])}
+    expected = sum(1 for s in airspace.navsegments if frozenset((s.origin_number, s.destination_number)) in legs)
+    assert len(lines.get_segments()) == expected >= len(route) - 1
+    assert np.allclose(lines.get_colors()[0], to_rgba(PATH_COLOR))
+    points = airspace_map.layers["nodes"][0]
+    sizes = points.get_sizes()
+    # Los puntos de la ruta se dibujan los últimos, encima del resto
+    assert list(sizes[-len(route):]) == [10.0] * len(route) and set(sizes[:-len(route)]) == {4.0}
+    figure.canvas.draw()
+
+    point, neighbors = get_neighbors(airspace, get_navpoint_by_name(airspace, "GODOX"))
+    figure, ax = new_axes()
+    airspace_map = draw_airspace_map(ax, airspace, point, neighbors)
+    assert airspace_map.is_neighbor_view
+    assert len(airspace_map.layers["segments"][0].get_segments()) == len(neighbors)
+    points = airspace_map.layers["nodes"][0]
+    assert points.get_sizes()[-1] == 30.0
+    assert np.allclose(points.get_facecolors()[-1], to_rgba(HIGHLIGHT_COLOR))
+    assert list(points.get_offsets()[-1]) == [point.longitude, point.latitude]
+    figure.canvas.draw()
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_import_without_tkinter()
+    test_full_map()
+    print()
+    test_route_and_neighbor_views()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
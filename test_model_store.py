@@ -0,0 +1,64 @@
+from airSpace import get_navpoint_by_name
+from bulk_loader import read_network_columns
+from navAirport import NavAirport, add_sid, add_star, has_sid, has_star
+from navPoint import NavPoint, navpoint_to_str, get_coords
+from navSegment import navsegment_to_str
+from model_store import NavPointView, stores_from_airspace, stores_from_columns
+from test_path import load_dataset
+
+def test_slot_models():
+    """Prueba los modelos sin __dict__ y la pertenencia de SIDs y STARs"""
+    point = NavPoint(1, "ALFA", 41.0, 2.0)
+    assert not hasattr(point, "__dict__")
+    try:
+        point.altitude = 1000
+        assert False, "NavPoint no debería admitir atributos nuevos"
+    except AttributeError:
+        pass
+
+    airport = NavAirport("LEBL", sids=[3, 1, 3])
+    add_sid(airport, 2)
+    add_sid(airport, 1)
+    add_star(airport, 7)
+    assert airport.sids == [3, 1, 2] and airport.stars == [7]
+    assert has_sid(airport, 2) and not has_sid(airport, 7)
+    assert has_star(airport, 7) and not has_star(airport, 3)
+
+def test_stores_match_airspace():
+    """Compara las vistas de los almacenes con los objetos del espacio aéreo"""
+    print("Probando el almacenamiento por columnas...")
+
+    airspace = load_dataset("Cat")
+    points, segments = stores_from_airspace(airspace)
+    assert len(points) == len(airspace.navpoints) and len(segments) == len(airspace.navsegments)
+
+    for view, point in zip(points, airspace.navpoints.values()):
+        assert navpoint_to_str(view) == navpoint_to_str(point)
+        assert get_coords(view) == get_coords(point)
+    for view, segment in zip(segments, airspace.navsegments):
+        assert navsegment_to_str(view) == navsegment_to_str(segment)
+
+    point = get_navpoint_by_name(airspace, "GODOX")
+    view = points.get(point.number)
+    assert view.name == "GODOX" and view == points.get(point.number)
+    assert len({view, points.get(point.number)}) == 1
+    assert points.get(-1) is None
+    assert isinstance(points[-1], NavPointView) and points[-1].number == points.numbers[-1]
+
+    # Desde las columnas del cargador se obtienen los mismos datos
+    column_points, column_segments = stores_from_columns(
+        read_network_columns("Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt"))
+    assert column_points.numbers == points.numbers and column_points.names == points.names
+    assert column_segments.distances == segments.distances
+
+    print("Pruebas del almacenamiento por columnas completadas con éxito.")
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_slot_models()
+    test_stores_match_airspace()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
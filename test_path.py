@@ -1,10 +1,15 @@
 import sys
 import os
 import math
-from airSpace import AirSpace, add_navpoint, add_navsegment
+import io
+import contextlib
+from airSpace import AirSpace, add_navpoint, add_navsegment, load_from_files, find_shortest_path
 from navPoint import NavPoint
 from navSegment import NavSegment
-from path import Path, find_shortest_path_astar, euclidean_distance
+from navAirport import NavAirport, add_sid, add_star
+from airSpace import add_navairport
+from path import (Path, find_shortest_path_astar, euclidean_distance, get_heuristic_scale,
+                  find_route_with_procedures, find_k_shortest_paths, find_multiple_paths_astar)
 
 def create_test_graph():
     """
@@ -87,6 +92,12 @@ def test_path_class():
     # Verificar get_last_node
     assert path.get_last_node().name == 'L'
     
+    # Verificar cost_to_node con las distancias de los segmentos
+    assert path.cost_to_node(airspace.navpoints[1], airspace) == 0
+    expected = (airspace.segment_index[(1, 11)].distance + airspace.segment_index[(11, 12)].distance)
+    assert abs(path.cost_to_node(airspace.navpoints[12], airspace) - expected) < 1e-9
+    assert path.cost_to_node(airspace.navpoints[2], airspace) == -1
+    
     print("Pruebas de la clase Path completadas con éxito.")
 
 def test_euclidean_distance():
@@ -146,6 +157,126 @@ def test_astar_path_finding():
     
     print("Pruebas de búsqueda de ruta completadas.")
 
+def load_dataset(prefix):
+    """Carga uno de los conjuntos de datos incluidos en el repositorio"""
+    airspace = AirSpace()
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_from_files(airspace, f"{prefix}_nav.txt", f"{prefix}_seg.txt", f"{prefix}_aer.txt")
+    return airspace
+
+def test_astar_matches_dijkstra():
+    """Prueba que A* devuelve las mismas distancias óptimas que Dijkstra"""
+    print("Comparando A* con Dijkstra en los conjuntos de datos incluidos...")
+    
+    for prefix in ("Cat", "Spain"):
+        airspace = load_dataset(prefix)
+        assert 0 < get_heuristic_scale(airspace) <= 1.0
+        
+        # Muestra de puntos repartida por todo el conjunto de datos
+        numbers = sorted(airspace.navpoints)
+        sample = numbers[::len(numbers) // 15]
+        for origin in sample:
+            for destination in sample:
+                if origin == destination:
+                    continue
+                dijkstra_path, dijkstra_distance = find_shortest_path(airspace, origin, destination)
+                astar_path, astar_distance = find_shortest_path_astar(airspace, origin, destination)
+                assert bool(dijkstra_path) == bool(astar_path), f"{prefix}: {origin} -> {destination}"
+                assert abs(dijkstra_distance - astar_distance) < 1e-6, f"{prefix}: {origin} -> {destination}"
+    
+    print("A* y Dijkstra coinciden.")
+
+def test_astar_directed():
+    """Prueba que en modo dirigido los segmentos solo se recorren en su sentido"""
+    airspace = create_test_graph()
+    
+    # El segmento E -> L impide llegar de A a F respetando los sentidos
+    path, total_distance = find_shortest_path_astar(airspace, 1, 6, directed=True)
+    assert path == [] and total_distance == 0
+    
+    # De A a J sí existe ruta dirigida: A -> B -> G -> J
+    path, total_distance = find_shortest_path_astar(airspace, 1, 10, directed=True)
+    assert [node.name for node in path] == ['A', 'B', 'G', 'J']
+    assert abs(total_distance - (7.62 + 6.4 + 9.22)) < 1e-9
+
+def test_airport_route_single_search():
+    """Prueba la búsqueda multiorigen/multidestino entre aeropuertos"""
+    airspace = create_test_graph()
+    
+    # Aeropuerto de salida con SIDs en A y C, de llegada con STARs en F e I
+    origin_airport = NavAirport("LEAA")
+    add_sid(origin_airport, 1)
+    add_sid(origin_airport, 3)
+    dest_airport = NavAirport("LEBB")
+    add_star(dest_airport, 6)
+    add_star(dest_airport, 9)
+    add_navairport(airspace, origin_airport)
+    add_navairport(airspace, dest_airport)
+    
+    path, total_distance, sid, star = find_route_with_procedures(airspace, "LEAA", "LEBB")
+    
+    # La mejor combinación de todas las SID x STAR, calculada por separado
+    best = min(find_shortest_path_astar(airspace, o, d)[1] for o in (1, 3) for d in (6, 9))
+    assert abs(total_distance - best) < 1e-9
+    assert path[0] is sid and path[-1] is star
+    assert sid.number in (1, 3) and star.number in (6, 9)
+    
+    # Con un punto normal como origen no se informa de SID
+    path, _, sid, star = find_route_with_procedures(airspace, 1, "LEBB")
+    assert sid is None and path[-1] is star
+
+def test_point_names_with_airport_prefix():
+    """Prueba que los puntos cuyo nombre empieza por LE o LF se buscan por nombre"""
+    airspace = load_dataset("Spain")
+    for name in ("LESBA", "LEPES"):
+        assert name not in airspace.navairports
+        by_name = find_shortest_path_astar(airspace, name, "ABETO")
+        point = [p for p in airspace.navpoints.values() if p.name == name][0]
+        by_number = find_shortest_path_astar(airspace, point.number, "ABETO")
+        assert by_name[0] and by_name[0][0] is point
+        assert abs(by_name[1] - by_number[1]) < 1e-9
+        _, _, sid, _ = find_route_with_procedures(airspace, name, "ABETO")
+        assert sid is None
+    assert find_shortest_path_astar(airspace, "LEXX", "ABETO") == ([], 0)
+
+def test_k_shortest_paths():
+    """Prueba el algoritmo de Yen frente a la enumeración de todas las rutas simples"""
+    print("Probando las k rutas más cortas...")
+    
+    airspace = create_test_graph()
+    
+    # Enumerar todas las rutas simples de A a F con la distancia mínima de cada tramo
+    weights = {}
+    for segment in airspace.navsegments:
+        for key in ((segment.origin_number, segment.destination_number),
+                    (segment.destination_number, segment.origin_number)):
+            weights[key] = min(weights.get(key, float('inf')), segment.distance)
+    all_paths = []
+    def enumerate_paths(path, cost):
+        if path[-1] == 6:
+            all_paths.append(cost)
+            return
+        for (a, b), w in weights.items():
+            if a == path[-1] and b not in path:
+                enumerate_paths(path + [b], cost + w)
+    enumerate_paths([1], 0.0)
+    all_paths.sort()
+    
+    paths = find_k_shortest_paths(airspace, [1], [6], k=6)
+    assert len(paths) == 6
+    for (distance, path_numbers), expected in zip(paths, all_paths):
+        assert abs(distance - expected) < 1e-9
+        assert path_numbers[0] == 1 and path_numbers[-1] == 6
+        assert len(set(path_numbers)) == len(path_numbers), "La ruta tiene ciclos"
+    
+    # Con restricción de diversidad las rutas comparten menos de la mitad de sus puntos
+    diverse = find_multiple_paths_astar(airspace, 1, 6, max_paths=2, min_difference=0.5)
+    assert diverse[0][0] == paths[0][0]
+    common = set(diverse[0][1][1:-1]) & set(diverse[1][1][1:-1])
+    assert len(common) <= len(diverse[1][1][1:-1]) / 2
+    
+    print("Pruebas de las k rutas más cortas completadas con éxito.")
+
 def main():
     """Función principal que ejecuta todas las pruebas"""
     print("Iniciando pruebas del módulo path.py...")
@@ -157,6 +288,15 @@ def main():
     print()
     test_astar_path_finding()
     print()
+    test_astar_matches_dijkstra()
+    print()
+    test_astar_directed()
+    print()
+    test_airport_route_single_search()
+    test_point_names_with_airport_prefix()
+    print()
+    test_k_shortest_paths()
+    print()
     
     print("Todas las pruebas completadas con éxito.")
 
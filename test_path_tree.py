@@ -0,0 +1,69 @@
+from airSpace import add_navsegment, find_shortest_path, get_navpoint_by_name
+from navSegment import NavSegment
+from path import find_shortest_path_astar
+from path_tree import (build_shortest_path_tree, get_shortest_path_tree, shortest_paths_from,
+                       find_reachable_within)
+from test_path import load_dataset
+
+def test_tree_matches_dijkstra():
+    """Compara las rutas reconstruidas desde el árbol con Dijkstra punto a punto"""
+    print("Probando el árbol de caminos mínimos...")
+
+    airspace = load_dataset("Cat")
+    numbers = sorted(airspace.navpoints)
+    for directed in (False, True):
+        for origin in numbers[::40]:
+            tree = build_shortest_path_tree(airspace, [origin], directed)
+            for destination in numbers[::3]:
+                if destination == origin:
+                    continue
+                expected_path, expected = find_shortest_path(airspace, origin, destination, directed)
+                path = tree.path_to(destination)
+                assert bool(path) == bool(expected_path)
+                if path:
+                    assert path[0] == origin and path[-1] == destination
+                    assert abs(tree.distance_to(destination) - expected) < 1e-6
+
+    print("Pruebas del árbol de caminos mínimos completadas con éxito.")
+
+def test_tree_reuse_and_airports():
+    """Prueba la reutilización del árbol, los destinos aeropuerto y la invalidación"""
+    airspace = load_dataset("Cat")
+    tree = get_shortest_path_tree(airspace, "LEBL")
+    assert get_shortest_path_tree(airspace, "LEBL") is tree
+
+    routes = shortest_paths_from(airspace, "LEBL", ["LEGE", "CASPE", "NOEXISTE"])
+    for (path, distance), destination in zip(routes[:2], ("LEGE", "CASPE")):
+        expected_path, expected = find_shortest_path_astar(airspace, "LEBL", destination)
+        assert abs(distance - expected) < 1e-6
+        assert path[0] == expected_path[0].number and path[-1] == expected_path[-1].number
+    assert routes[2] == ([], float('inf'))
+
+    godox = get_navpoint_by_name(airspace, "GODOX")
+    caspe = get_navpoint_by_name(airspace, "CASPE")
+    add_navsegment(airspace, NavSegment(godox.number, caspe.number, 0.5))
+    tree = get_shortest_path_tree(airspace, "GODOX")
+    assert tree.path_to(caspe.number) == [godox.number, caspe.number]
+
+def test_isochrone():
+    """Prueba que la isocrona contiene exactamente los puntos a la distancia indicada o menos"""
+    airspace = load_dataset("Cat")
+    full = get_shortest_path_tree(airspace, "GODOX")
+    reachable = find_reachable_within(airspace, "GODOX", 150.0)
+    assert reachable[0][1] == 0.0 and reachable[0][0].name == "GODOX"
+    assert [d for _, d in reachable] == sorted(d for _, d in reachable)
+    expected = {airspace.navpoints[n].number for n, d in full.reachable_within(150.0)}
+    assert {p.number for p, _ in reachable} == expected
+    assert all(d <= 150.0 for _, d in reachable) and len(reachable) < len(airspace.navpoints)
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_tree_matches_dijkstra()
+    print()
+    test_tree_reuse_and_airports()
+    test_isochrone()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import contextlib
+import io
+
+from airSpace import add_navsegment, get_navpoint_by_name
+from navSegment import NavSegment
+from path import find_shortest_path_astar, find_multiple_paths_astar
+from route_cache import (RouteCache, get_route_cache, cached_shortest_path_astar, cached_multiple_paths_astar,
+                         cached_route_with_procedures)
+from test_path import load_dataset
+
+def test_cache_hits_and_invalidation():
+    """Prueba los aciertos, los fallos y la invalidación al modificar el espacio aéreo"""
+    print("Probando la caché de rutas...")
+
+    airspace = load_dataset("Cat")
+    origin = get_navpoint_by_name(airspace, "GODOX")
+    destination = get_navpoint_by_name(airspace, "CASPE")
+    expected = find_shortest_path_astar(airspace, "GODOX", "CASPE")
+
+    path, distance = cached_shortest_path_astar(airspace, "GODOX", "CASPE")
+    assert path == expected[0] and distance == expected[1]
+    path.clear()  # Modificar el resultado no altera la caché
+    assert cached_shortest_path_astar(airspace, "GODOX", "CASPE") == expected
+    cache = get_route_cache(airspace)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Un NavPoint y su número son la misma consulta; otra función de coste no lo es
+    cached_shortest_path_astar(airspace, origin, destination)
+    cached_shortest_path_astar(airspace, origin.number, destination.number)
+    cached_shortest_path_astar(airspace, origin, destination, custom_cost_func=lambda a, b, d: d * 2)
+    assert (cache.hits, cache.misses) == (2, 3)
+
+    routes = cached_multiple_paths_astar(airspace, "GODOX", "LEBL", min_difference=0.3)
+    assert routes and routes == find_multiple_paths_astar(airspace, "GODOX", "LEBL", min_difference=0.3)
+    assert cached_multiple_paths_astar(airspace, "GODOX", "LEBL", min_difference=0.3) == routes
+
+    # Un segmento nuevo invalida todas las rutas anteriores
+    add_navsegment(airspace, NavSegment(origin.number, destination.number, 1.0))
+    path, distance, sid, star = cached_route_with_procedures(airspace, origin, destination)
+    assert [p.number for p in path] == [origin.number, destination.number] and distance == 1.0
+    assert cache.invalidations == 1 and len(cache) == 1
+
+    print("Pruebas de la caché de rutas completadas con éxito.")
+
+def test_lru_eviction():
+    """Prueba que se expulsa la entrada usada hace más tiempo"""
+    airspace = load_dataset("Cat")
+    cache = RouteCache(max_entries=2)
+    for key in ("a", "b"):
+        cache.lookup(airspace, (key,), lambda: key)
+    cache.lookup(airspace, ("a",), lambda: None)  # "a" pasa a ser la más reciente
+    cache.lookup(airspace, ("c",), lambda: "c")
+    assert cache.lookup(airspace, ("a",), lambda: "nuevo") == "a"
+    assert cache.lookup(airspace, ("b",), lambda: "nuevo") == "nuevo"
+    assert cache.stats() == {"entries": 2, "max_entries": 2, "hits": 2, "misses": 4,
+                             "evictions": 2, "invalidations": 0}
+
+def test_debug_output_on_hits():
+    """Prueba que con debug un acierto de la caché también escribe la ruta"""
+    airspace = load_dataset("Cat")
+    outputs = []
+    for _ in range(2):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            path, _, _, star = cached_route_with_procedures(airspace, "GODOX", "LEGE", debug=True)
+            cached_multiple_paths_astar(airspace, "GODOX", "CASPE", debug=True)
+        outputs.append(output.getvalue())
+    assert get_route_cache(airspace).hits == 2
+    assert "caché" not in outputs[0]
+    assert " -> ".join(p.name for p in path) in outputs[1]
+    assert f"STAR={star.name}" in outputs[1] and "Rutas alternativas obtenidas de la caché" in outputs[1]
+
+    # Sin debug un acierto no escribe nada
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        cached_route_with_procedures(airspace, "GODOX", "LEGE")
+    assert output.getvalue() == ""
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_cache_hits_and_invalidation()
+    print()
+    test_lru_eviction()
+    test_debug_output_on_hits()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import subprocess
+import sys
+import tempfile
+
+from airSpace import add_navpoint, get_navpoint_by_name
+from navPoint import NavPoint
+from path import find_route_with_procedures, find_multiple_paths_astar
+from routing_service import (RoutingError, load_airspace, resolve_endpoint, check_connected, get_neighbors,
+                             find_route, find_alternative_routes, suggest_names)
+from test_path import load_dataset
+
+GUI_MODULES = ("tkinter", "matplotlib", "PIL", "pygame")
+
+def test_import_without_gui():
+    """Prueba que importar el servicio no carga ninguna biblioteca gráfica"""
+    code = ("import sys, routing_service; "
+            f"print(','.join(m for m in {GUI_MODULES!r} if m in sys.modules))")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "", output.stdout
+
+def test_resolve_endpoints():
+    """Prueba la interpretación de aeropuertos, nombres y coordenadas y sus errores"""
+    airspace = load_dataset("Cat")
+    godox = get_navpoint_by_name(airspace, "GODOX")
+
+    airport = resolve_endpoint(airspace, "LEBL", True)
+    assert airport.is_airport and airport.value == "LEBL"
+    point = resolve_endpoint(airspace, "GODOX", False)
+    assert not point.is_airport and point.value is godox and point.message == ""
+    snapped = resolve_endpoint(airspace, f"{godox.latitude}, {godox.longitude}", True)
+    assert snapped.point is godox and "ajustada al punto GODOX" in snapped.message
+
+    for text, expected in (("LEXX", "aeropuerto de origen"), ("GODOZ", "GODOX")):
+        try:
+            resolve_endpoint(airspace, text, True)
+            assert False, f"{text} no debería existir"
+        except RoutingError as e:
+            assert expected in str(e)
+    assert "GODOX" in suggest_names(airspace, "GODOZ")
+
+    # Un punto sin segmentos no sirve para calcular rutas
+    add_navpoint(airspace, NavPoint(999999, "AISLADO", 41.0, 2.0))
+    isolated = resolve_endpoint(airspace, "AISLADO", False)
+    try:
+        check_connected(airspace, point, isolated)
+        assert False, "Un punto aislado debería ser un error"
+    except RoutingError as e:
+        assert "AISLADO" in str(e)
+    check_connected(airspace, airport, isolated)  # Con aeropuertos no se comprueba
+
+def test_point_names_with_airport_prefix():
+    """Prueba que LEKTO o LESBA se resuelven como puntos y no como aeropuertos inexistentes"""
+    airspace = load_dataset("Spain")
+    for name in ("LEKTO", "LESBA", "LEPES"):
+        endpoint = resolve_endpoint(airspace, name, True)
+        assert not endpoint.is_airport and endpoint.point.name == name
+    # LEKTO no tiene segmentos; los otros dos sí
+    for name in ("LESBA", "LEPES"):
+        result = find_route(airspace, name, "ABETO")
+        assert result.found and result.path[0].name == name and result.sid is None
+    assert resolve_endpoint(airspace, "LEBL", True).is_airport
+
+def test_routes_and_neighbors():
+    """Compara las rutas y los vecinos del servicio con las funciones de path y airSpace"""
+    print("Probando el servicio de rutas...")
+
+    with tempfile.TemporaryDirectory() as directory:
+        airspace = load_airspace("Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt", cache_dir=directory)
+        assert load_airspace("no_existe_nav.txt", "no_existe_seg.txt", "no_existe_aer.txt",
+                             cache_dir=directory) is None
+
+    reference = load_dataset("Cat")
+    for origin, destination in (("GODOX", "CASPE"), ("LEBL", "LEGE"), ("GODOX", "LEBL")):
+        result = find_route(airspace, origin, destination)
+        path, distance, sid, star = find_route_with_procedures(reference, origin, destination)
+        assert result.found and [p.number for p in result.path] == [p.number for p in path]
+        assert abs(result.distance - distance) < 1e-9
+        assert (result.sid and result.sid.number) == (sid and sid.number)
+
+        routes = find_alternative_routes(airspace, origin, destination)
+        expected = find_multiple_paths_astar(reference, origin, destination, min_difference=0.3)
+        assert [[p.number for p in path] for path, _ in routes] == [numbers for _, numbers in expected]
+
+    point, neighbors = get_neighbors(airspace, "GODOX")
+    expected = sorted((s.destination_number for s in airspace.outgoing[point.number]),
+                      key=lambda n: airspace.navpoints[n].name)
+    assert [n.number for n, _ in neighbors] == expected
+    try:
+        get_neighbors(airspace, "NOEXISTE")
+        assert False, "NOEXISTE no debería existir"
+    except RoutingError:
+        pass
+
+    print("Pruebas del servicio de rutas completadas con éxito.")
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_import_without_gui()
+    test_resolve_endpoints()
+    test_point_names_with_airport_prefix()
+    test_routes_and_neighbors()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
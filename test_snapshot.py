@@ -0,0 +1,147 @@
+import mmap
+import os
+import shutil
+import tempfile
+
+from airSpace import AirSpace, add_navpoint, add_navsegment, load_from_files, populate_from_columns
+from navPoint import NavPoint
+from navSegment import NavSegment
+import snapshot as snapshot_module
+from snapshot import save_snapshot, open_snapshot, load_with_snapshot
+
+def _contents(airspace):
+    points = {n: (p.name, p.latitude, p.longitude) for n, p in airspace.navpoints.items()}
+    segments = sorted((s.origin_number, s.destination_number, s.distance) for s in airspace.navsegments)
+    airports = {code: (a.sids, a.stars) for code, a in airspace.navairports.items()}
+    return points, segments, airports
+
+def test_snapshot_round_trip():
+    """Prueba que la instantánea reproduce el espacio aéreo cargado de los ficheros"""
+    print("Probando la instantánea binaria...")
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        files = ("Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt")
+        reference = AirSpace()
+        assert load_from_files(reference, *files)
+
+        first = AirSpace()
+        assert load_with_snapshot(first, *files, cache_dir=cache_dir)
+        assert "snapshot" not in first.load_timings
+        assert len(os.listdir(cache_dir)) == 1
+
+        second = AirSpace()
+        assert load_with_snapshot(second, *files, cache_dir=cache_dir)
+        assert "snapshot" in second.load_timings
+        assert _contents(second) == _contents(reference)
+        assert second.name == reference.name
+
+    print("Pruebas de la instantánea completadas con éxito.")
+
+def test_stale_snapshot_is_rebuilt():
+    """Prueba que un cambio en los ficheros de origen genera una instantánea nueva"""
+    with tempfile.TemporaryDirectory() as directory:
+        files = []
+        for name in ("Cat_nav.txt", "Cat_seg.txt", "Cat_aer.txt"):
+            files.append(shutil.copy(name, directory))
+
+        airspace = AirSpace()
+        assert load_with_snapshot(airspace, *files, cache_dir=directory)
+        with open(files[1], 'a') as f:
+            f.write("6063 6062 1.0\n")
+
+        changed = AirSpace()
+        assert load_with_snapshot(changed, *files, cache_dir=directory)
+        assert "snapshot" not in changed.load_timings
+        assert len(changed.navsegments) == len(airspace.navsegments) + 1
+        # La instantánea antigua se borra al guardar la nueva
+        assert len([f for f in os.listdir(directory) if f.endswith(".snap")]) == 1
+
+def test_snapshots_of_other_files_are_kept():
+    """Prueba que al limpiar instantáneas antiguas no se borran las de otros ficheros"""
+    with tempfile.TemporaryDirectory() as directory:
+        for prefix in ("Cat", "Spain"):
+            files = [shutil.copy(f"{prefix}_{kind}.txt", directory) for kind in ("nav", "seg", "aer")]
+            assert load_with_snapshot(AirSpace(), *files)
+        names = sorted(f for f in os.listdir(directory) if f.endswith(".snap"))
+        assert [name.rsplit("_", 1)[0] for name in names] == ["airspace_Cat_nav", "airspace_Spain_nav"]
+        with open(os.path.join(directory, "notas.snap"), 'w') as f:
+            f.write("no es una instantánea")
+
+        with open(files[1], 'a') as f:
+            f.write("1 2 1.0\n")
+        assert load_with_snapshot(AirSpace(), *files)
+        current = sorted(f for f in os.listdir(directory) if f.endswith(".snap"))
+        assert len(current) == 3 and names[0] in current and names[1] not in current and "notas.snap" in current
+
+def test_snapshot_edge_cases():
+    """Prueba segmentos con extremos desconocidos, sin aeropuertos y ficheros dañados"""
+    airspace = AirSpace()
+    add_navpoint(airspace, NavPoint(1, "ALFA", 41.0, 2.0))
+    add_navpoint(airspace, NavPoint(2, "ALFA", 41.5, 2.5))
+    add_navsegment(airspace, NavSegment(2, 1, 5.0))
+    add_navsegment(airspace, NavSegment(1, 99, 7.0))
+
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "test.snap")
+        save_snapshot(airspace, filename, b"x" * 32)
+        assert open_snapshot(filename, b"y" * 32) is None
+
+        snapshot = open_snapshot(filename, b"x" * 32)
+        assert snapshot.names == ["ALFA"]
+        restored = AirSpace()
+        populate_from_columns(restored, snapshot.to_columns())
+        assert _contents(restored) == _contents(airspace)
+        del snapshot
+
+        with open(filename, 'r+b') as f:
+            f.truncate(os.path.getsize(filename) - 8)
+        assert open_snapshot(filename) is None
+
+class _TrackedMmap(mmap.mmap):
+    """mmap que recuerda las instancias abiertas"""
+    opened = []
+
+    def __new__(cls, *args, **kwargs):
+        buffer = super().__new__(cls, *args, **kwargs)
+        cls.opened.append(buffer)
+        return buffer
+
+def test_rejected_snapshot_is_unmapped():
+    """Prueba que una instantánea rechazada no queda mapeada y se puede sustituir"""
+    airspace = AirSpace()
+    add_navpoint(airspace, NavPoint(1, "ALFA", 41.0, 2.0))
+    with tempfile.TemporaryDirectory() as directory:
+        filename = os.path.join(directory, "test.snap")
+        save_snapshot(airspace, filename, b"x" * 32)
+        damaged = os.path.join(directory, "damaged.snap")
+        shutil.copy(filename, damaged)
+        with open(damaged, 'r+b') as f:
+            f.truncate(os.path.getsize(damaged) - 8)
+        with open(os.path.join(directory, "other.snap"), 'wb') as f:
+            f.write(b"no es una instantanea" * 10)
+
+        original = snapshot_module.mmap.mmap
+        snapshot_module.mmap.mmap = _TrackedMmap
+        try:
+            assert open_snapshot(filename, b"y" * 32) is None  # Otro hash
+            assert open_snapshot(damaged) is None  # Arrays leídos y tamaño incorrecto
+            assert open_snapshot(os.path.join(directory, "other.snap")) is None  # Otro formato
+        finally:
+            snapshot_module.mmap.mmap = original
+        assert len(_TrackedMmap.opened) == 3 and all(buffer.closed for buffer in _TrackedMmap.opened)
+        os.replace(damaged, filename)
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_snapshot_round_trip()
+    print()
+    test_stale_snapshot_is_rebuilt()
+    test_snapshots_of_other_files_are_kept()
+    print()
+    test_snapshot_edge_cases()
+    test_rejected_snapshot_is_unmapped()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()
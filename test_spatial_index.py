@@ -0,0 +1,63 @@
+import random
+
+from airSpace import (calculate_distance, find_nearest_navpoints, find_navpoints_within_radius,
+                      find_navpoints_in_bbox, snap_to_graph, has_segments)
+from navPoint import NavPoint
+from path import find_shortest_path_astar
+from test_path import load_dataset
+
+def test_spatial_queries_match_brute_force():
+    """Compara las consultas del índice espacial con un recorrido de todos los puntos"""
+    print("Probando el índice espacial...")
+
+    airspace = load_dataset("Spain")
+    points = list(airspace.navpoints.values())
+    rng = random.Random(11)
+
+    for _ in range(50):
+        query = NavPoint(0, "Q", rng.uniform(34, 45), rng.uniform(-12, 6))
+        distances = sorted((calculate_distance(airspace, query, p), p.number) for p in points)
+
+        nearest = find_nearest_navpoints(airspace, query.latitude, query.longitude, k=5)
+        assert [p.number for _, p in nearest] == [n for _, n in distances[:5]]
+        for (d, _), (expected, _) in zip(nearest, distances):
+            assert abs(d - expected) < 1e-6
+
+        radius = rng.uniform(10, 200)
+        inside = find_navpoints_within_radius(airspace, query.latitude, query.longitude, radius)
+        assert sorted(p.number for _, p in inside) == sorted(n for d, n in distances if d <= radius)
+
+        min_lat, min_lon = query.latitude - 1, query.longitude - 1.5
+        max_lat, max_lon = query.latitude + 1, query.longitude + 1.5
+        box = find_navpoints_in_bbox(airspace, min_lat, min_lon, max_lat, max_lon)
+        assert sorted(p.number for p in box) == sorted(
+            p.number for p in points if min_lat <= p.latitude <= max_lat and min_lon <= p.longitude <= max_lon)
+
+    print("Pruebas del índice espacial completadas con éxito.")
+
+def test_route_from_coordinates():
+    """Prueba que una ruta puede empezar en una coordenada arbitraria"""
+    airspace = load_dataset("Cat")
+    point, distance = snap_to_graph(airspace, 41.3, 2.1)
+    assert has_segments(airspace, point.number)
+    assert distance < 50
+
+    target = airspace.navpoints[6063]
+    path, total = find_shortest_path_astar(airspace, (41.3, 2.1), target.number)
+    expected_path, expected_total = find_shortest_path_astar(airspace, point.number, target.number)
+    assert path
+    assert [p.number for p in path] == [p.number for p in expected_path]
+    assert total == expected_total
+
+    assert snap_to_graph(airspace, 0.0, 0.0, max_distance=10) is None
+
+def main():
+    """Función principal que ejecuta todas las pruebas"""
+    test_spatial_queries_match_brute_force()
+    print()
+    test_route_from_coordinates()
+    print()
+    print("Todas las pruebas completadas con éxito.")
+
+if __name__ == "__main__":
+    main()